@@ -11,7 +11,7 @@
 
 import os
 
-from gi.repository import Adw, Gtk, Gio
+from gi.repository import Adw, GLib, Gtk, Gio
 
 from .form_model import FormField, FormModel
 from .field_editor_row import FieldEditorRow
@@ -53,6 +53,11 @@ class BuilderPage(Gtk.Box):
         # If set, Save will suggest this path (used when editing an existing file)
         self._save_path: str | None = None
         self._preview_enabled = False
+        # The live preview is one FormPage patched in place: ids of fields
+        # edited since the last frame, applied together by one tick callback.
+        self._preview = None  # FormPage, created on the first preview frame
+        self._preview_changed: set[str] = set()
+        self._preview_tick_id = 0
 
         # Wire the form-name entry (declared in UI template)
         self.form_name_row.connect("changed", self._on_form_name_changed)
@@ -213,17 +218,38 @@ class BuilderPage(Gtk.Box):
         self.preview_scroll.set_visible(self._preview_enabled)
         self.preview_separator.set_visible(self._preview_enabled)
         if self._preview_enabled:
-            self._refresh_preview()
-
-    def _on_model_changed(self):
-        if self._preview_enabled:
-            self._refresh_preview()
-
-    def _refresh_preview(self):
-        from .form_page import FormPage
-        fp = FormPage(preview=True)
-        fp.load_preview(self.model)
-        self.preview_scroll.set_child(fp)
+            # Edits made while hidden weren't tracked; start from scratch.
+            self._preview = None
+            self._schedule_preview()
+
+    def _on_model_changed(self, form_field: FormField | None = None):
+        """Called after any edit; `form_field` is the field whose properties
+        changed, if it was one. Adds, deletes and moves are picked up by
+        comparing the preview against the model."""
+        if not self._preview_enabled:
+            return
+        if form_field is not None:
+            self._preview_changed.add(form_field.id)
+        self._schedule_preview()
+
+    def _schedule_preview(self):
+        if not self._preview_tick_id:
+            self._preview_tick_id = self.preview_scroll.add_tick_callback(self._on_preview_tick)
+
+    def _on_preview_tick(self, _widget, _frame_clock):
+        self._preview_tick_id = 0
+        changed, self._preview_changed = self._preview_changed, set()
+        config_dir = os.path.dirname(self._save_path) if self._save_path else ""
+        if self._preview is None:
+            from .form_page import FormPage
+            self._preview = FormPage(preview=True)
+            self._preview.config_dir = config_dir
+            self._preview.load_preview(self.model)
+            self.preview_scroll.set_child(self._preview)
+        else:
+            self._preview.config_dir = config_dir
+            self._preview.update_preview(self.model, changed)
+        return GLib.SOURCE_REMOVE
 
     def _on_save_finish(self, dialog, result):
         try:
@@ -0,0 +1,251 @@
+# csv_index.py
+#
+# Copyright 2025 Aryan Kaushik
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+"""
+Row-offset sidecar index for response CSVs. `<form>.csv.idx` holds the byte
+offset where each data row starts, packed as unsigned 64-bit ints after a
+small header, so counting rows or reading rows i..j is a lookup plus one
+seek instead of a csv.reader pass over the whole file.
+
+The index is only a cache: it is extended from wherever it stopped each
+time it's opened (normally just the row FormPage appended), and rebuilt
+from scratch if it no longer matches the CSV (different inode or header,
+file shrank, or the bytes before the indexed end changed).
+"""
+
+import csv
+import fcntl
+import hashlib
+import io
+import mmap
+import os
+import struct
+from array import array
+
+# magic, csv inode, header end, indexed end, row count, header digest, boundary digest
+_HEADER = struct.Struct("<8sQQQQ16s16s")
+_MAGIC = b"OFIDX\x00\x00\x02"
+_ENTRY_SIZE = array("Q").itemsize
+
+# Bytes hashed right before the indexed end - enough to tell "same file,
+# more rows appended" apart from "file was rewritten".
+_BOUNDARY_HASH_BYTES = 256
+
+
+def iter_records(f, offset: int):
+    """Yield (start_offset, raw_bytes) for each complete CSV record in binary
+    file `f` from `offset` on. A record only ends at a newline outside quotes,
+    so quoted fields with embedded newlines stay whole. A trailing record with
+    no newline yet (a write still in progress) is not yielded, nor are blank
+    lines after the first record - not rows, as csv.DictReader has it."""
+    f.seek(offset)
+    start, pending, quotes = offset, [], 0
+    for line in iter(f.readline, b""):
+        pending.append(line)
+        quotes += line.count(b'"')
+        if quotes % 2 == 0 and line.endswith(b"\n"):
+            raw = b"".join(pending)
+            if start == 0 or raw.rstrip(b"\r\n"):
+                yield start, raw
+            start += len(raw)
+            pending, quotes = [], 0
+
+
+def parse_records(raw_records: list[bytes]) -> list[list[str]]:
+    """Parse raw records from iter_records() into rows, as csv.reader would."""
+    if not raw_records:
+        return []
+    text = b"".join(raw_records).decode("utf-8")
+    return list(csv.reader(io.StringIO(text, newline="")))
+
+
+def digest(data: bytes) -> bytes:
+    return hashlib.sha256(data).digest()[:16]
+
+
+def boundary_digest(f, offset: int) -> bytes:
+    """Digest of the bytes just before `offset` in binary file `f`."""
+    start = max(offset - _BOUNDARY_HASH_BYTES, 0)
+    f.seek(start)
+    return digest(f.read(offset - start))
+
+
+def index_path_for_csv(csv_path: str) -> str:
+    """`<form_name>.csv` -> `<form_name>.csv.idx`."""
+    return csv_path + ".idx"
+
+
+def invalidate(csv_path: str) -> None:
+    """Drop the sidecar after rewriting the CSV in place."""
+    try:
+        os.remove(index_path_for_csv(csv_path))
+    except OSError:
+        pass
+
+
+class RowIndex:
+    """An open, validated view of a CSV's row offsets. Use open_index()."""
+
+    def __init__(self, csv_path: str):
+        self.csv_path = csv_path
+        self.header_row: list[str] | None = None
+        self.header_end = 0
+        self.indexed_end = 0
+        self._offsets: memoryview | array = array("Q")
+        self._view: memoryview | None = None
+        self._map: mmap.mmap | None = None
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def __enter__(self) -> "RowIndex":
+        return self
+
+    def __exit__(self, *_exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if isinstance(self._offsets, memoryview):
+            self._offsets.release()
+        self._offsets = array("Q")
+        if self._view is not None:
+            self._view.release()
+            self._view = None
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+    def offset(self, i: int) -> int:
+        """Byte offset where data row `i` starts; len(self) means end of data."""
+        if i >= len(self._offsets):
+            return self.indexed_end
+        return self._offsets[i]
+
+    def read_rows(self, start: int, stop: int | None = None) -> list[list[str]]:
+        """Data rows [start, stop) - one seek and a read of just those bytes."""
+        count = len(self._offsets)
+        stop = count if stop is None else min(stop, count)
+        start = max(start, 0)
+        if start >= stop:
+            return []
+        begin, end = self.offset(start), self.offset(stop)
+        with open(self.csv_path, "rb") as f:
+            f.seek(begin)
+            # Blank lines between the rows parse as [], and aren't rows.
+            return [row for row in parse_records([f.read(end - begin)]) if row]
+
+
+def open_index(csv_path: str) -> RowIndex:
+    """Validate, catch up (or rebuild) and memory-map the index for csv_path.
+
+    Falls back to an in-memory index if the sidecar can't be written, e.g.
+    when the CSV sits in a read-only folder.
+    """
+    index = RowIndex(csv_path)
+    if not os.path.exists(csv_path):
+        return index
+
+    with open(csv_path, "rb") as f:
+        header = next(iter_records(f, 0), None)
+        if header is None:
+            return index
+        st = os.fstat(f.fileno())
+        index.header_row = parse_records([header[1]])[0]
+        index.header_end = len(header[1])
+        header_digest = digest(header[1])
+
+        try:
+            _open_persistent(index, f, st, header_digest)
+        except OSError:
+            index.close()
+            offsets = array("Q")
+            end = index.header_end
+            for start, raw in iter_records(f, index.header_end):
+                offsets.append(start)
+                end = start + len(raw)
+            index._offsets = offsets
+            index.indexed_end = end
+    return index
+
+
+def _open_persistent(index: RowIndex, f, st: os.stat_result, header_digest: bytes) -> None:
+    idx_path = index_path_for_csv(index.csv_path)
+    count, indexed_end = 0, index.header_end
+
+    fd = os.open(idx_path, os.O_RDWR | os.O_CREAT, 0o644)
+    with os.fdopen(fd, "r+b") as idx:
+        # Other tabs and processes catch the same sidecar up; take turns.
+        fcntl.flock(idx.fileno(), fcntl.LOCK_EX)
+        raw_header = idx.read(_HEADER.size)
+        valid = False
+        if len(raw_header) == _HEADER.size:
+            magic, inode, header_end, saved_end, saved_count, saved_header, saved_boundary = _HEADER.unpack(
+                raw_header
+            )
+            valid = (
+                magic == _MAGIC
+                and inode == st.st_ino
+                and header_end == index.header_end
+                and saved_header == header_digest
+                and saved_end <= st.st_size
+                and os.fstat(idx.fileno()).st_size >= _HEADER.size + saved_count * _ENTRY_SIZE
+                and boundary_digest(f, saved_end) == saved_boundary
+            )
+            if valid:
+                count, indexed_end = saved_count, saved_end
+
+        new_offsets = array("Q")
+        for start, raw in iter_records(f, indexed_end):
+            new_offsets.append(start)
+            indexed_end = start + len(raw)
+
+        if new_offsets or not valid:
+            idx.seek(_HEADER.size + count * _ENTRY_SIZE)
+            new_offsets.tofile(idx)
+            count += len(new_offsets)
+            idx.truncate(_HEADER.size + count * _ENTRY_SIZE)
+            idx.seek(0)
+            idx.write(
+                _HEADER.pack(
+                    _MAGIC,
+                    st.st_ino,
+                    index.header_end,
+                    indexed_end,
+                    count,
+                    header_digest,
+                    boundary_digest(f, indexed_end),
+                )
+            )
+            idx.flush()
+
+        index.indexed_end = indexed_end
+        if count:
+            index._map = mmap.mmap(idx.fileno(), _HEADER.size + count * _ENTRY_SIZE, access=mmap.ACCESS_READ)
+            index._view = memoryview(index._map)[_HEADER.size:]
+            index._offsets = index._view.cast("Q")
+
+
+def update_index(csv_path: str) -> None:
+    """Extend the sidecar with rows appended since it was last opened."""
+    open_index(csv_path).close()
+
+
+def count_rows(csv_path: str) -> int:
+    """Number of data rows (header excluded)."""
+    with open_index(csv_path) as index:
+        return len(index)
@@ -0,0 +1,119 @@
+# csv_lock.py
+#
+# Copyright 2025 Aryan Kaushik
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+"""
+Advisory lock serializing every mutation of a response CSV - appends from
+any tab or process, and compaction's rewrite - so rows never interleave
+and nothing is appended to a file that's about to be replaced.
+
+The lock is an flock() on a `<form>.csv.lock` sidecar rather than on the
+CSV itself: compaction swaps the CSV for a new inode, and a lock on the
+old one would no longer exclude anybody. flock() locks belong to the open
+file, so two CsvLocks conflict even within one process. If the sidecar
+can't be created (read-only folder) the lock degrades to a no-op.
+
+A sync push holds a second lock, on `<form>.csv.push.lock`, from reading
+the unsynced rows until it has saved its cursor; compaction, which
+renumbers rows, takes it too and leaves the file alone while a push runs.
+"""
+
+import fcntl
+import os
+import threading
+
+
+def lock_path(csv_path: str) -> str:
+    """`<form_name>.csv` -> `<form_name>.csv.lock`."""
+    return csv_path + ".lock"
+
+
+def push_lock_path(csv_path: str) -> str:
+    """`<form_name>.csv` -> `<form_name>.csv.push.lock`."""
+    return csv_path + ".push.lock"
+
+
+class CsvLock:
+    """Reusable exclusive lock on one CSV; keeps the sidecar open between
+    acquisitions. Use as a context manager."""
+
+    def __init__(self, csv_path: str, sidecar: str | None = None):
+        self.csv_path = csv_path
+        self._sidecar = sidecar or lock_path(csv_path)
+        self._fd: int | None = None
+        # flock() doesn't exclude threads sharing our fd - this does.
+        self._thread_lock = threading.Lock()
+
+    def acquire(self, blocking: bool = True) -> bool:
+        """Take the lock; False if `blocking` is off and someone holds it."""
+        if not self._thread_lock.acquire(blocking):
+            return False
+        try:
+            if self._fd is None:
+                self._fd = os.open(self._sidecar, os.O_RDWR | os.O_CREAT, 0o644)
+            fcntl.flock(self._fd, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            self._thread_lock.release()
+            return False
+        except OSError:
+            pass  # unlockable sidecar: carry on unlocked, as before locking existed
+        except BaseException:
+            self._thread_lock.release()
+            raise
+        return True
+
+    def release(self) -> None:
+        try:
+            if self._fd is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+        finally:
+            self._thread_lock.release()
+
+    def __enter__(self) -> "CsvLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, *_exc) -> None:
+        self.release()
+
+    def close(self) -> None:
+        with self._thread_lock:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+
+
+def locked(csv_path: str) -> "_OneShotLock":
+    """One-off exclusive lock: `with locked(path): ...`."""
+    return _OneShotLock(csv_path)
+
+
+def push_locked(csv_path: str) -> "_OneShotLock":
+    """One-off sync push lock: `with push_locked(path): ...`."""
+    return _OneShotLock(csv_path, push_lock_path(csv_path))
+
+
+class _OneShotLock(CsvLock):
+    def acquire(self, blocking: bool = True) -> bool:
+        if super().acquire(blocking):
+            return True
+        self.close()
+        return False
+
+    def release(self) -> None:
+        super().release()
+        self.close()
@@ -0,0 +1,248 @@
+# csv_writer.py
+#
+# Copyright 2025 Aryan Kaushik
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+"""
+Appends submissions to a form's response CSV through one handle held open
+for as long as the form is, with the header read once when it's opened -
+a submission is a write, not a stat + two opens + a header read.
+
+How soon an appended row must be on disk is the durability policy:
+  "row"   - fsync after every row; the submit returns once it's durable.
+  "group" - rows are fsynced together every few ms on a background thread,
+            so a burst of submissions shares one fsync.
+  "os"    - flushed to the OS, which writes it back when it likes.
+Each writer keeps the submit-to-durable latency it's seeing, and can call
+back once a given row is durable - or, if fsync() fails, with a
+NotDurableError instead: such a row was written but may not have reached
+the disk, so nothing may treat it as saved.
+
+Every row is written under the CSV's CsvLock, so writers in other tabs and
+processes never interleave, and a writer notices (by inode) that the file
+was replaced by a compaction and reopens it before appending.
+"""
+
+import csv
+import os
+import threading
+import time
+from collections.abc import Callable
+from functools import partial
+
+from .csv_index import iter_records, parse_records
+from .csv_lock import CsvLock
+from .form_model import TIMESTAMP_LABEL
+
+DURABILITY_ROW = "row"
+DURABILITY_GROUP = "group"
+DURABILITY_OS = "os"
+DURABILITY_POLICIES = (DURABILITY_ROW, DURABILITY_GROUP, DURABILITY_OS)
+
+# Weight of the newest sample in the running latency average.
+_LATENCY_SMOOTHING = 0.2
+
+
+class NotDurableError(OSError):
+    """A row was written, but fsync() failed, so it may not be on disk."""
+
+
+class ResponseWriter:
+    def __init__(self, csv_path: str, durability: str = DURABILITY_GROUP, group_commit_ms: int = 200):
+        self.csv_path = csv_path
+        self.durability = durability if durability in DURABILITY_POLICIES else DURABILITY_GROUP
+        self.group_commit_ms = group_commit_ms
+        # Seconds from append() to the row being durable (per the policy).
+        self.last_latency: float | None = None
+        self.average_latency: float | None = None
+
+        self._lock = threading.Lock()
+        self._csv_lock = CsvLock(csv_path)
+        self._file = None
+        self._writer = None
+        self._header: list[str] | None = None
+        # Group commit: (submit time, on_durable, on_not_durable) of rows
+        # written but not yet fsynced.
+        self._unsynced: list[tuple[float, Callable[[], None] | None, Callable[[Exception], None] | None]] = []
+        self._commit_wakeup = threading.Condition(self._lock)
+        self._commit_thread: threading.Thread | None = None
+        self._closed = False
+
+    @property
+    def header(self) -> list[str] | None:
+        return self._header
+
+    def append(
+        self,
+        timestamp: str,
+        values: list,
+        labels: list[str],
+        on_durable: Callable[[], None] | None = None,
+        on_not_durable: Callable[[Exception], None] | None = None,
+    ) -> None:
+        """Append one response. A new (empty) CSV gets a header of the
+        timestamp plus `labels`; an existing one keeps its header and is
+        filled positionally, as FormPage always has. `on_durable` is called
+        (possibly from the group-commit thread) once the row is on disk as
+        far as the policy goes; if its fsync fails, `on_not_durable` gets a
+        NotDurableError instead. Raises OSError if the row wasn't written."""
+        submitted = time.monotonic()
+        with self._lock:
+            if self._closed:
+                raise OSError("response writer is closed")
+            try:
+                with self._csv_lock:
+                    self._write_row_locked(timestamp, values, labels)
+            except OSError as e:
+                # Start over from a fresh handle next time; rows written
+                # before this one still get their fsync.
+                error, done = e, self._sync_pending_locked()
+                self._close_file()
+            else:
+                error, done = None, []
+                if self.durability == DURABILITY_GROUP:
+                    self._unsynced.append((submitted, on_durable, on_not_durable))
+                    self._start_group_commit()
+                    self._commit_wakeup.notify()
+                    return
+                if self.durability == DURABILITY_ROW:
+                    self._unsynced.append((submitted, on_durable, on_not_durable))
+                    done = self._sync_pending_locked()
+                else:
+                    self._record_latency(time.monotonic() - submitted)
+                    done = [on_durable] if on_durable is not None else []
+        _notify(done)
+        if error is not None:
+            raise error
+
+    def close(self) -> None:
+        """Make anything pending durable and release the file."""
+        with self._lock:
+            self._closed = True
+            done = self._sync_pending_locked()
+            self._close_file()
+            self._csv_lock.close()
+            self._commit_wakeup.notify()
+        _notify(done)
+
+    # -- Internals -----------------------------------------------------------
+
+    def _write_row_locked(self, timestamp: str, values: list, labels: list[str]) -> None:
+        """Called holding both the writer's lock and the CSV lock."""
+        if self._file is not None and self._replaced():
+            # Compacted (or deleted) since we opened it. Unsynced rows were
+            # copied across and get fsynced with the new file.
+            self._close_file()
+        if self._file is None:
+            self._open()
+        if self._header is None:
+            self._header = [TIMESTAMP_LABEL, *labels]
+            self._writer.writerow(self._header)
+        if self._header[:1] == [TIMESTAMP_LABEL]:
+            values = [timestamp, *values]
+        width = len(self._header)
+        self._writer.writerow(values[:width] + [""] * (width - len(values)))
+        self._file.flush()
+
+    def _open(self) -> None:
+        self._file = open(self.csv_path, "a", newline="", encoding="utf-8")
+        self._writer = csv.writer(self._file)
+        self._header = None
+        if self._file.tell() > 0:
+            with open(self.csv_path, "rb") as f:
+                header = next(iter_records(f, 0), None)
+            if header is not None:
+                self._header = parse_records([header[1]])[0]
+
+    def _replaced(self) -> bool:
+        try:
+            return os.stat(self.csv_path).st_ino != os.fstat(self._file.fileno()).st_ino
+        except OSError:
+            return True
+
+    def _close_file(self) -> None:
+        if self._file is not None:
+            try:
+                self._file.close()
+            except OSError:
+                pass
+            self._file = self._writer = None
+
+    def _record_latency(self, latency: float) -> None:
+        self.last_latency = latency
+        if self.average_latency is None:
+            self.average_latency = latency
+        else:
+            self.average_latency += _LATENCY_SMOOTHING * (latency - self.average_latency)
+
+    def _sync_pending_locked(self) -> list:
+        if not self._unsynced or self._file is None:
+            return []
+        group, self._unsynced = self._unsynced, []
+        try:
+            os.fsync(self._file.fileno())
+        except OSError as e:
+            return _fail_group(group, e)
+        return self._finish_group(group)
+
+    def _finish_group(self, group: list) -> list:
+        """Record the group's latencies; returns its on_durable callbacks."""
+        now = time.monotonic()
+        for start, _on_durable, _on_not_durable in group:
+            self._record_latency(now - start)
+        return [on_durable for _start, on_durable, _on_not_durable in group if on_durable is not None]
+
+    def _start_group_commit(self) -> None:
+        if self._commit_thread is None or not self._commit_thread.is_alive():
+            self._commit_thread = threading.Thread(target=self._group_commit_loop, daemon=True)
+            self._commit_thread.start()
+
+    def _group_commit_loop(self) -> None:
+        while True:
+            with self._lock:
+                while not self._unsynced and not self._closed:
+                    self._commit_wakeup.wait()
+                if self._closed:
+                    return
+            # Let more rows join this group before paying for the fsync.
+            time.sleep(self.group_commit_ms / 1000)
+            with self._lock:
+                if self._file is None or not self._unsynced:
+                    continue
+                group, self._unsynced = self._unsynced, []
+                # fsync a duplicate so appends aren't held up behind the disk.
+                fd = os.dup(self._file.fileno())
+            try:
+                os.fsync(fd)
+            except OSError as e:
+                done = _fail_group(group, e)
+            else:
+                with self._lock:
+                    done = self._finish_group(group)
+            finally:
+                os.close(fd)
+            _notify(done)
+
+
+def _fail_group(group: list, error: OSError) -> list:
+    """The group's on_not_durable callbacks, bound to a NotDurableError."""
+    not_durable = NotDurableError(error.errno, f"Response may not be saved to disk: {error.strerror or error}")
+    return [partial(on_not_durable, not_durable) for _s, _d, on_not_durable in group if on_not_durable is not None]
+
+
+def _notify(callbacks: list) -> None:
+    for callback in callbacks:
+        callback()
@@ -9,7 +9,7 @@
 #
 # SPDX-License-Identifier: GPL-3.0-or-later
 
-from gi.repository import Adw, Gtk
+from gi.repository import Adw, Gio, GLib, Gtk
 
 from .form_model import FormField
 
@@ -22,13 +22,15 @@ _FIELD_ICONS = {
     "check":    "checkbox-checked-symbolic",
     "spin":     "list-add-symbolic",
     "calendar": "x-office-calendar-symbolic",
+    "lookup":   "system-search-symbolic",
     "label":    "font-select-symbolic",
     "picture":  "image-x-generic-symbolic",
+    "page":     "go-next-symbolic",
 }
 
-_REQUIRES_REQUIRED = ("entry", "text", "check", "radio", "calendar", "dropdown")
-_SUPPORTS_PLACEHOLDER = ("entry", "text")
-_SUPPORTS_HELP_TEXT = ("entry", "text", "dropdown", "radio", "check", "spin", "calendar")
+_REQUIRES_REQUIRED = ("entry", "text", "lookup", "check", "radio", "calendar", "dropdown")
+_SUPPORTS_PLACEHOLDER = ("entry", "text", "lookup")
+_SUPPORTS_HELP_TEXT = ("entry", "text", "lookup", "dropdown", "radio", "check", "spin", "calendar")
 
 
 class FieldEditorRow(Adw.ExpanderRow):
@@ -38,8 +40,8 @@ class FieldEditorRow(Adw.ExpanderRow):
     All changes are written directly into self.form_field — the builder
     page reads model.fields to serialise.
 
-    on_changed (if given) is called whenever a property changes, so the
-    builder can refresh its live preview.
+    on_changed (if given) is called with the FormField whenever a property
+    changes, so the builder can patch that field in its live preview.
     """
 
     def __init__(self, form_field: FormField, on_delete, on_move_up, on_move_down,
@@ -51,7 +53,7 @@ class FieldEditorRow(Adw.ExpanderRow):
 
     def _notify_changed(self):
         if self._on_changed:
-            self._on_changed()
+            self._on_changed(self.form_field)
 
     def _build(self, on_delete, on_move_up, on_move_down):
         self._refresh_title()
@@ -90,6 +92,19 @@ class FieldEditorRow(Adw.ExpanderRow):
         if ftype in ("radio", "dropdown"):
             self._build_options_editor()
 
+            search_row = Adw.SpinRow.new_with_range(0, 100000, 1)
+            search_row.set_title("Searchable above")
+            search_row.set_subtitle("Become a searchable dropdown past this many options (0: never)")
+            search_row.set_value(float(self.form_field.search_threshold))
+            search_row.connect(
+                "notify::value",
+                lambda r, _: (
+                    setattr(self.form_field, "search_threshold", int(r.get_value())),
+                    self._notify_changed(),
+                ),
+            )
+            self.add_row(search_row)
+
         elif ftype == "spin":
             for attr, title, lo, hi in (
                 ("min",  "Minimum", -999999, 999999),
@@ -108,6 +123,9 @@ class FieldEditorRow(Adw.ExpanderRow):
                 )
                 self.add_row(spin_row)
 
+        elif ftype == "lookup":
+            self._build_lookup_editor()
+
         elif ftype == "label":
             style_row = Adw.EntryRow(title="Style classes (comma-separated, e.g. title-1)")
             style_row.set_text(", ".join(self.form_field.style))
@@ -176,7 +194,83 @@ class FieldEditorRow(Adw.ExpanderRow):
     def _refresh_title(self):
         self.set_title(self.form_field.label or f"[{self.form_field.type}]")
 
+    def _build_lookup_editor(self):
+        source_row = Adw.EntryRow(title="Roster CSV")
+        source_row.set_text(self.form_field.lookup_source)
+        source_row.connect(
+            "changed",
+            lambda r, *_: (
+                setattr(self.form_field, "lookup_source", r.get_text()),
+                self._notify_changed(),
+            ),
+        )
+        choose_btn = Gtk.Button(icon_name="document-open-symbolic", valign=Gtk.Align.CENTER)
+        choose_btn.add_css_class("flat")
+        choose_btn.set_tooltip_text("Choose roster file")
+        choose_btn.connect("clicked", lambda *_: self._choose_roster(source_row))
+        source_row.add_suffix(choose_btn)
+        self.add_row(source_row)
+
+        key_row = Adw.EntryRow(title="Key column (empty for the first)")
+        key_row.set_text(self.form_field.key_column)
+        key_row.connect(
+            "changed",
+            lambda r, *_: (
+                setattr(self.form_field, "key_column", r.get_text().strip()),
+                self._notify_changed(),
+            ),
+        )
+        self.add_row(key_row)
+
+        fill_row = Adw.EntryRow(title="Fill (roster column = field label, comma-separated)")
+        fill_row.set_text(", ".join(f"{column} = {label}" for column, label in self.form_field.fill.items()))
+        fill_row.connect("changed", self._on_fill_changed)
+        self.add_row(fill_row)
+
+    def _choose_roster(self, source_row):
+        dialog = Gtk.FileDialog(title="Choose Roster")
+        filter_store = Gio.ListStore.new(Gtk.FileFilter)
+        file_filter = Gtk.FileFilter()
+        file_filter.set_name("CSV files")
+        file_filter.add_suffix("csv")
+        filter_store.append(file_filter)
+        dialog.set_filters(filter_store)
+
+        def on_chosen(dialog, result):
+            try:
+                file = dialog.open_finish(result)
+            except GLib.Error:
+                return  # cancelled
+            if file.get_path():
+                source_row.set_text(file.get_path())
+
+        dialog.open(None, None, on_chosen)
+
+    def _on_fill_changed(self, row):
+        fill = {}
+        for pair in row.get_text().split(","):
+            column, sep, label = pair.partition("=")
+            if sep and column.strip() and label.strip():
+                fill[column.strip()] = label.strip()
+        self.form_field.fill = fill
+        self._notify_changed()
+
     def _build_options_editor(self):
+        # A file of options replaces the inline list (kept, unsaved, in case
+        # the file is cleared again).
+        self._source_row = Adw.ActionRow(title="Options file")
+        choose_btn = Gtk.Button(icon_name="document-open-symbolic", valign=Gtk.Align.CENTER)
+        choose_btn.add_css_class("flat")
+        choose_btn.set_tooltip_text("Read options from a text or CSV file")
+        choose_btn.connect("clicked", self._choose_options_source)
+        self._clear_source_btn = Gtk.Button(icon_name="edit-clear-symbolic", valign=Gtk.Align.CENTER)
+        self._clear_source_btn.add_css_class("flat")
+        self._clear_source_btn.set_tooltip_text("List options here instead")
+        self._clear_source_btn.connect("clicked", lambda *_: self._set_options_source(""))
+        self._source_row.add_suffix(self._clear_source_btn)
+        self._source_row.add_suffix(choose_btn)
+        self.add_row(self._source_row)
+
         self._options_expander = Adw.ExpanderRow(title="Options")
         self._options_expander.set_expanded(True)
 
@@ -192,6 +286,39 @@ class FieldEditorRow(Adw.ExpanderRow):
             self._add_option_row(opt)
 
         self.add_row(self._options_expander)
+        self._show_options_source()
+
+    def _choose_options_source(self, *_):
+        dialog = Gtk.FileDialog(title="Choose Options File")
+        filter_store = Gio.ListStore.new(Gtk.FileFilter)
+        file_filter = Gtk.FileFilter()
+        file_filter.set_name("Text and CSV files")
+        file_filter.add_suffix("txt")
+        file_filter.add_suffix("csv")
+        filter_store.append(file_filter)
+        dialog.set_filters(filter_store)
+        dialog.open(None, None, self._on_options_source_chosen)
+
+    def _on_options_source_chosen(self, dialog, result):
+        try:
+            file = dialog.open_finish(result)
+        except GLib.Error:
+            return  # cancelled
+        if file.get_path():
+            self._set_options_source(file.get_path())
+
+    def _set_options_source(self, path: str):
+        self.form_field.options_source = path
+        self._show_options_source()
+        self._notify_changed()
+
+    def _show_options_source(self):
+        source = self.form_field.options_source
+        self._source_row.set_subtitle(
+            GLib.markup_escape_text(source) if source else "None; options are listed below"
+        )
+        self._clear_source_btn.set_visible(bool(source))
+        self._options_expander.set_visible(not source)
 
     def _add_option_row(self, text: str):
         row = Adw.EntryRow(title="Option")
@@ -21,7 +21,9 @@ _FIELD_TYPES = [
     ("spin",     "Number",          "list-add-symbolic",             "Numeric spinner with range"),
     ("calendar", "Date",            "x-office-calendar-symbolic",    "Date picker"),
     ("label",    "Label / Title",   "font-select-symbolic",          "Static display text"),
+    ("lookup",   "Lookup",          "system-search-symbolic",        "Fill other fields from a roster CSV"),
     ("picture",  "Image",           "image-x-generic-symbolic",      "Embed a picture"),
+    ("page",     "Page Break",      "go-next-symbolic",              "Start a new page of the form"),
 ]
 
 
@@ -266,7 +266,7 @@ class FormConfig(Gtk.Box):
         if not csv_path:
             return
         from .response_viewer import ResponseViewerDialog
-        dialog = ResponseViewerDialog(csv_path)
+        dialog = ResponseViewerDialog(csv_path, (self.page.form_config or {}).get("fields"))
         dialog.present(root_as_widget(self.get_root()))
 
     def _open_sync_settings(self, *_):
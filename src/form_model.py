@@ -14,6 +14,18 @@ import uuid
 from dataclasses import dataclass, field
 from typing import Any
 
+# First column of every response CSV; FormPage fills it with the UTC submit time.
+TIMESTAMP_LABEL = "Submitted At"
+
+
+def _int_or(value: Any, default: int) -> int:
+    """int(value), or `default` for values a hand-edited config may hold
+    that aren't numbers."""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
 
 @dataclass
 class FormField:
@@ -21,6 +33,8 @@ class FormField:
     Represents one field in the form config JSON.
     Only keys relevant to the field type are emitted on serialisation,
     mirroring exactly what form_page.py's _create_field() expects.
+    Type "page" is a page break: the fields after it, up to the next one,
+    are a page of their own, titled by its (optional) label.
     """
 
     type: str
@@ -29,6 +43,10 @@ class FormField:
     required: bool = False
     # radio / dropdown
     options: list = field(default_factory=list)
+    # radio / dropdown: a text/CSV file to read the options from instead
+    options_source: str = ""
+    # radio / dropdown: with more options than this, a searchable dropdown (0 = never)
+    search_threshold: int = 0
     # spin
     min: float = 0
     max: float = 10
@@ -39,7 +57,11 @@ class FormField:
     uri: str = ""
     width: int = 480
     height: int = 200
-    # entry / text
+    # lookup: roster CSV, its key column (first if empty), and roster column -> field label to fill
+    lookup_source: str = ""
+    key_column: str = ""
+    fill: dict = field(default_factory=dict)
+    # entry / text / lookup
     placeholder: str = ""
     # shown below the label for most interactive fields
     help_text: str = ""
@@ -48,12 +70,18 @@ class FormField:
         """Emit only the keys that form_page.py actually reads."""
         base: dict[str, Any] = {"id": self.id, "type": self.type, "label": self.label}
 
-        if self.type in ("entry", "text", "check", "radio", "calendar", "dropdown"):
+        if self.type in ("entry", "text", "lookup", "check", "radio", "calendar", "dropdown"):
             if self.required:
                 base["required"] = True
 
         if self.type in ("radio", "dropdown"):
-            base["options"] = list(self.options)
+            if self.options_source:
+                # Referenced, not inlined: the file stays the one copy.
+                base["options_source"] = self.options_source
+            else:
+                base["options"] = list(self.options)
+            if self.search_threshold:
+                base["search_threshold"] = self.search_threshold
 
         if self.type == "spin":
             base["min"] = self.min
@@ -68,10 +96,16 @@ class FormField:
             base["width"] = self.width
             base["height"] = self.height
 
-        if self.type in ("entry", "text") and self.placeholder:
+        if self.type == "lookup":
+            base["lookup_source"] = self.lookup_source
+            if self.key_column:
+                base["key_column"] = self.key_column
+            base["fill"] = dict(self.fill)
+
+        if self.type in ("entry", "text", "lookup") and self.placeholder:
             base["placeholder"] = self.placeholder
 
-        if self.type in ("entry", "text", "dropdown", "radio", "check", "spin", "calendar") and self.help_text:
+        if self.type in ("entry", "text", "lookup", "dropdown", "radio", "check", "spin", "calendar") and self.help_text:
             base["help_text"] = self.help_text
 
         return base
@@ -84,6 +118,8 @@ class FormField:
             id=d.get("id", str(uuid.uuid4())[:8]),
             required=d.get("required", False),
             options=list(d.get("options", [])),
+            options_source=d.get("options_source", ""),
+            search_threshold=_int_or(d.get("search_threshold", 0), 0),
             min=d.get("min", 0),
             max=d.get("max", 10),
             step=d.get("step", 1),
@@ -91,6 +127,9 @@ class FormField:
             uri=d.get("uri", ""),
             width=d.get("width", 480),
             height=d.get("height", 200),
+            lookup_source=d.get("lookup_source", ""),
+            key_column=d.get("key_column", ""),
+            fill=dict(d.get("fill", {})),
             placeholder=d.get("placeholder", ""),
             help_text=d.get("help_text", ""),
         )
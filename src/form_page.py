@@ -17,16 +17,16 @@
 #
 # SPDX-License-Identifier: GPL-3.0-or-later
 
-import csv
 import os
 from datetime import datetime, timezone
 
-from gi.repository import Adw, Gtk, Gio
+from gi.repository import Adw, GLib, Gtk, Gio
 
+from . import lookup_index, option_sources, submission_queue
+from .csv_writer import NotDurableError, ResponseWriter
+from .sync.settings import get_durability, get_group_commit_ms
 from .utils import show_fatal_toast
 
-_TIMESTAMP_LABEL = "Submitted At"
-
 
 @Gtk.Template(resource_path="/in/aryank/openforms/form_page.ui")
 class FormPage(Gtk.Box):
@@ -45,6 +45,7 @@ class FormPage(Gtk.Box):
     kiosk_toggle: Gtk.ToggleButton = Gtk.Template.Child()
     page_stack: Gtk.Stack = Gtk.Template.Child()
     thankyou_box: Gtk.Box = Gtk.Template.Child()
+    nav_start_box: Gtk.Box = Gtk.Template.Child()
 
     def __init__(self, preview: bool = False, **kwargs):
         super().__init__(**kwargs)
@@ -52,7 +53,21 @@ class FormPage(Gtk.Box):
         self.set_vexpand(True)
 
         self.fields = {}
+        # field id -> its row in form_container (None if it has none), for every field
+        self._field_rows: dict[str, Gtk.Widget | None] = {}
+        # Paged forms (with "page" break fields): each page's field configs,
+        # and its box in form_container once it has been shown.
+        self._pages: list[list[dict]] = []
+        self._page_boxes: list[Gtk.Box | None] = []
+        self._current_page = 0
+        self._page_of_field: dict[str, int] = {}
+        self._back_button: Gtk.Button | None = None
+        # Lookup autofill values for fields on pages not built yet.
+        self._pending_fills: dict[str, str] = {}
         self.page = None
+        # Folder of the form's JSON config, which relative options_source
+        # and lookup_source paths are taken from ("": the working directory).
+        self.config_dir = ""
         self._preview = preview
         self._kiosk_manager = None
 
@@ -73,6 +88,8 @@ class FormPage(Gtk.Box):
     def set_page(self, page):
         self.page = page
         self.config = page.form_config
+        config_path = page.config_file.get_path() if page.config_file else None
+        self.config_dir = os.path.dirname(config_path) if config_path else ""
         self._build_form()
 
         kiosk_cfg = self.config.get("kiosk", {})
@@ -91,6 +108,7 @@ class FormPage(Gtk.Box):
         while (child := self.form_container.get_first_child()):
             self.form_container.remove(child)
         self.fields.clear()
+        self._field_rows.clear()
 
         try:
             import json
@@ -107,21 +125,129 @@ class FormPage(Gtk.Box):
         fields_list = self.config.get("fields", None)
         if not fields_list:
             return
+        if not self._preview and any(field.get("type") == "page" for field in fields_list):
+            self._build_pages(fields_list)
+            return
         for field in fields_list:
-            assert "type" in field
-            assert "label" in field
-            label = field["label"]
-            row, widget, label_widget = self._create_field(label, field)
-            if widget and row:
-                self.fields[field.get("id")] = {
-                    "widget": widget,
-                    "label_widget": label_widget,
-                    "config": field,
-                }
-                self.form_container.append(row)
-            elif row:
+            row = self._add_field(field)
+            if row:
                 self.form_container.append(row)
 
+    def _add_field(self, field: dict) -> Gtk.Widget | None:
+        """Create the row for one field config and register it; the caller
+        places the row in form_container."""
+        assert "type" in field
+        assert "label" in field
+        label = field["label"]
+        row, widget, label_widget = self._create_field(label, field)
+        if widget and row:
+            self.fields[field.get("id")] = {
+                "widget": widget,
+                "label_widget": label_widget,
+                "config": field,
+            }
+            if field.get("id") in self._pending_fills:
+                self._set_field_value(widget, self._pending_fills.pop(field.get("id")))
+        self._field_rows[field.get("id")] = row
+        return row
+
+    def update_preview(self, model, changed_ids: set[str]):
+        """Patch a preview built by load_preview() to match `model`: rebuild
+        the rows of fields in `changed_ids` and of new fields, drop removed
+        ones and restore the model's order - untouched rows are kept."""
+        order = [ff.id for ff in model.fields]
+        if len(set(order)) != len(order):
+            self.load_preview(model)  # ids can't tell rows apart
+            return
+
+        wanted = set(order)
+        for field_id in [i for i in self._field_rows if i not in wanted]:
+            row = self._field_rows.pop(field_id)
+            self.fields.pop(field_id, None)
+            if row is not None:
+                self.form_container.remove(row)
+
+        for ff in model.fields:
+            if ff.id in changed_ids or ff.id not in self._field_rows:
+                old_row = self._field_rows.get(ff.id)
+                self.fields.pop(ff.id, None)
+                row = self._add_field(ff.to_dict())
+                if old_row is not None:
+                    if row is not None:
+                        self.form_container.insert_child_after(row, old_row.get_prev_sibling())
+                    self.form_container.remove(old_row)
+                elif row is not None:
+                    self.form_container.append(row)
+
+        previous = None
+        for field_id in order:
+            row = self._field_rows[field_id]
+            if row is None:
+                continue
+            if row.get_prev_sibling() is not previous:
+                self.form_container.reorder_child_after(row, previous)
+            previous = row
+
+    # -- Pages -------------------------------------------------------------
+
+    def _build_pages(self, fields_list: list):
+        """Split the form at its page breaks and show the first page; the
+        widgets of every other page are created when it is first reached."""
+        self._pages = [[]]
+        for field in fields_list:
+            if field.get("type") == "page" and self._pages[-1]:
+                self._pages.append([])
+            self._pages[-1].append(field)
+        self._page_boxes = [None] * len(self._pages)
+        for number, page_fields in enumerate(self._pages):
+            for field in page_fields:
+                self._page_of_field[field.get("id")] = number
+
+        self._back_button = Gtk.Button(label="Back", valign=Gtk.Align.CENTER)
+        self._back_button.connect("clicked", lambda *_: self._show_page(self._current_page - 1))
+        self.nav_start_box.append(self._back_button)
+        self._show_page(0)
+
+    def _show_page(self, number: int):
+        box = self._page_boxes[number]
+        if box is None:
+            box = self._page_boxes[number] = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=12)
+            for field in self._pages[number]:
+                row = self._add_field(field)
+                if row:
+                    box.append(row)
+            self.form_container.append(box)
+        for other in self._page_boxes:
+            if other is not None:
+                other.set_visible(other is box)
+        self._current_page = number
+
+        last = len(self._pages) - 1
+        self._back_button.set_visible(number > 0)
+        self.submit_button.set_label("Submit" if number == last else f"Next ({number + 1}/{last + 1})")
+        scroll = self.form_container.get_ancestor(Gtk.ScrolledWindow)
+        if scroll is not None:
+            scroll.get_vadjustment().set_value(0)
+
+    def _build_all_pages(self):
+        """Create any pages not visited yet (in order, so self.fields keeps
+        the form's column order), staying on the current one."""
+        current = self._current_page
+        missing = [number for number, box in enumerate(self._page_boxes) if box is None]
+        for number in missing:
+            self._show_page(number)
+        if missing:
+            self._show_page(current)
+
+    def _validate_page(self, number: int) -> bool:
+        for field_id, field_dict in self.fields.items():
+            if self._page_of_field.get(field_id) != number:
+                continue
+            widget = field_dict["widget"]
+            if not self.validate_field_value(widget, field_dict, self.get_value_from_field(widget)):
+                return False
+        return True
+
     def _create_field(self, label_text: str, field: dict):
         field_type = field.get("type")
 
@@ -150,22 +276,35 @@ class FormPage(Gtk.Box):
             help_label.add_css_class("caption")
             row.append(help_label)
 
+        option_model = self._option_model(field) if field_type in ("dropdown", "radio") else None
+
         if field_type == "entry":
             widget = Gtk.Entry()
             placeholder = field.get("placeholder", "")
             if placeholder:
                 widget.set_placeholder_text(placeholder)
             row.append(widget)
+        elif field_type == "lookup":
+            widget = Gtk.Entry()
+            placeholder = field.get("placeholder", "")
+            if placeholder:
+                widget.set_placeholder_text(placeholder)
+            if field.get("lookup_source") and not self._preview:
+                widget.connect("changed", self._on_lookup_changed, field)
+            row.append(widget)
         elif field_type == "check":
             widget = Gtk.CheckButton.new_with_label(label_text)
             row.append(widget)
+        elif option_model is not None and self._wants_search(field, option_model):
+            # A radio group this big becomes a dropdown too, left unselected
+            # so "required" still means picking something.
+            widget = self._searchable_dropdown(option_model, unselected=field_type == "radio")
+            row.append(widget)
         elif field_type == "dropdown":
-            options = field.get("options", [])
-            string_list = Gtk.StringList.new(options)
-            widget = Gtk.DropDown.new(string_list, None)
+            widget = Gtk.DropDown.new(option_model, None)
             row.append(widget)
         elif field_type == "radio":
-            options = field.get("options")
+            options = [option_model.get_string(i) for i in range(option_model.get_n_items())]
             if not options:
                 return None, None, label
             widget = []
@@ -189,6 +328,14 @@ class FormPage(Gtk.Box):
             row.append(widget)
         elif field_type == "label":
             return row, None, label
+        elif field_type == "page":
+            # Heading of the page it starts; in the builder preview, where
+            # the whole form is one page, a separator marks the break.
+            label.add_css_class("title-2")
+            label.set_visible(bool(label_text))
+            if self._preview:
+                row.prepend(Gtk.Separator())
+            return row, None, label
         elif field_type == "picture":
             try:
                 file = Gio.File.new_for_uri(field.get("uri", ""))
@@ -235,16 +382,81 @@ class FormPage(Gtk.Box):
 
         return row, widget, label
 
+    # -- Lookups -------------------------------------------------------------
+
+    def _on_lookup_changed(self, entry: Gtk.Entry, field: dict):
+        table = lookup_index.lookup_table(field["lookup_source"], field.get("key_column", ""), self.config_dir)
+        record = table.lookup(entry.get_text())
+        entry.set_icon_from_icon_name(Gtk.EntryIconPosition.SECONDARY, "object-select-symbolic" if record else None)
+        if record is not None:
+            self._fill_from_lookup(field, record)
+        elif table.building:
+            # Still indexing the roster: look again once it's done.
+            table.when_built(lambda: self._on_lookup_changed(entry, field))
+
+    def _fill_from_lookup(self, field: dict, record: dict[str, str]):
+        """Copy the matched row's columns into the fields named in the
+        lookup's "fill" (roster column -> field label)."""
+        ids_by_label = {}
+        for other in self.config.get("fields", []):
+            ids_by_label.setdefault(other.get("label"), other.get("id"))
+        for column, target_label in (field.get("fill") or {}).items():
+            target_id = ids_by_label.get(target_label)
+            if column not in record or target_id is None or target_id == field.get("id"):
+                continue
+            if target_id in self.fields:
+                self._set_field_value(self.fields[target_id]["widget"], record[column])
+            else:
+                self._pending_fills[target_id] = record[column]
+
+    def _set_field_value(self, widget, value: str):
+        """Inverse of get_value_from_field, from text; values a widget
+        can't show are ignored."""
+        if isinstance(widget, Gtk.Entry):
+            widget.set_text(value)
+        elif isinstance(widget, Gtk.TextView):
+            widget.get_buffer().set_text(value)
+        elif isinstance(widget, list):
+            for indv_widget in widget:
+                if indv_widget.get_label() == value:
+                    indv_widget.set_active(True)
+        elif isinstance(widget, Gtk.CheckButton):
+            widget.set_active(value.strip().lower() in ("true", "yes", "1"))
+        elif isinstance(widget, Gtk.Calendar):
+            try:
+                day = datetime.strptime(value.strip(), "%Y-%m-%d")
+            except ValueError:
+                return
+            widget.select_day(GLib.DateTime.new_local(day.year, day.month, day.day, 0, 0, 0))
+        elif isinstance(widget, Gtk.SpinButton):
+            try:
+                widget.set_value(float(value))
+            except ValueError:
+                pass
+        elif isinstance(widget, Gtk.DropDown):
+            model = widget.get_model()
+            if isinstance(model, Gtk.StringList):
+                position = model.find(value)
+                if position != Gtk.INVALID_LIST_POSITION:
+                    widget.set_selected(position)
+
     @Gtk.Template.Callback()
     def on_submit_clicked(self, *_):
         if self._preview:
             return
 
+        if self._pages and self._current_page < len(self._pages) - 1:
+            if self._validate_page(self._current_page):
+                self._show_page(self._current_page + 1)
+            return
+
         data = self._collect_data()
         if not data:
             return
-        self._append_to_csv(data)
+        if not self._append_to_csv(data):
+            return
         self._reset_form()
+        self._show_write_latency()
 
         if self._kiosk_manager:
             self._kiosk_manager.show_thankyou()
@@ -255,6 +467,8 @@ class FormPage(Gtk.Box):
 
     def _collect_data(self) -> dict | None:
         data = {}
+        # Every field needs a value for its column, visited page or not.
+        self._build_all_pages()
 
         for field_id, field_dict in self.fields.items():
             widget = field_dict["widget"]
@@ -264,11 +478,49 @@ class FormPage(Gtk.Box):
                 return None
             validate_result = self.validate_field_value(widget, field_dict, field_value)
             if validate_result is None or not validate_result:
+                if self._pages:
+                    self._show_page(self._page_of_field.get(field_id, self._current_page))
                 return None
             data[field_id] = field_value
 
         return data
 
+    def _option_model(self, field: dict) -> Gtk.StringList:
+        """A radio or dropdown field's options: the shared list read from its
+        options_source, or its inline options."""
+        source = field.get("options_source")
+        if source:
+            try:
+                return option_sources.options_model(source, self.config_dir)
+            except OSError:
+                toast = Adw.Toast.new(f"Could not read options from {source}")
+                toast.set_timeout(4)
+                self.form_toast_overlay.add_toast(toast)
+        return Gtk.StringList.new(field.get("options") or [])
+
+    @staticmethod
+    def _wants_search(field: dict, options: Gtk.StringList) -> bool:
+        try:
+            threshold = int(field.get("search_threshold") or 0)
+        except (TypeError, ValueError):
+            threshold = 0  # not a number in a hand-edited config
+        return threshold > 0 and options.get_n_items() > threshold
+
+    @staticmethod
+    def _searchable_dropdown(options: Gtk.StringList, unselected: bool = False) -> Gtk.DropDown:
+        """A dropdown whose popup has a search entry: typing filters the
+        options through the dropdown's string filter, and the popup's list
+        view only creates rows for what is on screen."""
+        widget = Gtk.DropDown.new(
+            options,
+            Gtk.PropertyExpression.new(Gtk.StringObject, None, "string"),
+        )
+        widget.set_enable_search(True)
+        widget.set_search_match_mode(Gtk.StringFilterMatchMode.SUBSTRING)
+        if unselected:
+            widget.set_selected(Gtk.INVALID_LIST_POSITION)
+        return widget
+
     def get_value_from_field(self, widget):
         field_value = None
         if isinstance(widget, Gtk.Entry):
@@ -326,52 +578,62 @@ class FormPage(Gtk.Box):
             field_dict["label_widget"].remove_css_class("error")
         return True
 
-    def _append_to_csv(self, data: dict):
+    def _append_to_csv(self, data: dict) -> bool:
+        """Journal the response and queue it for the CSV; the disk I/O on
+        the CSV itself happens on submission_queue's writer thread.
+        Returns False if the response wasn't taken."""
         if self.page is None:
             show_fatal_toast(self.form_toast_overlay)
-            return
+            return False
 
         file = self.page.csv_file
 
         if not file:
             show_fatal_toast(self.form_toast_overlay)
-            return
+            return False
 
         path = file.get_path()
         if path is None:
             show_fatal_toast(self.form_toast_overlay)
-            return
+            return False
 
-        is_new_file = not os.path.exists(path) or os.stat(path).st_size == 0
         timestamp = datetime.now(timezone.utc).isoformat(timespec="seconds")
-
-        if is_new_file:
-            row = {_TIMESTAMP_LABEL: timestamp}
-            row.update(self._labeled_row(data))
-            fieldnames = list(row.keys())
-        else:
-            # keep whatever header the file already has, fill it positionally
-            fieldnames = self._read_csv_header(path)
-            values = list(data.values())
-            if fieldnames[:1] == [_TIMESTAMP_LABEL]:
-                values = [timestamp] + values
-            row = dict(zip(fieldnames, values))
-
         try:
-            with open(path, "a", newline="", encoding="utf-8") as f:
-                writer = csv.DictWriter(f, fieldnames=fieldnames)
-
-                if is_new_file:
-                    writer.writeheader()
-
-                writer.writerow(row)
+            # A new CSV gets a labeled header; an existing one keeps its own
+            # and is filled positionally.
+            accepted = submission_queue.submit(
+                self._response_writer(path),
+                timestamp,
+                list(data.values()),
+                list(self._labeled_row(data)),
+                on_written=self._on_response_written,
+                on_error=lambda e: GLib.idle_add(self._on_response_write_failed, e),
+            )
         except Exception as _e:
             show_fatal_toast(self.form_toast_overlay)
-            return
+            return False
 
+        if not accepted:
+            toast = Adw.Toast.new("Still saving earlier responses, please submit again in a moment")
+            toast.set_timeout(3)
+            self.form_toast_overlay.add_toast(toast)
+            return False
+        return True
+
+    def _on_response_written(self):
+        """Runs on the writer thread once the row is in the CSV."""
         sync_worker = getattr(self.page, "sync_worker", None)
         if sync_worker is not None:
-            sync_worker.trigger()
+            sync_worker.trigger(coalesce=True)
+
+    def _on_response_write_failed(self, error: Exception):
+        if isinstance(error, NotDurableError):
+            toast = Adw.Toast.new(f"{error.strerror}. It's kept and will be rechecked on the next start.")
+        else:
+            toast = Adw.Toast.new(f"Couldn't write to the CSV, retrying: {error}")
+        toast.set_timeout(4)
+        self.form_toast_overlay.add_toast(toast)
+        return GLib.SOURCE_REMOVE
 
     def _labeled_row(self, data: dict) -> dict:
         """Map field-id keys to their labels, de-duplicating any that collide."""
@@ -385,12 +647,23 @@ class FormPage(Gtk.Box):
             row[unique_label] = value
         return row
 
-    def _read_csv_header(self, path: str) -> list:
-        try:
-            with open(path, newline="", encoding="utf-8") as f:
-                return next(csv.reader(f), [])
-        except OSError:
-            return []
+    def _response_writer(self, path: str) -> ResponseWriter:
+        """The tab's writer for `path`, holding the CSV open until the tab closes."""
+        writer = getattr(self.page, "response_writer", None)
+        if writer is None or writer.csv_path != path:
+            if writer is not None:
+                submission_queue.close_writer(writer)
+            writer = self.page.response_writer = ResponseWriter(path, get_durability(), get_group_commit_ms())
+        return writer
+
+    def _show_write_latency(self):
+        writer = getattr(self.page, "response_writer", None)
+        if writer is None or writer.average_latency is None:
+            return
+        self.submit_button.set_tooltip_text(
+            f"Responses reach the disk {writer.average_latency * 1000:.0f} ms after submitting "
+            f"(last: {writer.last_latency * 1000:.0f} ms)"
+        )
 
     def _reset_form(self):
         for fields_dict in self.fields.values():
@@ -410,7 +683,13 @@ class FormPage(Gtk.Box):
             elif isinstance(widget, Gtk.CheckButton):
                 widget.set_active(False)
             elif isinstance(widget, Gtk.DropDown):
-                widget.set_selected(0)
+                if fields_dict["config"].get("type") == "radio":
+                    widget.set_selected(Gtk.INVALID_LIST_POSITION)
+                else:
+                    widget.set_selected(0)
+        self._pending_fills.clear()
+        if self._pages:
+            self._show_page(0)
 
     def _update_kiosk_toggle(self, active: bool):
         if active:
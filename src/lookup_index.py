@@ -0,0 +1,322 @@
+# lookup_index.py
+#
+# Copyright 2025 Aryan Kaushik
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+"""
+Key lookups in a reference CSV (a roster) for "lookup" fields: type a
+badge ID, get that attendee's row.
+
+The index maps a 64-bit hash of each row's key (trimmed, case-folded) to
+the byte offset where the row starts: two arrays of unsigned 64-bit ints,
+hashes sorted with offsets alongside, after a small header naming the
+roster version they describe. A lookup is a binary search of the
+memory-mapped hashes plus one seek and one row parse in the roster, with
+the key compared so hash collisions can't return the wrong row.
+
+Index files live in the user cache dir, one per roster and key column,
+and are reused across runs while the roster's inode, mtime and size still
+match. When those change, the index is rebuilt on a background thread;
+until it is swapped in, lookups keep answering from the old roster
+snapshot, which the table holds open. If the cache dir can't be written,
+the arrays just stay in memory.
+"""
+
+import hashlib
+import mmap
+import os
+import struct
+import threading
+from array import array
+from bisect import bisect_left
+from collections.abc import Callable
+
+from gi.repository import GLib
+
+from .csv_index import iter_records, parse_records
+
+# magic, roster inode, roster mtime_ns, roster size, key column, row count
+_HEADER = struct.Struct("<8sQQQQQ")
+_MAGIC = b"OFLKP\x00\x00\x01"
+_ENTRY_SIZE = array("Q").itemsize
+
+# Records parsed per csv.reader call while building.
+_PARSE_BATCH = 1024
+
+
+def _index_dir() -> str:
+    return os.path.join(GLib.get_user_cache_dir(), "in.aryank.openforms", "lookup")
+
+
+def _index_path(roster_path: str, key_column: str) -> str:
+    name = hashlib.sha256(f"{roster_path}\0{key_column}".encode("utf-8")).hexdigest()[:32]
+    return os.path.join(_index_dir(), name + ".idx")
+
+
+def normalize_key(key: str) -> str:
+    return key.strip().casefold()
+
+
+def _key_hash(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def _records(f, offset: int, size: int):
+    """iter_records(), plus a last record with no trailing newline - a
+    roster isn't being appended to, so that one is complete."""
+    end = offset
+    for start, raw in iter_records(f, offset):
+        yield start, raw
+        end = start + len(raw)
+    if end < size:
+        f.seek(end)
+        yield end, f.read(size - end)
+
+
+class LookupTable:
+    """Key -> row lookups in one roster. Get one with lookup_table()."""
+
+    def __init__(self, roster_path: str, key_column: str):
+        self.roster_path = roster_path
+        self.key_column = key_column
+        self.header: list[str] | None = None
+
+        self._lock = threading.Lock()
+        # (inode, mtime_ns, size) of the roster the open index describes.
+        self._stamp: tuple[int, int, int] | None = None
+        # ... and of one that couldn't be indexed, not to be retried.
+        self._failed_stamp: tuple[int, int, int] | None = None
+        self._key_index = 0
+        self._hashes: memoryview | array | None = None
+        self._offsets: memoryview | array | None = None
+        self._view: memoryview | None = None
+        self._map: mmap.mmap | None = None
+        self._roster = None
+        self._building = False
+        self._on_built: list[Callable[[], None]] = []
+        self.refresh()
+
+    # -- Lookups -------------------------------------------------------------
+
+    @property
+    def ready(self) -> bool:
+        return self._hashes is not None
+
+    @property
+    def building(self) -> bool:
+        return self._building
+
+    def lookup(self, key: str) -> dict[str, str] | None:
+        """The first roster row whose key column matches `key` (ignoring
+        case and surrounding space), as column name -> value."""
+        self.refresh()
+        wanted = normalize_key(key)
+        if not wanted:
+            return None
+        key_hash = _key_hash(wanted)
+        with self._lock:
+            if self._hashes is None:
+                return None
+            hashes, count = self._hashes, len(self._hashes)
+            i = bisect_left(hashes, key_hash)
+            while i < count and hashes[i] == key_hash:
+                row = self._row_at(self._offsets[i])
+                if row is not None and len(row) > self._key_index and normalize_key(row[self._key_index]) == wanted:
+                    return dict(zip(self.header, row))
+                i += 1
+        return None
+
+    def when_built(self, callback: Callable[[], None]) -> None:
+        """Call `callback` on the main thread once the rebuild in progress
+        finishes (right away, on the next idle, if there isn't one)."""
+        with self._lock:
+            if self._building:
+                self._on_built.append(callback)
+                return
+        GLib.idle_add(lambda: callback() and False)
+
+    def _row_at(self, offset: int) -> list[str] | None:
+        """Called holding the lock."""
+        try:
+            raw = next(_records(self._roster, offset, self._stamp[2]), None)
+            rows = parse_records([raw[1]]) if raw is not None else []
+        except (OSError, UnicodeDecodeError):
+            return None
+        return rows[0] if rows else None
+
+    # -- Building ------------------------------------------------------------
+
+    def refresh(self) -> None:
+        """Start a background rebuild if the roster changed since the open
+        index was built - one stat when it hasn't."""
+        try:
+            st = os.stat(self.roster_path)
+        except OSError:
+            return
+        with self._lock:
+            stamp = (st.st_ino, st.st_mtime_ns, st.st_size)
+            if self._building or stamp == self._stamp or stamp == self._failed_stamp:
+                return
+            self._building = True
+        threading.Thread(target=self._build_loop, daemon=True).start()
+
+    def _build_loop(self) -> None:
+        while True:
+            try:
+                self._load()
+                loaded = True
+            except (OSError, UnicodeDecodeError, ValueError):
+                loaded = False  # unreadable roster: keep whatever we had
+            try:
+                st = os.stat(self.roster_path)
+                current = (st.st_ino, st.st_mtime_ns, st.st_size)
+            except OSError:
+                current = None
+            with self._lock:
+                # Changed again while we were building? Go round once more.
+                if not loaded or current is None or current == self._stamp:
+                    if not loaded:
+                        self._failed_stamp = current
+                    self._building = False
+                    callbacks, self._on_built = self._on_built, []
+                    break
+        for callback in callbacks:
+            GLib.idle_add(lambda callback=callback: callback() and False)
+
+    def _load(self) -> None:
+        roster = open(self.roster_path, "rb")
+        try:
+            st = os.fstat(roster.fileno())
+            stamp = (st.st_ino, st.st_mtime_ns, st.st_size)
+            first = next(_records(roster, 0, st.st_size), None)
+            if first is None:
+                raise ValueError("empty roster")
+            header = parse_records([first[1]])[0]
+            if header:
+                header[0] = header[0].lstrip("\ufeff")
+            if self.key_column and self.key_column not in header:
+                raise ValueError(f"no column {self.key_column!r}")
+            key_index = header.index(self.key_column) if self.key_column else 0
+
+            index_path = _index_path(self.roster_path, self.key_column)
+            mapped = _map_index(index_path, stamp, key_index)
+            if mapped is None:
+                hashes, offsets = _scan(roster, len(first[1]), st.st_size, key_index)
+                try:
+                    _write_index(index_path, stamp, key_index, hashes, offsets)
+                    mapped = _map_index(index_path, stamp, key_index)
+                except OSError:
+                    pass  # read-only cache dir: use the arrays as they are
+                if mapped is None:
+                    mapped = (None, None, hashes, offsets)
+        except BaseException:
+            roster.close()
+            raise
+
+        with self._lock:
+            self._close_locked()
+            self._map, self._view, self._hashes, self._offsets = mapped
+            self._roster = roster
+            self._stamp = stamp
+            self.header = header
+            self._key_index = key_index
+
+    def _close_locked(self) -> None:
+        for view in (self._hashes, self._offsets, self._view):
+            if isinstance(view, memoryview):
+                view.release()
+        if self._map is not None:
+            self._map.close()
+        if self._roster is not None:
+            self._roster.close()
+        self._map = self._view = self._hashes = self._offsets = self._roster = None
+
+
+def _scan(roster, header_end: int, size: int, key_index: int) -> tuple[array, array]:
+    """Hash every row's key; returns (hashes, offsets) sorted by hash, rows
+    with equal hashes in file order."""
+    pairs: list[tuple[int, int]] = []
+    batch: list[tuple[int, bytes]] = []
+
+    def flush():
+        rows = parse_records([raw for _start, raw in batch])
+        for (start, _raw), row in zip(batch, rows):
+            if len(row) > key_index:
+                key = normalize_key(row[key_index])
+                if key:
+                    pairs.append((_key_hash(key), start))
+        batch.clear()
+
+    for record in _records(roster, header_end, size):
+        batch.append(record)
+        if len(batch) >= _PARSE_BATCH:
+            flush()
+    flush()
+    pairs.sort()
+    return array("Q", (h for h, _o in pairs)), array("Q", (o for _h, o in pairs))
+
+
+def _write_index(path: str, stamp: tuple[int, int, int], key_index: int, hashes: array, offsets: array) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as out:
+        out.write(_HEADER.pack(_MAGIC, *stamp, key_index, len(hashes)))
+        hashes.tofile(out)
+        offsets.tofile(out)
+    os.replace(tmp_path, path)
+
+
+def _map_index(path: str, stamp: tuple[int, int, int], key_index: int):
+    """(mmap, view, hashes, offsets) for the index at `path`, or None if it
+    is missing or describes another version of the roster."""
+    try:
+        with open(path, "rb") as f:
+            raw_header = f.read(_HEADER.size)
+            if len(raw_header) < _HEADER.size:
+                return None
+            magic, inode, mtime_ns, size, saved_key, count = _HEADER.unpack(raw_header)
+            length = _HEADER.size + 2 * count * _ENTRY_SIZE
+            if (
+                magic != _MAGIC
+                or (inode, mtime_ns, size) != stamp
+                or saved_key != key_index
+                or os.fstat(f.fileno()).st_size < length
+            ):
+                return None
+            if not count:
+                return None, None, array("Q"), array("Q")
+            mapped = mmap.mmap(f.fileno(), length, access=mmap.ACCESS_READ)
+    except OSError:
+        return None
+    view = memoryview(mapped)
+    entries = view[_HEADER.size:].cast("Q")
+    return mapped, view, entries[:count], entries[count:]
+
+
+_tables: dict[tuple[str, str], LookupTable] = {}
+_tables_lock = threading.Lock()
+
+
+def lookup_table(roster_path: str, key_column: str = "", base_dir: str = "") -> LookupTable:
+    """The process-wide table for a roster (relative to `base_dir`, the
+    form config's folder) and key column (the first column if empty),
+    shared by every form and tab using it."""
+    roster_path = os.path.abspath(os.path.join(base_dir, os.path.expanduser(roster_path)))
+    with _tables_lock:
+        table = _tables.get((roster_path, key_column))
+        if table is None:
+            table = _tables[(roster_path, key_column)] = LookupTable(roster_path, key_column)
+    return table
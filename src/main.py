@@ -25,6 +25,7 @@ gi.require_version("Gtk", "4.0")
 gi.require_version("Adw", "1")
 
 from gi.repository import Gio, Adw  # noqa: E402
+from .submission_queue import replay_journals  # noqa: E402
 from .window import OpenFormsWindow  # noqa: E402
 
 _ = gettext.gettext
@@ -56,6 +57,8 @@ class OpenFormsApplication(Adw.Application):
         win = self.props.active_window
         if not win:
             win = OpenFormsWindow(application=self)
+            # Responses a crashed session accepted but never wrote to their CSV.
+            replay_journals()
         win.present()
 
     def on_about_action(self, *args):
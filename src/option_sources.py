@@ -0,0 +1,72 @@
+# option_sources.py
+#
+# Copyright 2025 Aryan Kaushik
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+"""
+Option lists kept in a file rather than inline in the form JSON - a radio
+or dropdown field's "options_source": a text file with one option per
+line, or a CSV whose first column (below its header row) holds them.
+
+Each file is parsed once per version: the process-wide cache is keyed by
+path and checked against the file's mtime and size, and holds the options
+as a single Gtk.StringList - the strings live in C, not as a Python object
+apiece - which every dropdown using the file, in any tab or form, shares
+as its model. Treat it as read-only. Main thread only, like the widgets.
+"""
+
+import csv
+import os
+
+from gi.repository import Gtk
+
+# Absolute path -> ((mtime_ns, size), options). A changed file gets a new
+# StringList; widgets built from the old one keep it until they go.
+_cache: dict[str, tuple[tuple[int, int], Gtk.StringList]] = {}
+
+
+def resolve(path: str, base_dir: str = "") -> str:
+    """`path` made absolute; a relative one is taken from `base_dir` (the
+    form config's folder), or the working directory if that's empty."""
+    return os.path.abspath(os.path.join(base_dir, os.path.expanduser(path)))
+
+
+def options_model(path: str, base_dir: str = "") -> Gtk.StringList:
+    """The shared list of options in `path` (relative to `base_dir`).
+    Raises OSError if the file can't be read (or isn't UTF-8 text)."""
+    path = resolve(path, base_dir)
+    st = os.stat(path)
+    stamp = (st.st_mtime_ns, st.st_size)
+    cached = _cache.get(path)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    model = Gtk.StringList.new(_read_options(path))
+    _cache[path] = (stamp, model)
+    return model
+
+
+def _read_options(path: str) -> list[str]:
+    try:
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            if path.lower().endswith(".csv"):
+                rows = csv.reader(f)
+                next(rows, None)  # header
+                options = [row[0].strip() for row in rows if row]
+            else:
+                options = [line.strip() for line in f]
+    except (UnicodeDecodeError, csv.Error) as e:
+        raise OSError(f"{path}: {e}") from e
+    return [option for option in options if option]
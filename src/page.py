@@ -18,6 +18,7 @@
 # SPDX-License-Identifier: GPL-3.0-or-later
 
 from gi.repository import Adw, Gio, Gtk
+from .csv_writer import ResponseWriter
 from .form_config import FormConfig
 from .sync.worker import SyncWorker
 
@@ -38,6 +39,8 @@ class NewPage(Gtk.Box):
         self.form_config: dict | None = None
         self.tab_page: Adw.TabPage | None = None
         self.sync_worker: SyncWorker | None = None
+        # Set up by FormPage on the first submission; holds the CSV open until the tab closes.
+        self.response_writer: ResponseWriter | None = None
 
     def set_tab_page(self, tab_page: Adw.TabPage) -> None:
         self.tab_page = tab_page
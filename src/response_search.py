@@ -0,0 +1,227 @@
+# response_search.py
+#
+# Copyright 2025 Aryan Kaushik
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+"""
+In-memory search index for the response viewer. Each cell is normalized
+(case-folded, accents stripped) and split into word tokens; every column
+keeps an inverted index token -> ascending row ids plus a sorted
+vocabulary, so a query term is a bisect for the tokens it prefixes and a
+union of their postings - never a pass over the rows themselves. One-letter
+terms, which prefix a large share of the vocabulary, are answered from a
+separate first-letter index instead.
+
+A query's terms are matched rarest first. Once the result is much smaller
+than a term's postings, the remaining rows are checked against those
+postings one by one (a bisect each) instead of building a set of every row
+a common word like "yes" appears in.
+
+Query syntax: whitespace-separated terms, all of which must match. A term
+matches rows with a word starting with it in any column; `column:term`
+restricts it to columns whose name contains `column`; `#12` matches
+response number 12.
+"""
+
+import bisect
+import re
+import threading
+import unicodedata
+from array import array
+
+_TOKEN_RE = re.compile(r"\w+")
+
+# Distinct (columns, prefix) lookups remembered between keystrokes.
+_PREFIX_CACHE_SIZE = 64
+
+# Check rows against a term's postings one by one, rather than collecting
+# the postings into a set, when they're this many times more numerous.
+_PROBE_RATIO = 8
+
+
+def normalize(text: str) -> str:
+    """Case-fold and strip accents, so "Émile" and "emile" compare equal."""
+    if text.isascii():
+        return text.lower()
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+
+
+def tokenize(text: str) -> list[str]:
+    return _TOKEN_RE.findall(normalize(text))
+
+
+def _normalized_cells(row: list[str], width: int) -> list[str]:
+    """normalize() each cell, in one call per row - \x1f (unit separator)
+    joins the cells and can't occur inside a token."""
+    cells = normalize("\x1f".join(row[:width])).split("\x1f")
+    if len(cells) != min(len(row), width):  # a cell contained \x1f itself
+        cells = [normalize(value) for value in row[:width]]
+    return cells
+
+
+class SearchIndex:
+    """Token index over rows of one CSV. add_rows() may run on a loader
+    thread while search() runs on the main thread."""
+
+    def __init__(self, headers: list[str]):
+        self._columns = [normalize(h) for h in headers]
+        self._postings: list[dict[str, array]] = [{} for _ in headers]
+        self._vocab: list[list[str]] = [[] for _ in headers]
+        # First letter -> rows with a word starting with it, per column and overall.
+        self._initials: list[dict[str, array]] = [{} for _ in headers]
+        self._any_initials: dict[str, array] = {}
+        self._count = 0
+        self._lock = threading.Lock()
+        self._prefix_cache: dict[tuple[tuple[int, ...] | None, str], set[int]] = {}
+
+    def __len__(self) -> int:
+        return self._count
+
+    def add_rows(self, start: int, rows: list[list[str]]) -> None:
+        """Index rows numbered start, start+1, ...; numbering must keep growing."""
+        width = len(self._postings)
+        findall = _TOKEN_RE.findall
+        tokenized = [[set(findall(cell)) if cell else () for cell in _normalized_cells(row, width)] for row in rows]
+        with self._lock:
+            new_tokens: list[set[str]] = [set() for _ in range(width)]
+            for row_id, cells in enumerate(tokenized, start):
+                row_initials = set()
+                for col, tokens in enumerate(cells):
+                    if not tokens:
+                        continue
+                    postings, initials = self._postings[col], self._initials[col]
+                    for token in tokens:
+                        ids = postings.get(token)
+                        if ids is None:
+                            ids = postings[token] = array("I")
+                            new_tokens[col].add(token)
+                        ids.append(row_id)
+                    for initial in {token[0] for token in tokens}:
+                        initials.setdefault(initial, array("I")).append(row_id)
+                        row_initials.add(initial)
+                for initial in row_initials:
+                    self._any_initials.setdefault(initial, array("I")).append(row_id)
+            for vocab, tokens in zip(self._vocab, new_tokens):
+                if tokens:
+                    # Timsort merges the sorted vocabulary with the sorted tail
+                    # in one linear pass.
+                    vocab.extend(sorted(tokens))
+                    vocab.sort()
+            self._count = max(self._count, start + len(rows))
+            self._prefix_cache.clear()
+
+    def search(self, query: str) -> set[int] | None:
+        """Row ids matching every term of `query`, or None for an empty query."""
+        terms = query.split()
+        if not terms:
+            return None
+        with self._lock:
+            clauses: list = []
+            for term in terms:
+                term_clauses = self._term_clauses(term)
+                if term_clauses is None:
+                    return set()
+                clauses.extend(term_clauses)
+            if not clauses:
+                return set(range(self._count))
+            clauses.sort(key=_clause_size)
+            result = self._materialize(clauses[0])
+            for clause in clauses[1:]:
+                if not result:
+                    break
+                if _probe_cost(clause, len(result)) < _clause_size(clause):
+                    result = {row_id for row_id in result if _clause_has(clause, row_id)}
+                else:
+                    result = result & self._materialize(clause)
+        return result
+
+    def _term_clauses(self, term: str) -> list | None:
+        """What `term` requires, as clauses that must all hold: each a set
+        of row ids, or a ((columns, prefix), postings lists) pair to be
+        unioned. [] if it matches every row, None if it matches none."""
+        if term.startswith("#") and term[1:].isdigit():
+            row_id = int(term[1:]) - 1
+            return [{row_id}] if 0 <= row_id < self._count else None
+
+        columns: tuple[int, ...] | None = None  # None: any column
+        column, sep, rest = term.partition(":")
+        if sep and column:
+            wanted = normalize(column)
+            named = tuple(i for i, name in enumerate(self._columns) if wanted in name)
+            if named:
+                columns, term = named, rest
+
+        tokens = tokenize(term)
+        if not tokens:
+            return [] if sep else None
+        clauses = []
+        for token in tokens:
+            key = (columns, token)
+            cached = self._prefix_cache.get(key)
+            clauses.append(cached if cached is not None else (key, self._postings_lists(columns, token)))
+        return clauses
+
+    def _postings_lists(self, columns: tuple[int, ...] | None, prefix: str) -> list:
+        """The postings of every token starting with `prefix`."""
+        postings_lists = []
+        if len(prefix) == 1:
+            if columns is None:
+                postings_lists.append(self._any_initials.get(prefix, ()))
+            else:
+                postings_lists.extend(self._initials[col].get(prefix, ()) for col in columns)
+        else:
+            for col in range(len(self._columns)) if columns is None else columns:
+                vocab, postings = self._vocab[col], self._postings[col]
+                i = bisect.bisect_left(vocab, prefix)
+                while i < len(vocab) and vocab[i].startswith(prefix):
+                    postings_lists.append(postings[vocab[i]])
+                    i += 1
+        return postings_lists
+
+    def _materialize(self, clause) -> set[int]:
+        if isinstance(clause, set):
+            return clause
+        key, postings_lists = clause
+        matches = set().union(*postings_lists)
+        if len(self._prefix_cache) >= _PREFIX_CACHE_SIZE:
+            self._prefix_cache.pop(next(iter(self._prefix_cache)))
+        self._prefix_cache[key] = matches
+        return matches
+
+
+def _clause_size(clause) -> int:
+    """Rows a clause matches, or an upper bound on them."""
+    if isinstance(clause, set):
+        return len(clause)
+    return sum(len(ids) for ids in clause[1])
+
+
+def _probe_cost(clause, rows: int) -> int:
+    """Roughly what checking `rows` rows against a clause one by one costs,
+    in the units of _clause_size()."""
+    lists = 1 if isinstance(clause, set) else len(clause[1])
+    return rows * lists * _PROBE_RATIO
+
+
+def _clause_has(clause, row_id: int) -> bool:
+    if isinstance(clause, set):
+        return row_id in clause
+    for ids in clause[1]:
+        i = bisect.bisect_left(ids, row_id)
+        if i < len(ids) and ids[i] == row_id:
+            return True
+    return False
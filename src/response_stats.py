@@ -0,0 +1,254 @@
+# response_stats.py
+#
+# Copyright 2025 Aryan Kaushik
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+"""
+Per-field aggregates for the response viewer's summary page: option counts
+for radio, dropdown and check fields, value counts for spin (bucketed into a
+histogram when shown), month and weekday counts for calendar, fill rates for
+entry and text, plus submissions per hour from the timestamp column.
+
+The aggregates only ever grow by the rows appended since they were last
+updated, and are kept in `<form>.csv.stats` with the byte offset they cover.
+Like the row index the file is only a cache: it is thrown away if the CSV
+was replaced, its header or the form's field types changed, or the bytes
+before the covered end differ.
+"""
+
+import json
+import os
+import threading
+from datetime import date
+
+from .csv_index import boundary_digest, digest
+from .form_model import TIMESTAMP_LABEL
+
+_VERSION = 1
+
+# Field types that write a CSV column, as FormPage builds them.
+_VALUE_TYPES = ("entry", "text", "lookup", "check", "radio", "dropdown", "calendar", "spin")
+
+# Field type -> how its column is aggregated.
+_KINDS = {
+    "radio": "choice",
+    "dropdown": "choice",
+    "check": "choice",
+    "spin": "number",
+    "calendar": "date",
+}
+
+
+def stats_path(csv_path: str) -> str:
+    """`<form_name>.csv` -> `<form_name>.csv.stats`."""
+    return csv_path + ".stats"
+
+
+def column_fields(headers: list[str], fields: list[dict] | None) -> list[dict | None]:
+    """The field config behind each CSV column, matched by position the way
+    FormPage fills rows; None for the timestamp and any unmatched column."""
+    value_fields = [
+        f for f in fields or () if f.get("type") in _VALUE_TYPES and (f.get("type") != "radio" or f.get("options") or f.get("options_source"))
+    ]
+    first = 1 if headers[:1] == [TIMESTAMP_LABEL] else 0
+    columns: list[dict | None] = [None] * len(headers)
+    for col, field in zip(range(first, len(headers)), value_fields):
+        columns[col] = field
+    return columns
+
+
+def _new_column(kind: str) -> dict:
+    column = {"kind": kind, "blank": 0, "counts": {}}
+    if kind == "date":
+        column["weekdays"] = [0] * 7
+    return column
+
+
+class ResponseStats:
+    """Aggregates over one CSV's rows. Rows are added on loader threads
+    while the summary page reads on the main thread; hold `lock` to read."""
+
+    def __init__(self, headers: list[str], fields: list[dict] | None, header_end: int):
+        self.headers = headers
+        self.fields = column_fields(headers, fields)
+        self.timestamp_column = headers[:1] == [TIMESTAMP_LABEL]
+        kinds = [
+            None if col == 0 and self.timestamp_column else _KINDS.get((field or {}).get("type"), "text")
+            for col, field in enumerate(self.fields)
+        ]
+        self._schema = digest(json.dumps([headers, kinds]).encode("utf-8")).hex()
+        self.lock = threading.Lock()
+        self.end = header_end
+        self.rows = 0
+        self.hours: dict[str, int] = {}  # "YYYY-MM-DDTHH" (UTC) -> submissions
+        self.columns: list[dict | None] = [None if kind is None else _new_column(kind) for kind in kinds]
+        # Offsets of deleted rows already taken out of the counts.
+        self.deleted: set[int] = set()
+
+    # -- Updating ------------------------------------------------------------
+
+    def add_rows(self, offsets: list[int], rows: list[list[str]], end: int) -> None:
+        """Count the rows starting at or after the covered end, then move the
+        end to `end` (just past the last of them)."""
+        with self.lock:
+            fresh = [row for offset, row in zip(offsets, rows) if offset >= self.end]
+            self._count(fresh, 1)
+            self.end = max(self.end, end)
+
+    def remove_rows(self, offsets: list[int], rows: list[list[str]]) -> None:
+        """Take deleted rows back out of the counts."""
+        with self.lock:
+            removed = [
+                row for offset, row in zip(offsets, rows) if offset < self.end and offset not in self.deleted
+            ]
+            self.deleted.update(offset for offset in offsets if offset < self.end)
+            self._count(removed, -1)
+
+    def _count(self, rows: list[list[str]], sign: int) -> None:
+        self.rows += sign * len(rows)
+        hours = self.hours
+        for row in rows:
+            if self.timestamp_column and row:
+                stamp = row[0]
+                if len(stamp) >= 13 and stamp[10] == "T":
+                    key = stamp[:13]
+                    hours[key] = hours.get(key, 0) + sign
+            for value, column in zip(row, self.columns):
+                if column is None:
+                    continue
+                if not value:
+                    column["blank"] += sign
+                    continue
+                kind, counts = column["kind"], column["counts"]
+                if kind == "choice" or kind == "number":
+                    counts[value] = counts.get(value, 0) + sign
+                elif kind == "date":
+                    try:
+                        day = date.fromisoformat(value)
+                    except ValueError:
+                        continue
+                    month = value[:7]
+                    counts[month] = counts.get(month, 0) + sign
+                    column["weekdays"][day.weekday()] += sign
+
+    # -- Persistence ---------------------------------------------------------
+
+    def save(self, csv_path: str) -> None:
+        """Write the cache next to the CSV; skipped silently if it can't be."""
+        try:
+            with open(csv_path, "rb") as f:
+                st = os.fstat(f.fileno())
+                with self.lock:
+                    if self.end > st.st_size:
+                        return
+                    doc = {
+                        "version": _VERSION,
+                        "inode": st.st_ino,
+                        "schema": self._schema,
+                        "end": self.end,
+                        "boundary": boundary_digest(f, self.end).hex(),
+                        "rows": self.rows,
+                        "hours": self.hours,
+                        "columns": self.columns,
+                        "deleted": sorted(self.deleted),
+                    }
+                    text = json.dumps(doc, separators=(",", ":"))
+            _write_cache(csv_path, text)
+        except OSError:
+            pass
+
+    def _restore(self, doc: dict) -> None:
+        self.end = doc["end"]
+        self.rows = doc["rows"]
+        self.hours = doc["hours"]
+        self.columns = doc["columns"]
+        self.deleted = set(doc.get("deleted", ()))
+
+
+def open_stats(csv_path: str, f, headers: list[str], header_end: int, fields: list[dict] | None) -> ResponseStats:
+    """Aggregates for the CSV open as binary file `f`, restored from the
+    cache when it still matches; rows past `stats.end` still need adding."""
+    stats = ResponseStats(headers, fields, header_end)
+    doc = _read_cache(csv_path)
+    if doc is None:
+        return stats
+    st = os.fstat(f.fileno())
+    position = f.tell()  # the caller may be partway through reading records
+    if (
+        doc.get("version") == _VERSION
+        and doc.get("inode") == st.st_ino
+        and doc.get("schema") == stats._schema
+        and header_end <= doc.get("end", -1) <= st.st_size
+        and boundary_digest(f, doc["end"]).hex() == doc.get("boundary")
+    ):
+        stats._restore(doc)
+    f.seek(position)
+    return stats
+
+
+def _read_cache(csv_path: str) -> dict | None:
+    try:
+        with open(stats_path(csv_path), encoding="utf-8") as f:
+            doc = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return doc if isinstance(doc, dict) else None
+
+
+def cached_end(csv_path: str, inode: int) -> int | None:
+    """The offset the cache for `inode` covers up to, if there is one."""
+    doc = _read_cache(csv_path)
+    if doc is None or doc.get("inode") != inode:
+        return None
+    return doc.get("end")
+
+
+def rebase_after_compaction(csv_path: str, old_inode: int, new_end: int, removed: set[int]) -> None:
+    """Carry the cache over a compaction instead of letting the next open
+    rescan every row. `new_end` is where the cache's covered end landed in
+    the rewritten file; `removed` are the offsets of the rows compaction
+    dropped. Only valid if exactly those rows (before the covered end) were
+    already taken out of the counts - otherwise the cache is dropped."""
+    doc = _read_cache(csv_path)
+    if doc is None or doc.get("inode") != old_inode:
+        return
+    end = doc.get("end", 0)
+    if {offset for offset in removed if offset < end} != set(doc.get("deleted", ())):
+        _remove_cache(csv_path)
+        return
+    try:
+        with open(csv_path, "rb") as f:
+            doc["inode"] = os.fstat(f.fileno()).st_ino
+            doc["end"] = new_end
+            doc["boundary"] = boundary_digest(f, new_end).hex()
+            doc["deleted"] = []
+        _write_cache(csv_path, json.dumps(doc, separators=(",", ":")))
+    except OSError:
+        _remove_cache(csv_path)
+
+
+def _write_cache(csv_path: str, text: str) -> None:
+    tmp_path = stats_path(csv_path) + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as out:
+        out.write(text)
+    os.replace(tmp_path, stats_path(csv_path))
+
+
+def _remove_cache(csv_path: str) -> None:
+    try:
+        os.remove(stats_path(csv_path))
+    except OSError:
+        pass
@@ -6,57 +6,384 @@
 
 import csv
 import os
-import shutil
+import threading
+from array import array
+from datetime import datetime
 
-from gi.repository import Adw, Gtk
+from gi.repository import Adw, Gio, GLib, GObject, Gtk, Pango
+
+from .csv_index import digest, iter_records, parse_records
+from .response_search import SearchIndex
+from .response_stats import ResponseStats, open_stats
+from .tombstones import add_tombstones, compact, is_deleted, load_tombstones, tombstone_path
+
+# Rows parsed per batch handed to the main loop while loading. The first
+# batch is small so the top of the list shows up right away.
+_FIRST_LOAD_BATCH = 200
+_LOAD_BATCH = 2000
+# Bytes per row in ResponseViewerDialog._digests.
+_DIGEST_SIZE = len(digest(b""))
+
+# Summary page: spin fields with more distinct values than this are bucketed.
+_HISTOGRAM_BINS = 10
+
+# Live tail: wait this long after the CSV changes before reading, so one
+# append's burst of change events costs a single read.
+_TAIL_SETTLE_MS = 150
+
+
+class ResponseItem(GObject.Object):
+    """One response in the list model. `values` is shared with the dialog's
+    row list, not copied; `index` is the response's position in the CSV."""
+
+    __gtype_name__ = "OpenFormsResponseItem"
+
+    def __init__(self, index: int, values: list[str]):
+        super().__init__()
+        self.index = index
+        self.values = values
+
+
+class ResponseListModel(GObject.Object, Gio.ListModel):
+    """The rows the list shows: every loaded row, or just the ids matching a
+    search, minus rows deleted this session. Items are created on demand, so
+    only the rows the view asks for (the ones on screen) ever get a GObject."""
+
+    __gtype_name__ = "OpenFormsResponseListModel"
+
+    def __init__(self):
+        super().__init__()
+        self._rows: list[list[str]] = []
+        self._visible: array | None = None  # ascending row ids; None shows every row
+        self._hidden: set[int] = set()  # tombstoned, waiting for compaction
+
+    @property
+    def hidden_count(self) -> int:
+        return len(self._hidden)
+
+    def do_get_item_type(self):
+        return ResponseItem
+
+    def do_get_n_items(self) -> int:
+        return len(self._rows) if self._visible is None else len(self._visible)
+
+    def do_get_item(self, position: int) -> ResponseItem | None:
+        if position >= self.do_get_n_items():
+            return None
+        row_id = position if self._visible is None else self._visible[position]
+        return ResponseItem(row_id, self._rows[row_id])
+
+    def set_rows(self, rows: list[list[str]]) -> None:
+        """Show `rows` (kept by reference) unfiltered."""
+        removed = self.do_get_n_items()
+        self._rows, self._visible, self._hidden = rows, None, set()
+        self.items_changed(0, removed, len(rows))
+
+    def rows_appended(self, start: int, matches: set[int] | None) -> None:
+        """Rows from `start` on were appended to the list passed to set_rows();
+        `matches` is the current search result, or None when not searching."""
+        before = self.do_get_n_items()
+        if self._visible is None:
+            added = len(self._rows) - start
+        else:
+            candidates = range(start, len(self._rows)) if matches is None else sorted(i for i in matches if i >= start)
+            new_ids = [i for i in candidates if i not in self._hidden]
+            self._visible.extend(new_ids)
+            added = len(new_ids)
+        if added:
+            self.items_changed(before, 0, added)
+
+    def set_matches(self, matches: set[int] | None) -> None:
+        """Show only row ids in `matches` (None: every row)."""
+        removed = self.do_get_n_items()
+        if matches is None and not self._hidden:
+            self._visible = None
+        else:
+            ids = range(len(self._rows)) if matches is None else sorted(i for i in matches if i < len(self._rows))
+            hidden = self._hidden
+            self._visible = array("I", (i for i in ids if i not in hidden) if hidden else ids)
+        self.items_changed(0, removed, self.do_get_n_items())
+
+    def hide(self, row_ids: list[int], matches: set[int] | None) -> None:
+        """Drop deleted rows from view; `matches` as for set_matches()."""
+        self._hidden.update(row_ids)
+        self.set_matches(matches)
 
 
 class ResponseViewerDialog(Adw.Dialog):
     """
-    Shows collected responses from a CSV file as an expandable card list.
-    Supports text search and per-row deletion (with a backup of the original).
+    Shows collected responses from a CSV file as a virtualized list - only the
+    rows on screen get widgets, and a response's fields are laid out when it
+    is opened. Supports text search and deleting one or several responses:
+    deletes are tombstoned and hidden at once, then compacted into the CSV
+    in one rewrite (with a .bak backup) when the dialog closes. In live mode
+    new responses are tailed from the end of the file as they are written.
+    The summary page shows per-field aggregates, typed by the form's
+    `fields` config when it's given.
     """
 
-    def __init__(self, csv_path: str):
+    def __init__(self, csv_path: str, fields: list[dict] | None = None):
         super().__init__()
         self._csv_path = csv_path
+        self._fields = fields
         self._headers: list[str] = []
-        self._rows: list[dict] = []
-        self._expander_rows: list[tuple[Adw.ExpanderRow, int]] = []
+        self._rows: list[list[str]] = []
+        # Byte offset where each row in _rows starts in the CSV, and the
+        # digest of its record as loaded, _DIGEST_SIZE bytes apiece.
+        self._offsets = array("Q")
+        self._digests = bytearray()
+        self._query = ""
+        self._search_index: SearchIndex | None = None
+        self._stats: ResponseStats | None = None
+        self._loading = False
+        self._load_cancel: threading.Event | None = None
+        self._deleted_this_session = False
+        # Live tail: where the last complete row read ends, and which file it was in.
+        self._tail_offset = 0
+        self._tail_inode: int | None = None
+        self._monitor: Gio.FileMonitor | None = None
+        self._tail_source_id = 0
+        self._tail_running = False
+        self._tail_again = False
 
         self.set_title("Responses")
         self.set_content_width(480)
         self.set_content_height(560)
 
-        self._load_csv()
         self._build_ui()
+        self.connect("closed", self._on_closed)
+        self._load_csv()
+        self._start_monitor()
+
+    # -- Loading -----------------------------------------------------------
 
     def _load_csv(self):
+        """(Re)load the CSV on a worker thread; rows stream into the list in batches."""
+        if self._load_cancel is not None:
+            self._load_cancel.set()
+        self._headers = []
+        self._rows = []
+        self._offsets = array("Q")
+        self._digests = bytearray()
+        self._search_index = None
+        self._stats = None
+        self._tail_offset, self._tail_inode = 0, None
+        self._model.set_rows(self._rows)
+
+        # Also cancels any tail read still running against the previous load.
+        cancel = self._load_cancel = threading.Event()
         if not os.path.exists(self._csv_path):
+            self._loading = False
+            self._update_count()
             return
+
+        self._loading = True
+        self._progress_bar.set_fraction(0)
+        self._progress_bar.set_visible(True)
+        self._update_count()
+        threading.Thread(target=self._load_worker, args=(cancel,), daemon=True).start()
+
+    def _load_worker(self, cancel: threading.Event):
         try:
-            with open(self._csv_path, newline="", encoding="utf-8") as f:
-                reader = csv.DictReader(f)
-                self._headers = list(reader.fieldnames or [])
-                self._rows = list(reader)
-        except Exception:
-            pass
+            if os.path.exists(tombstone_path(self._csv_path)):
+                compact(self._csv_path)  # deletes left over from an earlier session
+        except OSError:
+            pass  # rows stay hidden below; compaction is retried next time
+        tombstones = load_tombstones(self._csv_path)
+        try:
+            with open(self._csv_path, "rb") as f:
+                st = os.fstat(f.fileno())
+                records = iter_records(f, 0)
+                header = next(records, None)
+                if header is None:
+                    GLib.idle_add(self._on_load_finished, cancel, None, 0, st.st_ino)
+                    return
+                headers = parse_records([header[1]])[0]
+                # Built here, off the main thread, and extended batch by batch.
+                index = SearchIndex(headers)
+                # Restored from its cache; only rows past stats.end get counted.
+                stats = open_stats(self._csv_path, f, headers, len(header[1]), self._fields)
+                GLib.idle_add(self._on_headers_loaded, cancel, headers, index, stats, st.st_ino)
+                end = self._stream_rows(cancel, records, index, stats, 0, len(header[1]), st.st_size, tombstones)
+            if end is not None:
+                stats.save(self._csv_path)
+                GLib.idle_add(self._on_load_finished, cancel, None, end, st.st_ino)
+        except (OSError, UnicodeDecodeError, csv.Error) as e:
+            GLib.idle_add(self._on_load_finished, cancel, e, 0, None)
+
+    def _stream_rows(
+        self, cancel, records, index, stats, first_id: int, end: int, size: int, tombstones=None
+    ) -> int | None:
+        """Parse `records` in batches, index and count them and hand them to the main loop.
+        Returns the offset just past the last complete record (`end` if there
+        were none), or None if cancelled."""
+        batch_size = _FIRST_LOAD_BATCH
+        loaded = first_id
+        offsets, raw, digests = [], [], []
+        for start, record in records:
+            if cancel.is_set():
+                return None
+            end = start + len(record)
+            if tombstones and is_deleted(tombstones, start, record):
+                continue
+            offsets.append(start)
+            raw.append(record)
+            digests.append(digest(record))
+            if len(raw) >= batch_size:
+                rows = parse_records(raw)
+                index.add_rows(loaded, rows)
+                stats.add_rows(offsets, rows, end)
+                loaded += len(rows)
+                GLib.idle_add(self._on_rows_loaded, cancel, offsets, b"".join(digests), rows, end / (size or 1))
+                offsets, raw, digests = [], [], []
+                batch_size = _LOAD_BATCH
+        rows = parse_records(raw)
+        index.add_rows(loaded, rows)
+        stats.add_rows(offsets, rows, end)  # also covers trailing deleted rows
+        if rows:
+            GLib.idle_add(self._on_rows_loaded, cancel, offsets, b"".join(digests), rows, 1.0)
+        return end
 
-    def _rewrite_csv(self):
-        backup = self._csv_path + ".bak"
+    def _on_headers_loaded(
+        self, cancel: threading.Event, headers: list[str], index: SearchIndex, stats: ResponseStats, inode: int
+    ):
+        if not cancel.is_set():
+            self._headers = headers
+            self._search_index = index
+            self._stats = stats
+            self._tail_inode = inode  # rows can be deleted before loading finishes
+        return GLib.SOURCE_REMOVE
+
+    def _on_rows_loaded(
+        self, cancel: threading.Event, offsets: list[int], digests: bytes, rows: list[list[str]], progress: float
+    ):
+        if cancel.is_set():
+            return GLib.SOURCE_REMOVE
+        start = len(self._rows)
+        self._rows.extend(rows)
+        self._offsets.extend(offsets)
+        self._digests.extend(digests)
+        self._model.rows_appended(start, self._search(self._query))
+        if self._loading:
+            self._progress_bar.set_fraction(progress)
+        self._update_count()
+        return GLib.SOURCE_REMOVE
+
+    def _on_load_finished(self, cancel: threading.Event, error: Exception | None, end: int, inode: int | None):
+        if cancel.is_set():
+            return GLib.SOURCE_REMOVE
+        self._loading = False
+        self._tail_offset, self._tail_inode = end, inode
+        self._progress_bar.set_visible(False)
+        self._update_count()
+        if error is not None:
+            self._count_label.set_label(f"Couldn't read all responses: {error}")
+        elif self._live_btn.get_active():
+            self._check_tail()  # pick up anything appended while loading
+        return GLib.SOURCE_REMOVE
+
+    def _on_closed(self, *_):
+        if self._load_cancel is not None:
+            self._load_cancel.set()
+        self._stop_monitor()
+        if self._deleted_this_session:
+            threading.Thread(target=_compact_quietly, args=(self._csv_path, self._stats), daemon=True).start()
+
+    # -- Live tail -----------------------------------------------------------
+
+    def _on_live_toggled(self, button: Gtk.ToggleButton):
+        if button.get_active():
+            self._start_monitor()
+            if not self._loading:
+                self._check_tail()
+        else:
+            self._stop_monitor()
+
+    def _start_monitor(self):
+        if self._monitor is not None:
+            return
         try:
-            shutil.copy2(self._csv_path, backup)
-        except Exception:
-            pass
+            self._monitor = Gio.File.new_for_path(self._csv_path).monitor_file(Gio.FileMonitorFlags.WATCH_MOVES, None)
+        except GLib.Error:
+            return  # no monitoring on this filesystem - the list just stays static
+        self._monitor.connect("changed", self._on_file_changed)
+
+    def _stop_monitor(self):
+        if self._monitor is not None:
+            self._monitor.cancel()
+            self._monitor = None
+        if self._tail_source_id:
+            GLib.source_remove(self._tail_source_id)
+            self._tail_source_id = 0
+
+    def _on_file_changed(self, _monitor, _file, _other_file, event: Gio.FileMonitorEvent):
+        if event == Gio.FileMonitorEvent.ATTRIBUTE_CHANGED:
+            return
+        # Appends arrive as bursts of CHANGED events - check once they settle.
+        if not self._tail_source_id:
+            self._tail_source_id = GLib.timeout_add(_TAIL_SETTLE_MS, self._on_tail_timeout)
+
+    def _on_tail_timeout(self):
+        self._tail_source_id = 0
+        self._check_tail()
+        return GLib.SOURCE_REMOVE
+
+    def _check_tail(self):
+        """Read rows appended since the last known offset, or reload from
+        scratch if the file was replaced, truncated or rewritten."""
+        if self._loading:
+            return  # _on_load_finished() checks again
+        if self._tail_running:
+            self._tail_again = True
+            return
+        try:
+            st = os.stat(self._csv_path)
+        except OSError:
+            if self._rows or self._headers:
+                self._load_csv()
+            return
+        if self._tail_offset == 0 or st.st_ino != self._tail_inode or st.st_size < self._tail_offset:
+            if st.st_size or self._rows or self._headers:
+                self._load_csv()
+            return
+        if st.st_size == self._tail_offset or self._search_index is None:
+            return
+
+        self._tail_running = True
+        threading.Thread(
+            target=self._tail_worker,
+            args=(self._load_cancel, self._tail_offset, len(self._rows), self._search_index, self._stats),
+            daemon=True,
+        ).start()
+
+    def _tail_worker(
+        self, cancel: threading.Event, offset: int, first_id: int, index: SearchIndex, stats: ResponseStats
+    ):
+        end = None
         try:
-            with open(self._csv_path, "w", newline="", encoding="utf-8") as f:
-                writer = csv.DictWriter(f, fieldnames=self._headers)
-                writer.writeheader()
-                writer.writerows(self._rows)
-        except Exception:
+            with open(self._csv_path, "rb") as f:
+                size = os.fstat(f.fileno()).st_size
+                end = self._stream_rows(cancel, iter_records(f, offset), index, stats, first_id, offset, size)
+            if end is not None:
+                stats.save(self._csv_path)
+        except (OSError, UnicodeDecodeError, csv.Error):
             pass
+        GLib.idle_add(self._on_tail_finished, cancel, end)
+
+    def _on_tail_finished(self, cancel: threading.Event, end: int | None):
+        self._tail_running = False
+        if end is not None and not cancel.is_set():
+            self._tail_offset = end
+        if self._tail_again:
+            self._tail_again = False
+            self._check_tail()
+        return GLib.SOURCE_REMOVE
+
+    # -- UI construction ---------------------------------------------------
 
     def _build_ui(self):
+        self._nav_view = Adw.NavigationView()
+
         toolbar_view = Adw.ToolbarView()
         header = Adw.HeaderBar()
         toolbar_view.add_top_bar(header)
@@ -68,71 +395,115 @@ class ResponseViewerDialog(Adw.Dialog):
         self._search_entry.connect("search-changed", self._on_search_changed)
         header.set_title_widget(self._search_entry)
 
+        self._select_btn = Gtk.ToggleButton(icon_name="selection-mode-symbolic", tooltip_text="Select responses")
+        self._select_btn.connect("toggled", self._on_select_toggled)
+        header.pack_end(self._select_btn)
+
+        summary_btn = Gtk.Button(icon_name="utilities-system-monitor-symbolic", tooltip_text="Summary")
+        summary_btn.connect("clicked", self._on_summary_clicked)
+        header.pack_end(summary_btn)
+
+        self._live_btn = Gtk.ToggleButton(
+            icon_name="emblem-synchronizing-symbolic", tooltip_text="Show new responses as they arrive", active=True
+        )
+        self._live_btn.connect("toggled", self._on_live_toggled)
+        header.pack_start(self._live_btn)
+
+        self._selected_label = Gtk.Label()
+        delete_selected_btn = Gtk.Button(label="Delete")
+        delete_selected_btn.add_css_class("destructive-action")
+        delete_selected_btn.connect("clicked", self._on_delete_selected_clicked)
+        self._action_bar = Gtk.ActionBar(revealed=False)
+        self._action_bar.pack_start(self._selected_label)
+        self._action_bar.pack_end(delete_selected_btn)
+        toolbar_view.add_bottom_bar(self._action_bar)
+
         # Response count label
         self._count_label = Gtk.Label()
         self._count_label.add_css_class("dim-label")
         self._count_label.add_css_class("caption")
+        self._count_label.set_margin_top(12)
+        self._count_label.set_margin_bottom(4)
 
-        # List
-        self._listbox = Gtk.ListBox()
-        self._listbox.add_css_class("boxed-list")
-        self._listbox.set_selection_mode(Gtk.SelectionMode.NONE)
-
-        clamp = Adw.Clamp(maximum_size=480)
-        inner_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=8)
-        inner_box.set_margin_top(12)
-        inner_box.set_margin_bottom(12)
-        inner_box.set_margin_start(12)
-        inner_box.set_margin_end(12)
-        inner_box.append(self._count_label)
-        inner_box.append(self._listbox)
-        clamp.set_child(inner_box)
-
-        scroll = Gtk.ScrolledWindow(vexpand=True)
-        scroll.set_child(clamp)
-
-        toolbar_view.set_content(scroll)
-        self.set_child(toolbar_view)
-
-        self._populate_list()
-
-    def _populate_list(self):
-        # Clear existing rows
-        while (child := self._listbox.get_first_child()):
-            self._listbox.remove(child)
-        self._expander_rows.clear()
-
-        if not self._rows:
-            placeholder = Adw.ActionRow(
-                title="No responses yet",
-                subtitle="Responses will appear here after the first submission.",
-            )
-            placeholder.add_prefix(
-                Gtk.Image.new_from_icon_name("dialog-information-symbolic")
-            )
-            self._listbox.append(placeholder)
+        self._progress_bar = Gtk.ProgressBar(visible=False)
+        self._progress_bar.add_css_class("osd")
+
+        # Row widgets are created for the visible rows only and recycled
+        # while scrolling; searching swaps the model's row-id list.
+        self._model = ResponseListModel()
+        self._selection = Gtk.MultiSelection(model=self._model)
+        self._selection.connect("selection-changed", lambda *_: self._update_selected_label())
+
+        factory = Gtk.SignalListItemFactory()
+        factory.connect("setup", self._on_row_setup)
+        factory.connect("bind", self._on_row_bind)
+
+        self._list_view = Gtk.ListView(
+            model=Gtk.NoSelection(model=self._model),
+            factory=factory,
+            single_click_activate=True,
+        )
+        self._list_view.add_css_class("navigation-sidebar")
+        self._list_view.connect("activate", self._on_row_activated)
+
+        clamp = Adw.ClampScrollable(maximum_size=480, child=self._list_view)
+        scroll = Gtk.ScrolledWindow(vexpand=True, child=clamp)
+        scroll.set_policy(Gtk.PolicyType.NEVER, Gtk.PolicyType.AUTOMATIC)
+
+        placeholder = Adw.StatusPage(
+            icon_name="dialog-information-symbolic",
+            title="No responses yet",
+            description="Responses will appear here after the first submission.",
+        )
+
+        self._content_stack = Gtk.Stack()
+        self._content_stack.add_named(placeholder, "empty")
+        self._content_stack.add_named(scroll, "list")
+
+        content = Gtk.Box(orientation=Gtk.Orientation.VERTICAL)
+        content.append(self._progress_bar)
+        content.append(self._count_label)
+        content.append(self._content_stack)
+        toolbar_view.set_content(content)
+
+        self._nav_view.add(Adw.NavigationPage(title="Responses", tag="responses", child=toolbar_view))
+        self.set_child(self._nav_view)
+
+    def _update_count(self):
+        total = len(self._rows) - self._model.hidden_count
+        if not total and not self._loading:
+            self._content_stack.set_visible_child_name("empty")
             self._count_label.set_label("")
             return
+        self._content_stack.set_visible_child_name("list")
+        shown = self._model.get_n_items()
+        label = f"{total} response{'s' if total != 1 else ''}"
+        if shown != total:
+            label = f"{shown} of {label}"
+        if self._loading:
+            label = f"Loading… {label}"
+        self._count_label.set_label(label)
 
-        for idx, row in enumerate(self._rows):
-            expander = self._build_response_row(idx, row)
-            self._listbox.append(expander)
-            self._expander_rows.append((expander, idx))
+    # -- Row widgets -------------------------------------------------------
 
-        n = len(self._rows)
-        self._count_label.set_label(f"{n} response{'s' if n != 1 else ''}")
+    def _on_row_setup(self, _factory, list_item: Gtk.ListItem):
+        box = Gtk.Box(spacing=12, margin_top=6, margin_bottom=6, margin_start=6, margin_end=6)
 
-    def _build_response_row(self, original_idx: int, row: dict) -> Adw.ExpanderRow:
-        # Build a human-readable subtitle from the first 2 non-empty values
-        preview_values = [v for v in row.values() if v][:2]
-        subtitle = "  ·  ".join(preview_values) if preview_values else "empty"
+        check = Gtk.CheckButton(valign=Gtk.Align.CENTER, visible=False)
+        check.connect("toggled", self._on_row_check_toggled, list_item)
+        list_item.connect("notify::selected", lambda item, _pspec: check.set_active(item.get_selected()))
+        box.append(check)
 
-        expander = Adw.ExpanderRow(
-            title=f"Response #{original_idx + 1}",
-            subtitle=subtitle,
-        )
+        labels = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, hexpand=True, valign=Gtk.Align.CENTER)
+        title = Gtk.Label(xalign=0)
+        title.add_css_class("heading")
+        subtitle = Gtk.Label(xalign=0, ellipsize=Pango.EllipsizeMode.END)
+        subtitle.add_css_class("dim-label")
+        subtitle.add_css_class("caption")
+        labels.append(title)
+        labels.append(subtitle)
+        box.append(labels)
 
-        # Delete button
         del_btn = Gtk.Button(
             icon_name="user-trash-symbolic",
             valign=Gtk.Align.CENTER,
@@ -140,50 +511,288 @@ class ResponseViewerDialog(Adw.Dialog):
         )
         del_btn.add_css_class("flat")
         del_btn.add_css_class("destructive-action")
-        del_btn.connect("clicked", lambda *_: self._confirm_delete(original_idx, expander))
-        expander.add_suffix(del_btn)
+        del_btn.connect("clicked", lambda *_: self._confirm_delete([list_item.get_item()]))
+        box.append(del_btn)
+        box.append(Gtk.Image.new_from_icon_name("go-next-symbolic"))
+
+        box.check = check
+        box.title_label = title
+        box.subtitle_label = subtitle
+        list_item.set_child(box)
+
+    def _on_row_bind(self, _factory, list_item: Gtk.ListItem):
+        item = list_item.get_item()
+        box = list_item.get_child()
+        box.check.set_visible(self._select_btn.get_active())
+        box.check.set_active(list_item.get_selected())
+        box.title_label.set_label(f"Response #{item.index + 1}")
+        # Build a human-readable subtitle from the first 2 non-empty values
+        preview_values = [v for v in item.values if v][:2]
+        box.subtitle_label.set_label("  ·  ".join(preview_values) if preview_values else "empty")
+
+    def _on_row_activated(self, _list_view, position: int):
+        item = self._model.get_item(position)
+        if item is not None:
+            self._nav_view.push(self._build_detail_page(item))
+
+    def _build_detail_page(self, item: ResponseItem) -> Adw.NavigationPage:
+        """Field-by-field view of one response, built only when it's opened."""
+        toolbar_view = Adw.ToolbarView()
+        header = Adw.HeaderBar()
+        toolbar_view.add_top_bar(header)
+
+        del_btn = Gtk.Button(icon_name="user-trash-symbolic", tooltip_text="Delete this response")
+        del_btn.add_css_class("destructive-action")
+        del_btn.connect("clicked", lambda *_: self._confirm_delete([item]))
+        header.pack_end(del_btn)
 
-        # Field detail rows
-        for key, value in row.items():
+        group = Adw.PreferencesGroup()
+        for key, value in zip(self._headers, item.values):
             detail = Adw.ActionRow(title=key)
             detail.set_subtitle(str(value) if value else "—")
             detail.set_subtitle_selectable(True)
-            expander.add_row(detail)
+            group.add(detail)
 
-        return expander
+        prefs_page = Adw.PreferencesPage()
+        prefs_page.add(group)
+        toolbar_view.set_content(prefs_page)
+        return Adw.NavigationPage(title=f"Response #{item.index + 1}", child=toolbar_view)
 
-    def _confirm_delete(self, original_idx: int, expander: Adw.ExpanderRow):
-        dialog = Adw.AlertDialog(
-            heading="Delete Response?",
-            body=f"Response #{original_idx + 1} will be permanently removed from the CSV. "
-                 "A backup (.bak) will be created first.",
-        )
+    # -- Selection ---------------------------------------------------------
+
+    def _on_select_toggled(self, button: Gtk.ToggleButton):
+        selecting = button.get_active()
+        self._selection.unselect_all()
+        # Swapping the model rebinds the visible rows, showing or hiding their checkboxes.
+        self._list_view.set_model(self._selection if selecting else Gtk.NoSelection(model=self._model))
+        self._list_view.set_single_click_activate(not selecting)
+        self._action_bar.set_revealed(selecting)
+        self._update_selected_label()
+
+    def _on_row_check_toggled(self, check: Gtk.CheckButton, list_item: Gtk.ListItem):
+        if check.get_active() == list_item.get_selected():
+            return
+        position = list_item.get_position()
+        if check.get_active():
+            self._selection.select_item(position, False)
+        else:
+            self._selection.unselect_item(position)
+
+    def _selected_items(self) -> list[ResponseItem]:
+        selected = self._selection.get_selection()
+        return [self._model.get_item(selected.get_nth(i)) for i in range(selected.get_size())]
+
+    def _update_selected_label(self):
+        n = self._selection.get_selection().get_size()
+        self._selected_label.set_label(f"{n} selected")
+
+    def _on_delete_selected_clicked(self, *_):
+        self._confirm_delete(self._selected_items())
+
+    # -- Deletion ----------------------------------------------------------
+
+    def _confirm_delete(self, items: list[ResponseItem | None]):
+        items = [item for item in items if item is not None]
+        if not items:
+            return
+        if len(items) == 1:
+            heading = "Delete Response?"
+            body = f"Response #{items[0].index + 1} will be permanently removed from the CSV."
+        else:
+            heading = f"Delete {len(items)} Responses?"
+            body = f"{len(items)} responses will be permanently removed from the CSV."
+        dialog = Adw.AlertDialog(heading=heading, body=body + " A backup (.bak) will be kept.")
         dialog.add_response("cancel", "Cancel")
         dialog.add_response("delete", "Delete")
         dialog.set_response_appearance("delete", Adw.ResponseAppearance.DESTRUCTIVE)
         dialog.set_default_response("cancel")
         dialog.set_close_response("cancel")
-        dialog.connect("response", self._on_delete_response, original_idx)
+        dialog.connect("response", self._on_delete_response, [item.index for item in items])
         dialog.present(self)
 
-    def _on_delete_response(self, dialog, response: str, original_idx: int):
+    def _on_delete_response(self, dialog, response: str, row_ids: list[int]):
         if response != "delete":
             return
-        if 0 <= original_idx < len(self._rows):
-            self._rows.pop(original_idx)
-            self._rewrite_csv()
-            self._populate_list()
+        row_ids = [i for i in row_ids if i < len(self._offsets)]
+        offsets = [self._offsets[i] for i in row_ids]
+        try:
+            inode = os.stat(self._csv_path).st_ino
+        except OSError as e:
+            self._count_label.set_label(f"Couldn't delete: {e}")
+            return
+        if inode != self._tail_inode:
+            # Compacted or replaced since we read it: our offsets now point
+            # at other rows. Delete nothing and show the file as it is.
+            self._load_csv()
+            self._nav_view.pop_to_tag("responses")
+            self._select_btn.set_active(False)
+            alert = Adw.AlertDialog(
+                heading="Responses Changed",
+                body="The CSV was changed elsewhere since it was loaded, so nothing was deleted. "
+                "It has been reloaded; select the responses to delete again.",
+            )
+            alert.add_response("close", "OK")
+            alert.present(self)
+            return
+        # The digests of the rows as the user saw them: a tombstone only
+        # removes a row whose bytes still match.
+        entries = [(self._offsets[i], bytes(self._digests[i * _DIGEST_SIZE : (i + 1) * _DIGEST_SIZE])) for i in row_ids]
+        try:
+            add_tombstones(self._csv_path, entries)
+        except OSError as e:
+            self._count_label.set_label(f"Couldn't delete: {e}")
+            return
+        if self._stats is not None:
+            self._stats.remove_rows(offsets, [self._rows[i] for i in row_ids])
+        self._deleted_this_session = True
+        self._model.hide(row_ids, self._search(self._query))
+        self._nav_view.pop_to_tag("responses")
+        self._select_btn.set_active(False)
+        self._update_count()
+
+    # -- Summary -----------------------------------------------------------
+
+    def _on_summary_clicked(self, *_):
+        if self._stats is not None:
+            self._nav_view.push(self._build_summary_page())
+
+    def _build_summary_page(self) -> Adw.NavigationPage:
+        """Per-field aggregates as of now; reopen the page to refresh."""
+        toolbar_view = Adw.ToolbarView()
+        toolbar_view.add_top_bar(Adw.HeaderBar())
+
+        prefs_page = Adw.PreferencesPage()
+        stats = self._stats
+        with stats.lock:
+            total = stats.rows
+            if stats.hours:
+                prefs_page.add(_hours_group(stats.hours, total))
+            for header, field, column in zip(stats.headers, stats.fields, stats.columns):
+                if column is not None:
+                    prefs_page.add(_column_group(header, field, column, total))
+
+        toolbar_view.set_content(prefs_page)
+        return Adw.NavigationPage(title="Summary", child=toolbar_view)
+
+    # -- Search ------------------------------------------------------------
+
+    def _search(self, query: str) -> set[int] | None:
+        if not query or self._search_index is None:
+            return None
+        return self._search_index.search(query)
 
     def _on_search_changed(self, entry):
-        query = entry.get_text().strip().lower()
-        for expander, _idx in self._expander_rows:
-            if not query:
-                expander.set_visible(True)
-                continue
-            row_text = (expander.get_title() + " " + expander.get_subtitle()).lower()
-            child = expander.get_first_child()
-            while child:
-                if isinstance(child, Adw.ActionRow):
-                    row_text += " " + (child.get_subtitle() or "").lower()
-                child = child.get_next_sibling()
-            expander.set_visible(query in row_text)
+        self._query = entry.get_text().strip()
+        self._model.set_matches(self._search(self._query))
+        self._update_count()
+
+
+def _bar_row(title: str, count: int, total: int) -> Adw.ActionRow:
+    share = count / total if total else 0
+    row = Adw.ActionRow(title=title, subtitle=f"{count}  ·  {share:.0%}")
+    row.add_suffix(Gtk.LevelBar(value=share, width_request=96, valign=Gtk.Align.CENTER))
+    return row
+
+
+def _hours_group(hours: dict[str, int], total: int) -> Adw.PreferencesGroup:
+    """Submissions per hour of the day, in local time."""
+    by_hour = [0] * 24
+    days = set()
+    for key, count in hours.items():
+        try:
+            local = datetime.fromisoformat(key + ":00+00:00").astimezone()
+        except ValueError:
+            continue
+        by_hour[local.hour] += count
+        if count:
+            days.add(local.date())
+
+    group = Adw.PreferencesGroup(
+        title="Submissions", description=f"{total} response{'s' if total != 1 else ''} over {len(days)} day(s)"
+    )
+    busiest = max(range(24), key=by_hour.__getitem__)
+    group.add(_bar_row(f"Busiest hour: {busiest:02d}:00–{busiest:02d}:59", by_hour[busiest], total))
+    expander = Adw.ExpanderRow(title="By hour of day")
+    for hour, count in enumerate(by_hour):
+        if count:
+            expander.add_row(_bar_row(f"{hour:02d}:00", count, total))
+    group.add(expander)
+    return group
+
+
+def _column_group(header: str, field: dict | None, column: dict, total: int) -> Adw.PreferencesGroup:
+    kind, counts, blank = column["kind"], column["counts"], column["blank"]
+    answered = total - blank
+    group = Adw.PreferencesGroup(title=header)
+    field_type = (field or {}).get("type", "text")
+
+    if kind == "choice":
+        group.set_description(f"{field_type.capitalize()}  ·  {answered} answered")
+        if field_type == "check":
+            labels = {"True": "Checked", "False": "Unchecked"}
+            order = ["True", "False"]
+        else:
+            labels = {}
+            order = [option for option in (field or {}).get("options", []) if isinstance(option, str)]
+        # Configured options first, in form order; anything else after, most common first.
+        extra = sorted((v for v in counts if v not in order), key=lambda v: -counts[v])
+        for value in order + extra:
+            group.add(_bar_row(labels.get(value, value), counts.get(value, 0), total))
+        if blank:
+            group.add(_bar_row("No answer", blank, total))
+
+    elif kind == "number":
+        group.set_description(f"Spin  ·  {answered} answered")
+        for title, count in _histogram(counts, field):
+            group.add(_bar_row(title, count, answered))
+
+    elif kind == "date":
+        group.set_description(f"Calendar  ·  {answered} answered")
+        # The twelve most recent months with answers.
+        for month in sorted(counts)[-12:]:
+            title = datetime.strptime(month, "%Y-%m").strftime("%B %Y")
+            group.add(_bar_row(title, counts[month], answered))
+        expander = Adw.ExpanderRow(title="By weekday")
+        for weekday, count in enumerate(column["weekdays"]):
+            expander.add_row(_bar_row(datetime(2024, 1, 1 + weekday).strftime("%A"), count, answered))
+        group.add(expander)
+
+    else:
+        group.set_description(f"{field_type.capitalize()}")
+        group.add(_bar_row("Filled in", answered, total))
+    return group
+
+
+def _histogram(counts: dict[str, int], field: dict | None) -> list[tuple[str, int]]:
+    """(title, count) rows for a spin field: one per value if there are
+    few of them, else _HISTOGRAM_BINS equal-width buckets."""
+    values = {}
+    for value, count in counts.items():
+        try:
+            number = float(value)
+        except ValueError:
+            continue
+        values[number] = values.get(number, 0) + count
+    if not values:
+        return []
+    if len(values) <= _HISTOGRAM_BINS:
+        return [(f"{number:g}", values[number]) for number in sorted(values)]
+
+    low = min(min(values), float((field or {}).get("min", min(values))))
+    high = max(max(values), float((field or {}).get("max", max(values))))
+    width = (high - low) / _HISTOGRAM_BINS or 1
+    bins = [0] * _HISTOGRAM_BINS
+    for number, count in values.items():
+        bins[min(int((number - low) / width), _HISTOGRAM_BINS - 1)] += count
+    return [
+        (f"{low + i * width:g} – {low + (i + 1) * width:g}", count) for i, count in enumerate(bins)
+    ]
+
+
+def _compact_quietly(csv_path: str, stats: ResponseStats | None) -> None:
+    if stats is not None:
+        stats.save(csv_path)  # with the deletes taken out, so compaction can carry it over
+    try:
+        compact(csv_path)
+    except OSError:
+        pass  # the tombstones stay; the next viewer open retries
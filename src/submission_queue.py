@@ -0,0 +1,325 @@
+# submission_queue.py
+#
+# Copyright 2025 Aryan Kaushik
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+"""
+Gets submissions out of FormPage's button callback. submit() appends the
+response to a small write-ahead journal in the user data dir - local, so
+fast even when the CSV sits on a slow network share - and hands it to a
+background thread through a bounded queue. Each CSV has its own queue
+and thread (a lane), so a form whose CSV can't be written retries in its
+lane without holding up any other form. The lane appends the response to
+the CSV through the tab's ResponseWriter; once the row is durable
+there, a done marker goes into the journal, and the journal is emptied
+whenever nothing is outstanding. A row whose fsync failed gets no marker:
+it stays journaled, so the next startup's replay writes it again unless
+it is found in the CSV.
+
+Each process journals to its own `journal/<pid>-<random>.jsonl`, holding a lock on
+it while it runs (the app is NON_UNIQUE), so a journal nobody holds is one
+left by a crash: replay_journals() moves its unfinished responses into this
+process's pipeline at startup, skipping any that made it into the CSV.
+"""
+
+import fcntl
+import glob
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+from collections.abc import Callable
+
+from gi.repository import GLib
+
+from .csv_index import open_index, update_index
+from .csv_writer import ResponseWriter
+from .form_model import TIMESTAMP_LABEL
+from .sync.settings import get_durability, get_group_commit_ms
+
+# Submissions waiting in one CSV's lane; submit() refuses more.
+_QUEUE_SIZE = 256
+
+# Seconds an idle lane's thread waits for more work before exiting.
+_LANE_IDLE = 60
+
+# Seconds between attempts while the CSV can't be written (e.g. share offline).
+_RETRY_DELAY = 5
+
+
+def _journal_dir() -> str:
+    path = os.path.join(GLib.get_user_data_dir(), "in.aryank.openforms", "journal")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+class _Submission:
+    __slots__ = ("id", "writer", "timestamp", "values", "labels", "on_written", "on_error")
+
+    def __init__(self, id, writer, timestamp, values, labels, on_written=None, on_error=None):
+        self.id = id
+        self.writer = writer
+        self.timestamp = timestamp
+        self.values = values
+        self.labels = labels
+        self.on_written = on_written
+        self.on_error = on_error
+
+
+class _Lane:
+    """The queue and writer thread for one CSV path."""
+
+    __slots__ = ("queue", "thread")
+
+    def __init__(self):
+        self.queue: queue.Queue = queue.Queue(maxsize=_QUEUE_SIZE)
+        self.thread: threading.Thread | None = None
+
+
+class SubmissionPipeline:
+    def __init__(self):
+        self._lanes: dict[str, _Lane] = {}
+        self._lanes_lock = threading.Lock()
+        self._journal = None
+        self._journal_name = f"{os.getpid()}-{uuid.uuid4().hex[:8]}.jsonl"
+        self._journal_lock = threading.Lock()
+        self._next_id = 0
+        self._outstanding: set[int] = set()
+
+    # -- Public ---------------------------------------------------------------
+
+    def submit(
+        self,
+        writer: ResponseWriter,
+        timestamp: str,
+        values: list,
+        labels: list[str],
+        on_written: Callable[[], None] | None = None,
+        on_error: Callable[[Exception], None] | None = None,
+    ) -> bool:
+        """Journal a response and queue it for `writer`. False (nothing
+        recorded) if its CSV's queue is full; raises OSError if the journal
+        can't be written. Callbacks run on the lane's thread."""
+        if self._lane_queue(writer.csv_path).full():
+            return False
+        submission = self._journal_submission(writer.csv_path, timestamp, values, labels)
+        submission.writer, submission.on_written, submission.on_error = writer, on_written, on_error
+        self._put(writer.csv_path, submission)
+        return True
+
+    def close_writer(self, writer: ResponseWriter) -> None:
+        """Close `writer` once everything already queued for it is written."""
+        self._put(writer.csv_path, writer)
+
+    # -- Journal ---------------------------------------------------------------
+
+    def _open_journal(self) -> None:
+        if self._journal is None:
+            journal = open(os.path.join(_journal_dir(), self._journal_name), "a", encoding="utf-8")
+            # Held until the process exits; tells replay this journal is live.
+            fcntl.flock(journal.fileno(), fcntl.LOCK_EX)
+            self._journal = journal
+
+    def _write_journal(self, entries: list[dict]) -> None:
+        self._journal.write("".join(json.dumps(entry, ensure_ascii=False) + "\n" for entry in entries))
+        self._journal.flush()
+        os.fsync(self._journal.fileno())
+
+    def _journal_submission(self, csv_path: str, timestamp: str, values: list, labels: list[str]) -> _Submission:
+        with self._journal_lock:
+            self._open_journal()
+            submission_id = self._next_id
+            self._write_journal(
+                [{"id": submission_id, "csv": csv_path, "ts": timestamp, "values": values, "labels": labels}]
+            )
+            self._next_id += 1
+            self._outstanding.add(submission_id)
+        return _Submission(submission_id, None, timestamp, values, labels)
+
+    def _mark_done(self, submission_id: int) -> None:
+        with self._journal_lock:
+            self._outstanding.discard(submission_id)
+            try:
+                if self._outstanding:
+                    self._write_journal([{"done": submission_id}])
+                else:
+                    # Nothing unfinished: start the journal over instead of growing it.
+                    self._journal.truncate(0)
+                    self._journal.flush()
+                    os.fsync(self._journal.fileno())
+            except OSError:
+                pass  # at worst the response is replayed and found in the CSV
+
+    # -- Lanes -----------------------------------------------------------------
+
+    def _lane_queue(self, csv_path: str) -> queue.Queue:
+        with self._lanes_lock:
+            lane = self._lanes.get(csv_path)
+            return lane.queue if lane is not None else queue.Queue(maxsize=_QUEUE_SIZE)
+
+    def _put(self, csv_path: str, item) -> None:
+        with self._lanes_lock:
+            lane = self._lanes.get(csv_path)
+            if lane is None:
+                lane = self._lanes[csv_path] = _Lane()
+                lane.thread = threading.Thread(target=self._run, args=(csv_path, lane), daemon=True)
+                lane.thread.start()
+            try:
+                lane.queue.put_nowait(item)
+                return
+            except queue.Full:
+                pass
+        # A full lane isn't idle, so it can't retire while we wait for room.
+        lane.queue.put(item)
+
+    def _run(self, csv_path: str, lane: _Lane) -> None:
+        while True:
+            try:
+                item = lane.queue.get(timeout=_LANE_IDLE)
+            except queue.Empty:
+                with self._lanes_lock:
+                    if lane.queue.empty():
+                        # Idle: retire the lane; the next _put() starts a new one.
+                        del self._lanes[csv_path]
+                        return
+                continue
+            if isinstance(item, ResponseWriter):
+                item.close()
+                continue
+            self._write(item)
+
+    def _write(self, submission: _Submission) -> None:
+        while True:
+            try:
+                submission.writer.append(
+                    submission.timestamp,
+                    submission.values,
+                    submission.labels,
+                    on_durable=lambda: self._mark_done(submission.id),
+                    on_not_durable=submission.on_error,
+                )
+                break
+            except OSError as e:
+                if submission.on_error is not None:
+                    submission.on_error(e)
+                # Journaled, so nothing is lost while waiting - later
+                # submissions queue up behind this one to keep CSV order.
+                time.sleep(_RETRY_DELAY)
+        try:
+            update_index(submission.writer.csv_path)
+        except OSError:
+            pass  # the index is only a cache - it catches up next time it's opened
+        if submission.on_written is not None:
+            submission.on_written()
+
+    # -- Replay ----------------------------------------------------------------
+
+    def replay_journals(self) -> int:
+        """Queue the unfinished responses from journals of processes that
+        are gone; returns how many. Runs on a worker thread at startup."""
+        replayed = 0
+        for path in sorted(glob.glob(os.path.join(_journal_dir(), "*.jsonl"))):
+            if os.path.basename(path) == self._journal_name:
+                continue
+            try:
+                replayed += self._replay_journal(path)
+            except OSError:
+                continue
+        return replayed
+
+    def _replay_journal(self, path: str) -> int:
+        with open(path, encoding="utf-8") as f:
+            try:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                return 0  # its process is still running
+            entries, done = [], set()
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # torn last line from the crash
+                if "done" in entry:
+                    done.add(entry["done"])
+                elif "id" in entry:
+                    entries.append(entry)
+            pending = [entry for entry in entries if entry["id"] not in done]
+
+            by_csv: dict[str, list[dict]] = {}
+            for entry in pending:
+                by_csv.setdefault(entry["csv"], []).append(entry)
+            submissions = []
+            for csv_path, csv_entries in by_csv.items():
+                csv_entries = _not_yet_written(csv_path, csv_entries)
+                if not csv_entries:
+                    continue
+                writer = ResponseWriter(csv_path, get_durability(), get_group_commit_ms())
+                for entry in csv_entries:
+                    # Re-journaled here first, so the old journal can go.
+                    submission = self._journal_submission(csv_path, entry["ts"], entry["values"], entry["labels"])
+                    submission.writer = writer
+                    submissions.append(submission)
+                submissions.append(writer)
+            os.remove(path)
+
+        for item in submissions:
+            csv_path = item.csv_path if isinstance(item, ResponseWriter) else item.writer.csv_path
+            self._put(csv_path, item)
+        return sum(1 for item in submissions if isinstance(item, _Submission))
+
+
+def _not_yet_written(csv_path: str, entries: list[dict]) -> list[dict]:
+    """Drop entries whose row is already among the CSV's last rows - written
+    before the crash, but without a done marker."""
+    if not os.path.exists(csv_path):
+        return entries
+    try:
+        with open_index(csv_path) as index:
+            header = index.header_row or []
+            tail = index.read_rows(len(index) - 2 * len(entries))
+    except (OSError, UnicodeDecodeError):
+        return entries
+    written = {tuple(row) for row in tail}
+    width = len(header)
+    remaining = []
+    for entry in entries:
+        values = [entry["ts"], *entry["values"]] if header[:1] == [TIMESTAMP_LABEL] else list(entry["values"])
+        cells = ["" if v is None else str(v) for v in values[:width]]
+        cells += [""] * (width - len(cells))
+        if tuple(cells) not in written:
+            remaining.append(entry)
+    return remaining
+
+
+_pipeline = SubmissionPipeline()
+
+
+def submit(
+    writer: ResponseWriter, timestamp: str, values: list, labels: list[str], on_written=None, on_error=None
+) -> bool:
+    """SubmissionPipeline.submit() on the shared pipeline."""
+    return _pipeline.submit(writer, timestamp, values, labels, on_written, on_error)
+
+
+def close_writer(writer: ResponseWriter) -> None:
+    _pipeline.close_writer(writer)
+
+
+def replay_journals() -> None:
+    """Replay crashed sessions' journals in the background."""
+    threading.Thread(target=_pipeline.replay_journals, daemon=True).start()
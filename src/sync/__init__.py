@@ -58,15 +58,23 @@ class NullBackend(SyncBackend):
         pass
 
     def push_pending(self, csv_path: str, db_path: str) -> int:
-        from .queue import get_last_synced_row, log_sync_ok, read_csv_from, set_last_synced_row
+        from .queue import (
+            advance_sync_cursor,
+            get_last_synced_row,
+            iter_pending_batches,
+            log_sync_ok,
+            transaction,
+        )
 
         last_row = get_last_synced_row(db_path)
-        rows = read_csv_from(csv_path, start=last_row + 1)
-        if not rows:
-            return 0
-        set_last_synced_row(db_path, last_row + len(rows))
-        log_sync_ok(db_path, last_row + 1, last_row + len(rows))
-        return len(rows)
+        pushed = 0
+        for _header, rows, end_offset, source in iter_pending_batches(csv_path, db_path):
+            with transaction(db_path):
+                advance_sync_cursor(db_path, csv_path, last_row + len(rows), end_offset, source)
+                log_sync_ok(db_path, last_row + 1, last_row + len(rows))
+            last_row += len(rows)
+            pushed += len(rows)
+        return pushed
 
 
 @overload
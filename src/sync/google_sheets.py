@@ -19,8 +19,8 @@
 """
 Google Sheets sync backend. Implements the OAuth2 PKCE + local-redirect flow
 and the append API. Uses only the standard library for HTTP (urllib,
-http.server, json) - no google-auth or gspread dependency - to keep the
-Flatpak bundle small.
+http.client via sync/http_pool.py, http.server, json) - no google-auth or
+gspread dependency - to keep the Flatpak bundle small.
 
 The OAuth client id/secret are NOT bundled with the app (there is no server
 component to keep them in). The user brings their own OAuth client from the
@@ -45,17 +45,19 @@ import urllib.parse
 import urllib.request
 from typing import cast
 
-from . import keyring
+from . import http_pool, keyring
 from .backend import SyncBackend, SyncConfig, SyncError
 from .queue import (
+    advance_sync_cursor,
+    clear_config,
     get_config,
     get_last_synced_row,
+    iter_pending_batches,
     log_sync_ok,
-    read_csv_from,
-    read_csv_headers,
     set_config,
-    set_last_synced_row,
+    transaction,
 )
+from .settings import get_header_ttl
 
 AUTH_URL = "https://accounts.google.com/o/oauth2/v2/auth"
 TOKEN_URL = "https://oauth2.googleapis.com/token"
@@ -66,7 +68,7 @@ SCOPE = "https://www.googleapis.com/auth/spreadsheets"
 # clock skew and in-flight request time.
 _TOKEN_REFRESH_SKEW = 60
 
-# Applied to every urlopen() call below - otherwise a stalled connection
+# Applied to every http_pool.urlopen() call below - otherwise a stalled connection
 # blocks the worker thread forever with no error surfaced.
 _REQUEST_TIMEOUT = 30
 
@@ -106,6 +108,11 @@ def extract_gid(text: str) -> int | None:
     return int(match.group(1)) if match else None
 
 
+class _RangeError(SyncError):
+    """The API couldn't resolve the target range - typically the linked tab
+    was renamed or deleted since its header was last verified."""
+
+
 def _a1_quote(sheet_name: str) -> str:
     """Quote a sheet title for A1-notation ranges, e.g. `'My Form'!1:1`."""
     return "'" + sheet_name.replace("'", "''") + "'"
@@ -279,7 +286,7 @@ class GoogleSheetsBackend(SyncBackend):
             }
         ).encode("ascii")
         try:
-            with urllib.request.urlopen(
+            with http_pool.urlopen(
                 urllib.request.Request(TOKEN_URL, data=data, method="POST"), timeout=_REQUEST_TIMEOUT
             ) as resp:
                 token = json.loads(resp.read().decode("utf-8"))
@@ -327,7 +334,7 @@ class GoogleSheetsBackend(SyncBackend):
                 }
             ).encode("ascii")
             try:
-                with urllib.request.urlopen(
+                with http_pool.urlopen(
                     urllib.request.Request(TOKEN_URL, data=data, method="POST"), timeout=_REQUEST_TIMEOUT
                 ) as resp:
                     refreshed = json.loads(resp.read().decode("utf-8"))
@@ -351,7 +358,7 @@ class GoogleSheetsBackend(SyncBackend):
         req.add_header("Authorization", f"Bearer {token}")
         req.add_header("Content-Type", "application/json")
         try:
-            with urllib.request.urlopen(req, timeout=_REQUEST_TIMEOUT) as resp:
+            with http_pool.urlopen(req, timeout=_REQUEST_TIMEOUT) as resp:
                 raw = resp.read()
                 return json.loads(raw.decode("utf-8")) if raw else {}
         except urllib.error.HTTPError as e:
@@ -363,6 +370,8 @@ class GoogleSheetsBackend(SyncBackend):
                 raise SyncError(f"Google authorization rejected: {message}") from e
             if e.code >= 500:
                 raise SyncError(f"Google Sheets is unavailable ({e.code}): {message}") from e
+            if e.code == 400 and "parse range" in message:
+                raise _RangeError(f"Google Sheets API error {e.code}: {message}") from e
             raise SyncError(f"Google Sheets API error {e.code}: {message}") from e
         except urllib.error.URLError as e:
             raise SyncError(f"Network unreachable: {e.reason}") from e
@@ -381,7 +390,7 @@ class GoogleSheetsBackend(SyncBackend):
         req = urllib.request.Request(url, method="GET")
         req.add_header("Authorization", f"Bearer {token}")
         try:
-            with urllib.request.urlopen(req, timeout=_REQUEST_TIMEOUT) as resp:
+            with http_pool.urlopen(req, timeout=_REQUEST_TIMEOUT) as resp:
                 data = json.loads(resp.read().decode("utf-8"))
         except urllib.error.HTTPError as e:
             if e.code == 404:
@@ -403,8 +412,10 @@ class GoogleSheetsBackend(SyncBackend):
         return sheets[0]["properties"]["title"]
 
     def link_sheet(self, db_path: str, sheet_id: str, sheet_name: str) -> None:
-        set_config(db_path, "sheet_id", sheet_id)
-        set_config(db_path, "sheet_name", sheet_name or self.form_name)
+        with transaction(db_path):
+            set_config(db_path, "sheet_id", sheet_id)
+            set_config(db_path, "sheet_name", sheet_name or self.form_name)
+            self._forget_verified_header(db_path)
 
     def test_connection(self, db_path: str) -> bool:
         try:
@@ -413,19 +424,49 @@ class GoogleSheetsBackend(SyncBackend):
         except SyncError:
             return False
 
+    @staticmethod
+    def _header_hash(sheet_id: str, sheet_name: str, headers: list[str]) -> str:
+        blob = json.dumps([sheet_id, sheet_name, headers], ensure_ascii=False).encode("utf-8")
+        return hashlib.sha256(blob).hexdigest()
+
+    @staticmethod
+    def _forget_verified_header(db_path: str) -> None:
+        with transaction(db_path):
+            clear_config(db_path, "verified_header")
+            clear_config(db_path, "verified_header_hash")
+            clear_config(db_path, "verified_header_at")
+
+    def _header_verified(self, db_path: str, header_hash: str) -> bool:
+        """Whether this exact header was checked against this tab within the TTL."""
+        if get_config(db_path, "verified_header_hash") != header_hash:
+            return False
+        try:
+            verified_at = float(get_config(db_path, "verified_header_at") or 0)
+        except ValueError:
+            return False
+        return time.time() - verified_at < get_header_ttl()
+
     def ensure_headers(self, db_path: str, headers: list[str]) -> None:
-        """Write the header row only if the sheet is empty; leave an existing one alone."""
+        """Write the header row only if the sheet is empty; leave an existing one alone.
+
+        The outcome is cached in sync.db, so the header GET is skipped until the
+        local header (or linked tab) changes, a push hits a range error, or the
+        TTL from sync/settings.py runs out.
+        """
         sheet_id = get_config(db_path, "sheet_id")
         if not sheet_id:
             return  # push_pending() will raise its own "no sheet linked" error
         sheet_name = get_config(db_path, "sheet_name") or self.form_name
+        header_hash = self._header_hash(sheet_id, sheet_name, headers)
+        if self._header_verified(db_path, header_hash):
+            return
         token = self._fresh_token()
 
         range_url = f"{SHEETS_BASE_URL}/{sheet_id}/values/{urllib.parse.quote(_a1_quote(sheet_name))}!1:1"
         req = urllib.request.Request(f"{range_url}?majorDimension=ROWS", method="GET")
         req.add_header("Authorization", f"Bearer {token}")
         try:
-            with urllib.request.urlopen(req, timeout=_REQUEST_TIMEOUT) as resp:
+            with http_pool.urlopen(req, timeout=_REQUEST_TIMEOUT) as resp:
                 data = json.loads(resp.read().decode("utf-8"))
         except urllib.error.HTTPError as e:
             if e.code == 404:
@@ -439,25 +480,40 @@ class GoogleSheetsBackend(SyncBackend):
             body = {"values": [headers], "majorDimension": "ROWS"}
             self._request(f"{range_url}?valueInputOption=RAW", body, token, method="PUT")
 
+        with transaction(db_path):
+            set_config(db_path, "verified_header", json.dumps(headers, ensure_ascii=False))
+            set_config(db_path, "verified_header_hash", header_hash)
+            set_config(db_path, "verified_header_at", str(time.time()))
+
     def push_pending(self, csv_path: str, db_path: str) -> int:
         last_row = get_last_synced_row(db_path)
-        rows = read_csv_from(csv_path, start=last_row + 1)
-        if not rows:
-            return 0
-
-        self.ensure_headers(db_path, read_csv_headers(csv_path))
-
+        pushed = 0
+        for header, rows, end_offset, source in iter_pending_batches(csv_path, db_path):
+            if not pushed:
+                self.ensure_headers(db_path, header)
+            try:
+                self._append_rows(db_path, rows)
+            except _RangeError:
+                # The tab changed under us - re-verify it once before giving up.
+                self._forget_verified_header(db_path)
+                self.ensure_headers(db_path, header)
+                self._append_rows(db_path, rows)
+
+            with transaction(db_path):
+                advance_sync_cursor(db_path, csv_path, last_row + len(rows), end_offset, source)
+                log_sync_ok(db_path, last_row + 1, last_row + len(rows))
+            last_row += len(rows)
+            pushed += len(rows)
+        return pushed
+
+    def _append_rows(self, db_path: str, rows: list[list[str]]) -> None:
         sheet_id = get_config(db_path, "sheet_id")
         if not sheet_id:
             raise SyncError("No Google Sheet linked. Open sync settings and connect one.")
         sheet_name = get_config(db_path, "sheet_name") or self.form_name
 
         token = self._fresh_token()
-        body = {"values": [list(row.values()) for row in rows], "majorDimension": "ROWS"}
+        body = {"values": rows, "majorDimension": "ROWS"}
         url = f"{SHEETS_BASE_URL}/{sheet_id}/values/{urllib.parse.quote(_a1_quote(sheet_name))}!A1:append"
         params = "valueInputOption=USER_ENTERED&insertDataOption=INSERT_ROWS"
         self._request(f"{url}?{params}", body, token, method="POST")
-
-        set_last_synced_row(db_path, last_row + len(rows))
-        log_sync_ok(db_path, last_row + 1, last_row + len(rows))
-        return len(rows)
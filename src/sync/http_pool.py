@@ -0,0 +1,187 @@
+# http_pool.py
+#
+# Copyright 2025 Aryan Kaushik
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+"""
+Small keep-alive connection pool for the sync backends. urlopen() here is a
+drop-in for urllib.request.urlopen (same Request in, same HTTPError/URLError
+out) that reuses persistent http.client connections per host, so steady-state
+pushes skip the TCP + TLS handshake. Shared by every form and thread.
+"""
+
+import http.client
+import io
+import select
+import ssl
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from email.message import Message
+
+# Idle connections kept per (scheme, host, port).
+_MAX_IDLE_PER_HOST = 4
+
+# Idle connections older than this are dropped rather than reused - servers
+# close keep-alive connections on their own after a while anyway.
+_IDLE_TIMEOUT = 120
+
+# Errors that usually mean a reused connection had already been closed by
+# the server before our request reached it - worth one retry on a fresh
+# connection. Usually: the server may also have dropped the connection
+# after acting on the request, so only idempotent methods are retried (a
+# second Sheets append or WebDAV PATCH would duplicate rows). _peer_closed()
+# catches most stale connections before they're used, so this is rare.
+_STALE_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.BadStatusLine,
+    BrokenPipeError,
+    ConnectionResetError,
+)
+_IDEMPOTENT_METHODS = frozenset(("GET", "HEAD", "OPTIONS", "PUT", "DELETE", "PROPFIND", "MKCOL"))
+
+_ssl_context = ssl.create_default_context()
+
+
+class PooledResponse:
+    """The fully-read response; mirrors the parts of urllib's response we use."""
+
+    def __init__(self, url: str, status: int, reason: str, headers: Message, body: bytes):
+        self.url = url
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        self._body = io.BytesIO(body)
+
+    def read(self, amt: int | None = None) -> bytes:
+        return self._body.read(amt)
+
+    def getcode(self) -> int:
+        return self.status
+
+    def __enter__(self) -> "PooledResponse":
+        return self
+
+    def __exit__(self, *_exc) -> None:
+        self._body.close()
+
+
+class ConnectionPool:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._idle: dict[tuple[str, str, int], list[tuple[http.client.HTTPConnection, float]]] = {}
+
+    def _acquire(self, key: tuple[str, str, int], timeout: float) -> tuple[http.client.HTTPConnection, bool]:
+        """(connection, reused) - an idle one for `key` if there is a fresh
+        one the server hasn't closed."""
+        now = time.monotonic()
+        with self._lock:
+            idle = self._idle.get(key, [])
+            while idle:
+                conn, last_used = idle.pop()
+                if now - last_used < _IDLE_TIMEOUT and not _peer_closed(conn):
+                    conn.timeout = timeout
+                    if conn.sock is not None:
+                        conn.sock.settimeout(timeout)
+                    return conn, True
+                conn.close()
+
+        scheme, host, port = key
+        if scheme == "https":
+            return http.client.HTTPSConnection(host, port, timeout=timeout, context=_ssl_context), False
+        return http.client.HTTPConnection(host, port, timeout=timeout), False
+
+    def _release(self, key: tuple[str, str, int], conn: http.client.HTTPConnection) -> None:
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < _MAX_IDLE_PER_HOST:
+                idle.append((conn, time.monotonic()))
+                return
+        conn.close()
+
+    def close_all(self) -> None:
+        with self._lock:
+            for idle in self._idle.values():
+                for conn, _last_used in idle:
+                    conn.close()
+            self._idle.clear()
+
+    def urlopen(self, req: urllib.request.Request, timeout: float) -> PooledResponse:
+        parsed = urllib.parse.urlsplit(req.full_url)
+        scheme = parsed.scheme.lower()
+        if scheme not in ("http", "https"):
+            raise urllib.error.URLError(f"unsupported URL scheme {scheme!r}")
+        if urllib.request.getproxies().get(scheme):
+            # Proxies are rare on our targets; let urllib deal with them.
+            return urllib.request.urlopen(req, timeout=timeout)
+
+        default_port = 443 if scheme == "https" else 80
+        key = (scheme, parsed.hostname or "", parsed.port or default_port)
+        headers = dict(req.header_items())
+        if req.data is not None and not any(name.lower() == "content-type" for name in headers):
+            headers["Content-Type"] = "application/x-www-form-urlencoded"  # as urllib would add
+
+        method = req.get_method()
+        idempotent = method in _IDEMPOTENT_METHODS
+        for attempt in range(2):
+            conn, reused = self._acquire(key, timeout)
+            try:
+                conn.request(method, req.selector, body=req.data, headers=headers)
+                resp = conn.getresponse()
+                body = resp.read()
+            except _STALE_ERRORS as e:
+                conn.close()
+                if reused and attempt == 0 and idempotent:
+                    continue
+                raise urllib.error.URLError(e) from e
+            except (OSError, http.client.HTTPException) as e:
+                conn.close()
+                raise urllib.error.URLError(e) from e
+
+            if resp.will_close:
+                conn.close()
+            else:
+                self._release(key, conn)
+
+            if resp.status >= 400:
+                raise urllib.error.HTTPError(req.full_url, resp.status, resp.reason, resp.headers, io.BytesIO(body))
+            return PooledResponse(req.full_url, resp.status, resp.reason, resp.headers, body)
+
+        raise urllib.error.URLError("connection closed")  # unreachable: the loop returns or raises
+
+
+def _peer_closed(conn: http.client.HTTPConnection) -> bool:
+    """Whether the server has already closed (or reset) an idle connection.
+    An idle HTTP connection has nothing to read, so a readable socket means
+    EOF, a reset, or stray bytes that would be taken for our response."""
+    sock = conn.sock
+    if sock is None:
+        return True
+    try:
+        readable, _writable, _errored = select.select([sock], [], [], 0)
+    except (OSError, ValueError):
+        return True
+    return bool(readable)
+
+
+_pool = ConnectionPool()
+
+
+def urlopen(req: urllib.request.Request, timeout: float) -> PooledResponse:
+    """urllib.request.urlopen() over the shared keep-alive pool."""
+    return _pool.urlopen(req, timeout)
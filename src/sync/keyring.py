@@ -19,6 +19,12 @@
 """
 Credential storage via the desktop Secret portal, encrypted with AES-256-GCM
 using ctypes/libcrypto.
+
+Decrypted credentials are cached in memory per process, so the hot path
+(every push asks for a token) is a stat() plus a dict lookup rather than a
+file read and a decrypt. The cache is dropped when the secrets file's
+mtime/size/inode change, on every store_token/clear_token, and entries are
+forgotten TOKEN_CACHE_TTL seconds after they were decrypted.
 """
 
 import base64
@@ -174,15 +180,31 @@ _key_unavailable = False
 # sync worker thread and the settings dialog on the main thread can race.
 _file_lock = threading.Lock()
 
+# Seconds a decrypted credential stays in memory before it's dropped and the
+# next lookup decrypts it again; None keeps it for the process lifetime.
+TOKEN_CACHE_TTL: float | None = 900
+
+# "<backend>:<form_name>" -> (credential or None if absent, monotonic time decrypted)
+_token_cache: dict[str, tuple[dict | None, float]] = {}
+# (mtime_ns, size, inode) of the secrets file the cache was filled from.
+_token_cache_stamp: tuple[int, int, int] | None = None
+_token_cache_lock = threading.Lock()
+
 
 class KeyringUnavailable(Exception):
     """Raised when the Secret portal (or the crypto backend) is unavailable."""
 
 
+_secrets_file: str | None = None
+
+
 def _secrets_path() -> str:
-    config_dir = os.path.join(GLib.get_user_config_dir(), _APP_ID)
-    os.makedirs(config_dir, exist_ok=True)
-    return os.path.join(config_dir, "secrets.enc.json")
+    global _secrets_file
+    if _secrets_file is None:
+        config_dir = os.path.join(GLib.get_user_config_dir(), _APP_ID)
+        os.makedirs(config_dir, exist_ok=True)
+        _secrets_file = os.path.join(config_dir, "secrets.enc.json")
+    return _secrets_file
 
 
 def _read_with_deadline(fd: int, timeout_sec: float) -> bytes:
@@ -268,6 +290,44 @@ def _require_crypto() -> None:
         raise KeyringUnavailable("libcrypto (OpenSSL) is not available")
 
 
+def _secrets_stamp() -> tuple[int, int, int] | None:
+    try:
+        st = os.stat(_secrets_path())
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size, st.st_ino
+
+
+def _forget_cached_tokens() -> None:
+    global _token_cache_stamp
+    with _token_cache_lock:
+        for token, _decrypted_at in _token_cache.values():
+            if token is not None:
+                token.clear()
+        _token_cache.clear()
+        _token_cache_stamp = None
+
+
+def _cached_token(key: str, stamp: tuple[int, int, int] | None) -> tuple[bool, dict | None]:
+    """(hit, credential) for `key` if the cache still matches the file on disk."""
+    if stamp != _token_cache_stamp:
+        _forget_cached_tokens()
+        return False, None
+    with _token_cache_lock:
+        if stamp != _token_cache_stamp:
+            return False, None
+        entry = _token_cache.get(key)
+        if entry is None:
+            return False, None
+        token, decrypted_at = entry
+        if TOKEN_CACHE_TTL is not None and time.monotonic() - decrypted_at >= TOKEN_CACHE_TTL:
+            del _token_cache[key]
+            if token is not None:
+                token.clear()
+            return False, None
+        return True, None if token is None else dict(token)
+
+
 def _load_secrets_file() -> dict:
     path = _secrets_path()
     if not os.path.exists(path):
@@ -303,20 +363,42 @@ def store_token(form_name: str, backend: str, token: dict) -> None:
         secrets = _load_secrets_file()
         secrets[f"{backend}:{form_name}"] = blob
         _save_secrets_file(secrets)
+        _forget_cached_tokens()
 
 
 def load_token(form_name: str, backend: str) -> dict | None:
+    """The stored credential, or None. Returns a copy - callers may mutate it."""
+    global _token_cache_stamp
     _require_crypto()
-    raw = _load_secrets_file().get(f"{backend}:{form_name}")
-    if raw is None:
-        return None
-    try:
-        blob = base64.b64decode(raw)
-        nonce, ciphertext = blob[:12], blob[12:]
-        plaintext = _aes256gcm_decrypt(_encryption_key(), nonce, ciphertext)
-        return json.loads(plaintext)
-    except Exception:
-        return None
+    key = f"{backend}:{form_name}"
+    # Stat before reading: if the file changes in between, the stamp we cache
+    # under is already stale and the next lookup reloads.
+    stamp = _secrets_stamp()
+    hit, token = _cached_token(key, stamp)
+    if hit:
+        return token
+
+    raw = _load_secrets_file().get(key)
+    token = None
+    if raw is not None:
+        try:
+            blob = base64.b64decode(raw)
+            nonce, ciphertext = blob[:12], blob[12:]
+            plaintext = _aes256gcm_decrypt(_encryption_key(), nonce, ciphertext)
+            token = json.loads(plaintext)
+        except KeyringUnavailable:
+            return None  # don't cache a miss the portal may recover from after a restart
+        except Exception:
+            token = None
+        if not isinstance(token, dict):
+            token = None
+
+    with _token_cache_lock:
+        if _token_cache_stamp is None:
+            _token_cache_stamp = stamp
+        if _token_cache_stamp == stamp:
+            _token_cache[key] = (token, time.monotonic())
+    return None if token is None else dict(token)
 
 
 def clear_token(form_name: str, backend: str) -> None:
@@ -324,6 +406,7 @@ def clear_token(form_name: str, backend: str) -> None:
         secrets = _load_secrets_file()
         if secrets.pop(f"{backend}:{form_name}", None) is not None:
             _save_secrets_file(secrets)
+        _forget_cached_tokens()
 
 
 def is_available() -> bool:
@@ -19,19 +19,36 @@
 """
 SQLite-backed sync queue. The CSV itself is append-only and remains the
 source of truth; this file only tracks how far a backend has gotten
-(`last_synced_row`) plus a small history log for the settings panel's
-status line.
+(`last_synced_row`, plus the byte offset just past that row so the next
+push can seek straight to the new rows) and a small history log for the
+settings panel's status line.
 """
 
 import csv
 import io
+import json
 import os
 import sqlite3
+import threading
+from contextlib import contextmanager
 from datetime import datetime, timezone
 
+from ..csv_index import boundary_digest, count_rows, digest, iter_records, open_index, parse_records
+from .backend import SyncError
 
-def _connect(db_path: str) -> sqlite3.Connection:
-    conn = sqlite3.connect(db_path)
+
+# One long-lived connection per (thread, db path) - sqlite3 connections
+# can't be shared across threads, and reopening one per call means a fresh
+# open, schema check and fsync for every get/set in a sync tick.
+_local = threading.local()
+
+# Paths whose tables already exist, so only the first connection to each
+# sync.db pays for the CREATE TABLE statements.
+_schema_ready: set[str] = set()
+_schema_lock = threading.Lock()
+
+
+def _create_schema(conn: sqlite3.Connection) -> None:
     conn.execute(
         """
         CREATE TABLE IF NOT EXISTS sync_state (
@@ -51,44 +68,98 @@ def _connect(db_path: str) -> sqlite3.Connection:
         )
         """
     )
+    conn.commit()
+
+
+def _connect(db_path: str) -> sqlite3.Connection:
+    connections = getattr(_local, "connections", None)
+    if connections is None:
+        connections = _local.connections = {}
+        _local.depth = {}
+    conn = connections.get(db_path)
+    if conn is not None:
+        return conn
+
+    conn = sqlite3.connect(db_path)
+    # WAL lets the sync panel read while a worker writes; NORMAL only
+    # fsyncs at checkpoints, which is still crash-safe in WAL mode.
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    with _schema_lock:
+        if db_path not in _schema_ready or not _has_schema(conn):
+            _create_schema(conn)
+            _schema_ready.add(db_path)
+    connections[db_path] = conn
     return conn
 
 
-def init_db(db_path: str) -> None:
-    conn = _connect(db_path)
-    conn.commit()
-    conn.close()
+def _has_schema(conn: sqlite3.Connection) -> bool:
+    """Guards against a sync.db deleted and recreated while the app runs."""
+    row = conn.execute("SELECT count(*) FROM sqlite_master WHERE name = 'sync_state'").fetchone()
+    return bool(row and row[0])
 
 
-def get_config(db_path: str, key: str) -> str | None:
+def _commit(db_path: str, conn: sqlite3.Connection) -> None:
+    """Commit now, unless the caller is batching writes in transaction()."""
+    if not _local.depth.get(db_path):
+        conn.commit()
+
+
+@contextmanager
+def transaction(db_path: str):
+    """Group several writes (e.g. cursor update + log row) into one commit.
+
+    Nests - only the outermost block commits, or rolls back on error.
+    """
     conn = _connect(db_path)
+    depth = _local.depth.get(db_path, 0)
+    _local.depth[db_path] = depth + 1
     try:
-        row = conn.execute("SELECT value FROM sync_state WHERE key = ?", (key,)).fetchone()
-        return row[0] if row else None
+        yield conn
+    except BaseException:
+        if depth == 0:
+            conn.rollback()
+        raise
+    else:
+        if depth == 0:
+            conn.commit()
     finally:
+        _local.depth[db_path] = depth
+
+
+def close_connections() -> None:
+    """Close every sync.db connection held by the calling thread; SyncWorker
+    calls this at the end of each push, on the scheduler's pool thread."""
+    connections = getattr(_local, "connections", None) or {}
+    for conn in connections.values():
         conn.close()
+    connections.clear()
+
+
+def init_db(db_path: str) -> None:
+    _connect(db_path)
+
+
+def get_config(db_path: str, key: str) -> str | None:
+    conn = _connect(db_path)
+    row = conn.execute("SELECT value FROM sync_state WHERE key = ?", (key,)).fetchone()
+    return row[0] if row else None
 
 
 def set_config(db_path: str, key: str, value: str) -> None:
     conn = _connect(db_path)
-    try:
-        conn.execute(
-            "INSERT INTO sync_state (key, value) VALUES (?, ?) "
-            "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
-            (key, value),
-        )
-        conn.commit()
-    finally:
-        conn.close()
+    conn.execute(
+        "INSERT INTO sync_state (key, value) VALUES (?, ?) "
+        "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+        (key, value),
+    )
+    _commit(db_path, conn)
 
 
 def clear_config(db_path: str, key: str) -> None:
     conn = _connect(db_path)
-    try:
-        conn.execute("DELETE FROM sync_state WHERE key = ?", (key,))
-        conn.commit()
-    finally:
-        conn.close()
+    conn.execute("DELETE FROM sync_state WHERE key = ?", (key,))
+    _commit(db_path, conn)
 
 
 def get_last_synced_row(db_path: str) -> int:
@@ -98,13 +169,54 @@ def get_last_synced_row(db_path: str) -> int:
 
 
 def set_last_synced_row(db_path: str, row_index: int) -> None:
-    set_config(db_path, "last_synced_row", str(row_index))
+    """Move the row cursor without knowing its byte offset - the next
+    read_pending_rows() finds the offset again with one full scan."""
+    with transaction(db_path):
+        set_config(db_path, "last_synced_row", str(row_index))
+        clear_config(db_path, "last_synced_offset")
+        clear_config(db_path, "csv_fingerprint")
+
+
+def advance_sync_cursor(
+    db_path: str, csv_path: str, row_index: int, offset: int, source: dict | None = None
+) -> None:
+    """Record that rows up to `row_index` (ending at byte `offset`) are synced.
+
+    Stores a fingerprint of the CSV next to the offset so a later rewrite of
+    the file (e.g. a delete in the response viewer) is detected instead of
+    seeking into the middle of some other row.
+
+    `source` is the identity of the file the rows were read from, as yielded
+    by iter_pending_batches(). If the CSV at csv_path is no longer that file
+    (replaced or rewritten since), row_index and offset describe some other
+    numbering and SyncError is raised instead of saving them.
+    """
+    fingerprint = _csv_fingerprint(csv_path, offset)
+    if source is not None and (
+        fingerprint is None
+        or fingerprint["inode"] != source["inode"]
+        or fingerprint["header"] != source["header"]
+    ):
+        raise SyncError("The responses file was rewritten during the sync; its progress will be rechecked.")
+    with transaction(db_path):
+        set_config(db_path, "last_synced_row", str(row_index))
+        if fingerprint is None:
+            clear_config(db_path, "last_synced_offset")
+            clear_config(db_path, "csv_fingerprint")
+            return
+        set_config(db_path, "last_synced_offset", str(offset))
+        set_config(db_path, "csv_fingerprint", json.dumps(fingerprint))
 
 
 def mark_all_synced(db_path: str, csv_path: str) -> None:
     """Mark every existing row synced, so linking a new destination only
     picks up rows added after this point, not the form's whole history."""
-    set_last_synced_row(db_path, count_csv_rows(csv_path) - 1)
+    with open_index(csv_path) as index:
+        count, end = len(index), index.indexed_end
+    if count:
+        advance_sync_cursor(db_path, csv_path, count - 1, end)
+    else:
+        set_last_synced_row(db_path, -1)
 
 
 def reset_sync_progress(db_path: str) -> None:
@@ -115,31 +227,25 @@ def reset_sync_progress(db_path: str) -> None:
 
 def log_sync_ok(db_path: str, start_row: int, end_row: int) -> None:
     conn = _connect(db_path)
-    try:
-        conn.execute(
-            "INSERT INTO sync_log (timestamp, row_index, status, message) VALUES (?, ?, ?, ?)",
-            (
-                datetime.now(timezone.utc).isoformat(),
-                end_row,
-                "ok",
-                f"synced rows {start_row}-{end_row}" if end_row >= start_row else "nothing to sync",
-            ),
-        )
-        conn.commit()
-    finally:
-        conn.close()
+    conn.execute(
+        "INSERT INTO sync_log (timestamp, row_index, status, message) VALUES (?, ?, ?, ?)",
+        (
+            datetime.now(timezone.utc).isoformat(),
+            end_row,
+            "ok",
+            f"synced rows {start_row}-{end_row}" if end_row >= start_row else "nothing to sync",
+        ),
+    )
+    _commit(db_path, conn)
 
 
 def log_sync_error(db_path: str, row_index: int, message: str) -> None:
     conn = _connect(db_path)
-    try:
-        conn.execute(
-            "INSERT INTO sync_log (timestamp, row_index, status, message) VALUES (?, ?, ?, ?)",
-            (datetime.now(timezone.utc).isoformat(), row_index, "error", message),
-        )
-        conn.commit()
-    finally:
-        conn.close()
+    conn.execute(
+        "INSERT INTO sync_log (timestamp, row_index, status, message) VALUES (?, ?, ?, ?)",
+        (datetime.now(timezone.utc).isoformat(), row_index, "error", message),
+    )
+    _commit(db_path, conn)
 
 
 def last_log_entry(db_path: str) -> dict | None:
@@ -147,29 +253,52 @@ def last_log_entry(db_path: str) -> dict | None:
     if not os.path.exists(db_path):
         return None
     conn = _connect(db_path)
-    try:
-        row = conn.execute(
-            "SELECT timestamp, row_index, status, message FROM sync_log ORDER BY id DESC LIMIT 1"
-        ).fetchone()
-        if not row:
-            return None
-        return {"timestamp": row[0], "row_index": row[1], "status": row[2], "message": row[3]}
-    finally:
-        conn.close()
+    row = conn.execute(
+        "SELECT timestamp, row_index, status, message FROM sync_log ORDER BY id DESC LIMIT 1"
+    ).fetchone()
+    if not row:
+        return None
+    return {"timestamp": row[0], "row_index": row[1], "status": row[2], "message": row[3]}
 
 
-def read_csv_from(csv_path: str, start: int) -> list[dict]:
-    """Return CSV rows (as ordered dicts) at 0-based indices >= start."""
-    start = max(start, 0)
-    return _read_all_rows(csv_path)[start:]
+# Rows handed to a backend per batch by iter_pending_batches(), so a full
+# resync of a long-running form runs in bounded memory.
+PUSH_BATCH_ROWS = 500
 
 
-def _read_all_rows(csv_path: str) -> list[dict]:
-    if not os.path.exists(csv_path):
-        return []
-    with open(csv_path, newline="", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        return list(reader)
+def _batched(rows, batch_size: int):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def iter_csv_rows(csv_path: str, start: int = 0):
+    """Yield data rows (as lists) at 0-based indices >= start, one at a time,
+    seeking past the skipped rows via the row index."""
+    with open_index(csv_path) as index:
+        if index.header_row is None:
+            return
+        offset = index.offset(max(start, 0))
+    with open(csv_path, "rb") as raw:
+        raw.seek(offset)
+        with io.TextIOWrapper(raw, encoding="utf-8", newline="") as f:
+            yield from (row for row in csv.reader(f) if row)  # skip blank lines
+
+
+def iter_csv_batches(csv_path: str, start: int = 0, batch_size: int = PUSH_BATCH_ROWS):
+    """iter_csv_rows(), grouped into lists of at most batch_size rows."""
+    yield from _batched(iter_csv_rows(csv_path, start), batch_size)
+
+
+def read_csv_from(csv_path: str, start: int) -> list[dict]:
+    """Return CSV rows (as ordered dicts) at 0-based indices >= start."""
+    header = read_csv_headers(csv_path)
+    return [dict(zip(header, row)) for row in iter_csv_rows(csv_path, start) if row]
 
 
 def read_csv_headers(csv_path: str) -> list[str]:
@@ -181,26 +310,100 @@ def read_csv_headers(csv_path: str) -> list[str]:
 
 
 def count_csv_rows(csv_path: str) -> int:
-    """Number of data rows (header excluded)."""
-    if not os.path.exists(csv_path):
-        return 0
-    with open(csv_path, newline="", encoding="utf-8") as f:
-        reader = csv.reader(f)
-        next(reader, None)
-        return sum(1 for _ in reader)
+    """Number of data rows (header excluded), from the row index."""
+    return count_rows(csv_path)
 
 
 def read_csv_rows_from(csv_path: str, start: int) -> tuple[list[str] | None, list[list[str]]]:
     """(header_row, data_rows) at 0-based indices >= start, via csv.reader so
     embedded newlines in quoted fields don't throw off the row count."""
-    if not os.path.exists(csv_path):
-        return None, []
-    with open(csv_path, newline="", encoding="utf-8") as f:
-        rows = list(csv.reader(f))
-    if not rows:
+    header = read_csv_headers(csv_path)
+    if not header:
         return None, []
-    header, data = rows[0], rows[1:]
-    return header, data[max(start, 0):]
+    return header, list(iter_csv_rows(csv_path, start))
+
+
+def _csv_fingerprint(csv_path: str, offset: int) -> dict | None:
+    """inode/size/mtime of the CSV plus hashes of its header record and of the
+    bytes just before `offset`."""
+    try:
+        with open(csv_path, "rb") as f:
+            st = os.fstat(f.fileno())
+            header = next(iter_records(f, 0), None)
+            if header is None or offset > st.st_size:
+                return None
+            return {
+                "inode": st.st_ino,
+                "size": st.st_size,
+                "mtime": st.st_mtime_ns,
+                "header": digest(header[1]).hex(),
+                "boundary": boundary_digest(f, offset).hex(),
+            }
+    except OSError:
+        return None
+
+
+def _stored_offset(db_path: str, f, header_raw: bytes) -> int | None:
+    """The saved byte cursor, if the CSV open as `f` still matches the
+    fingerprint saved with it; None means fall back to a full scan."""
+    offset = get_config(db_path, "last_synced_offset")
+    fingerprint = get_config(db_path, "csv_fingerprint")
+    if offset is None or fingerprint is None:
+        return None
+    try:
+        offset_value = int(offset)
+        saved = json.loads(fingerprint)
+    except (ValueError, json.JSONDecodeError):
+        return None
+
+    st = os.fstat(f.fileno())
+    if (
+        saved.get("inode") != st.st_ino
+        or st.st_size < saved.get("size", 0)
+        or st.st_size < offset_value
+        or saved.get("header") != digest(header_raw).hex()
+    ):
+        return None
+    if boundary_digest(f, offset_value).hex() != saved.get("boundary"):
+        return None
+    return offset_value
+
+
+def iter_pending_batches(csv_path: str, db_path: str, batch_size: int = PUSH_BATCH_ROWS):
+    """Yield (header_row, rows, end_offset, source) for the unsynced rows, at
+    most batch_size rows at a time; end_offset is the byte offset just past
+    the batch's last row and source identifies the file it was read from,
+    both ready for advance_sync_cursor().
+
+    Seeks straight to the cursor saved by advance_sync_cursor() and parses
+    only the bytes after it. If there is no saved offset, or the CSV no
+    longer matches its fingerprint, looks the position up in the row index
+    (see csv_index.py) using last_synced_row instead.
+    """
+    if not os.path.exists(csv_path):
+        return
+    with open(csv_path, "rb") as f:
+        header = next(iter_records(f, 0), None)
+        if header is None:
+            return
+        header_row = parse_records([header[1]])[0]
+        source = {"inode": os.fstat(f.fileno()).st_ino, "header": digest(header[1]).hex()}
+
+        offset = _stored_offset(db_path, f, header[1])
+        if offset is None:
+            with open_index(csv_path) as index:
+                offset = index.offset(get_last_synced_row(db_path) + 1)
+
+        batch: list[bytes] = []
+        end = offset
+        for start, raw in iter_records(f, offset):
+            batch.append(raw)
+            end = start + len(raw)
+            if len(batch) >= batch_size:
+                yield header_row, parse_records(batch), end, source
+                batch = []
+        if batch:
+            yield header_row, parse_records(batch), end, source
 
 
 def rows_to_csv_text(rows: list[list[str]]) -> str:
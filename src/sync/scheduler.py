@@ -0,0 +1,206 @@
+# scheduler.py
+#
+# Copyright 2025 Aryan Kaushik
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+"""
+App-wide sync scheduler. Every form's SyncWorker registers here instead of
+running its own thread: one dispatcher thread keeps a heap of forms keyed
+by when they're next due, and hands due forms to a small, fixed pool of
+worker threads - so thread count and idle wakeups stay flat no matter how
+many tabs are open.
+"""
+
+import heapq
+import itertools
+import sys
+import threading
+import time
+from queue import SimpleQueue
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .worker import SyncWorker
+
+# Forms pushed at once, across every backend.
+MAX_WORKERS = 4
+
+# Forms pushing to the same kind of backend at once, so twenty Google Sheets
+# forms don't all hit the API (and its per-minute quota) together.
+PER_BACKEND_LIMIT = 2
+
+
+class SyncScheduler:
+    """Dispatches SyncWorker jobs onto a bounded thread pool by due time.
+
+    Never touches GTK; jobs report through their own on_status callback.
+    """
+
+    def __init__(self, max_workers: int = MAX_WORKERS, per_backend_limit: int = PER_BACKEND_LIMIT):
+        self._max_workers = max_workers
+        self._per_backend_limit = per_backend_limit
+        self._cond = threading.Condition()
+        self._heap: list[tuple[float, int, "SyncWorker"]] = []
+        self._seq = itertools.count()
+        self._active: dict[type, int] = {}
+        self._ready: SimpleQueue = SimpleQueue()
+        self._threads: list[threading.Thread] = []
+        self._job_count = 0
+
+    # -- Registration ------------------------------------------------------
+
+    def add(self, job: "SyncWorker", delay: float) -> None:
+        with self._cond:
+            self._job_count += 1
+            self._ensure_threads()
+            self._schedule(job, time.monotonic() + delay)
+
+    def remove(self, job: "SyncWorker") -> None:
+        with self._cond:
+            if not job._removed:
+                job._removed = True
+                self._job_count -= 1
+            self._cond.notify()
+
+    def request(self, job: "SyncWorker", due: float) -> None:
+        """Make `job` due no later than `due` (a time.monotonic() value),
+        cancelling any coalescing window it was waiting out."""
+        with self._cond:
+            job._burst_start = job._settle_at = None
+            self._request(job, due)
+
+    def coalesce(self, job: "SyncWorker", window: float, max_latency: float) -> None:
+        """Run `job` once triggers have gone quiet for `window` seconds, but no
+        later than `max_latency` seconds after the first trigger of the burst."""
+        with self._cond:
+            now = time.monotonic()
+            if job._burst_start is None:
+                job._burst_start = now
+            job._settle_at = min(now + window, job._burst_start + max_latency)
+            self._request(job, job._settle_at)
+
+    def _request(self, job: "SyncWorker", due: float) -> None:
+        if job._removed:
+            return
+        if job._running:
+            job._rerun_at = due if job._rerun_at is None else min(job._rerun_at, due)
+            return
+        if job._due is not None and job._due <= due:
+            return  # already due sooner; _next_ready() holds it back if still settling
+        self._schedule(job, due)
+
+    def _schedule(self, job: "SyncWorker", due: float) -> None:
+        job._due = due
+        heapq.heappush(self._heap, (due, next(self._seq), job))
+        self._cond.notify()
+
+    def _ensure_threads(self) -> None:
+        """Called holding _cond."""
+        if not self._threads or not self._threads[0].is_alive():
+            dispatcher = threading.Thread(target=self._dispatch_loop, name="sync-dispatch", daemon=True)
+            self._threads[:1] = [dispatcher]
+            dispatcher.start()
+        # Pool threads shouldn't die, but if one did, don't count it.
+        self._threads[1:] = [worker for worker in self._threads[1:] if worker.is_alive()]
+        # One dispatcher plus up to MAX_WORKERS pool threads, grown only as forms register.
+        while len(self._threads) - 1 < min(self._job_count, self._max_workers):
+            worker = threading.Thread(target=self._worker_loop, name="sync-worker", daemon=True)
+            self._threads.append(worker)
+            worker.start()
+
+    # -- Dispatch ------------------------------------------------------------
+
+    def _next_ready(self) -> tuple["SyncWorker | None", float | None]:
+        """(job to run now, None) or (None, seconds until the next one is due).
+        Entries superseded by a later _schedule() or a removal are dropped."""
+        now = time.monotonic()
+        deferred = []
+        try:
+            while self._heap:
+                due, _seq, job = self._heap[0]
+                if job._removed or job._due != due:
+                    heapq.heappop(self._heap)
+                    continue
+                if due > now:
+                    return None, due - now
+                entry = heapq.heappop(self._heap)
+                if job._settle_at is not None and job._settle_at > now:
+                    self._schedule(job, job._settle_at)  # more triggers arrived - keep coalescing
+                    continue
+                if self._active.get(type(job.backend), 0) >= self._per_backend_limit:
+                    deferred.append(entry)  # backend saturated - wait for one of its jobs to finish
+                    continue
+                return job, None
+            return None, None
+        finally:
+            for entry in deferred:
+                heapq.heappush(self._heap, entry)
+
+    def _dispatch_loop(self) -> None:
+        with self._cond:
+            while True:
+                job, wait = self._next_ready()
+                if job is None:
+                    self._cond.wait(wait)
+                    continue
+                job._due = None
+                job._burst_start = job._settle_at = None
+                job._running = True
+                backend_type = type(job.backend)
+                self._active[backend_type] = self._active.get(backend_type, 0) + 1
+                self._ensure_threads()
+                self._ready.put(job)
+
+    def _worker_loop(self) -> None:
+        while True:
+            job = self._ready.get()
+            delay = float(job.interval)
+            try:
+                delay = job.run_once()
+            except Exception as e:
+                # run_once() handles push errors itself; this is its own
+                # error handling failing (e.g. sync.db locked or the disk
+                # full while logging). Keep the thread, retry later.
+                print(f"Sync of {job.csv_path} failed: {e}", file=sys.stderr)
+                try:
+                    job._report("error", f"Unexpected error: {e}")
+                except Exception:
+                    pass
+            finally:
+                with self._cond:
+                    backend_type = type(job.backend)
+                    self._active[backend_type] -= 1
+                    job._running = False
+                    if not job._removed:
+                        due = time.monotonic() + delay
+                        if job._rerun_at is not None:
+                            due = min(due, job._rerun_at)
+                        job._rerun_at = None
+                        self._schedule(job, due)
+                    self._cond.notify()
+
+
+_scheduler: SyncScheduler | None = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> SyncScheduler:
+    """The process-wide scheduler, created on first use."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = SyncScheduler()
+        return _scheduler
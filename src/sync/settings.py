@@ -17,17 +17,37 @@
 #
 # SPDX-License-Identifier: GPL-3.0-or-later
 """
-App-wide (not per-form) non-secret sync settings — currently just the
-default sync interval. Credentials never live here; see sync/keyring.py.
+App-wide (not per-form) non-secret sync settings — the default sync
+interval, how submissions are batched into pushes, and how each backend
+talks to its destination - plus how durably submissions are written to
+the local CSV in the first place.
+Credentials never live here; see sync/keyring.py.
 """
 
 import json
 import os
+import uuid
 
 from gi.repository import GLib
 
 DEFAULT_INTERVAL = 30
 
+# A new submission waits this long for more to arrive before pushing...
+DEFAULT_DEBOUNCE = 5
+# ...but is never held back longer than this.
+DEFAULT_MAX_LATENCY = 60
+
+# Seconds a destination's verified header row is trusted before re-checking it.
+DEFAULT_HEADER_TTL = 3600
+
+# Upload only the new rows (PATCH append) to WebDAV servers that support it.
+DEFAULT_WEBDAV_APPEND = True
+
+# Durability policy for appending submissions to the CSV - see csv_writer.py.
+DEFAULT_DURABILITY = "group"
+# Rows appended within this many ms share one fsync under the "group" policy.
+DEFAULT_GROUP_COMMIT_MS = 200
+
 
 def _settings_path() -> str:
     config_dir = os.path.join(GLib.get_user_config_dir(), "in.aryank.openforms")
@@ -36,17 +56,27 @@ def _settings_path() -> str:
 
 
 def load_settings() -> dict:
+    defaults = {
+        "interval": DEFAULT_INTERVAL,
+        "debounce": DEFAULT_DEBOUNCE,
+        "max_latency": DEFAULT_MAX_LATENCY,
+        "header_ttl": DEFAULT_HEADER_TTL,
+        "webdav_append": DEFAULT_WEBDAV_APPEND,
+        "durability": DEFAULT_DURABILITY,
+        "group_commit_ms": DEFAULT_GROUP_COMMIT_MS,
+    }
     path = _settings_path()
     if not os.path.exists(path):
-        return {"interval": DEFAULT_INTERVAL}
+        return defaults
     try:
         with open(path, encoding="utf-8") as f:
             data = json.load(f)
     except (OSError, json.JSONDecodeError):
-        return {"interval": DEFAULT_INTERVAL}
+        return defaults
     if not isinstance(data, dict):
-        return {"interval": DEFAULT_INTERVAL}
-    data.setdefault("interval", DEFAULT_INTERVAL)
+        return defaults
+    for key, value in defaults.items():
+        data.setdefault(key, value)
     return data
 
 
@@ -66,3 +96,74 @@ def set_interval(seconds: int) -> None:
     settings = load_settings()
     settings["interval"] = int(seconds)
     save_settings(settings)
+
+
+def get_debounce() -> int:
+    return int(load_settings().get("debounce", DEFAULT_DEBOUNCE))
+
+
+def set_debounce(seconds: int) -> None:
+    settings = load_settings()
+    settings["debounce"] = int(seconds)
+    save_settings(settings)
+
+
+def get_max_latency() -> int:
+    return int(load_settings().get("max_latency", DEFAULT_MAX_LATENCY))
+
+
+def set_max_latency(seconds: int) -> None:
+    settings = load_settings()
+    settings["max_latency"] = int(seconds)
+    save_settings(settings)
+
+
+def get_header_ttl() -> int:
+    return int(load_settings().get("header_ttl", DEFAULT_HEADER_TTL))
+
+
+def set_header_ttl(seconds: int) -> None:
+    settings = load_settings()
+    settings["header_ttl"] = int(seconds)
+    save_settings(settings)
+
+
+def get_webdav_append() -> bool:
+    return bool(load_settings().get("webdav_append", DEFAULT_WEBDAV_APPEND))
+
+
+def set_webdav_append(enabled: bool) -> None:
+    settings = load_settings()
+    settings["webdav_append"] = bool(enabled)
+    save_settings(settings)
+
+
+def get_durability() -> str:
+    return str(load_settings().get("durability", DEFAULT_DURABILITY))
+
+
+def set_durability(policy: str) -> None:
+    settings = load_settings()
+    settings["durability"] = str(policy)
+    save_settings(settings)
+
+
+def get_group_commit_ms() -> int:
+    return int(load_settings().get("group_commit_ms", DEFAULT_GROUP_COMMIT_MS))
+
+
+def set_group_commit_ms(ms: int) -> None:
+    settings = load_settings()
+    settings["group_commit_ms"] = int(ms)
+    save_settings(settings)
+
+
+def get_device_id() -> str:
+    """Stable id for this installation, created on first use. Names this
+    device's segment folder in the WebDAV per-device layout."""
+    settings = load_settings()
+    device_id = settings.get("device_id")
+    if not device_id:
+        device_id = settings["device_id"] = uuid.uuid4().hex[:12]
+        save_settings(settings)
+    return device_id
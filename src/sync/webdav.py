@@ -26,25 +26,49 @@ The remote file is a shared log other devices (or a linked Google Form)
 may also write to, so push_pending() never overwrites it - it fetches,
 merges in this device's new rows, and PUTs back conditionally (ETag
 If-Match, or If-None-Match: * on create), retrying on conflict.
+
+The last-seen remote file is cached next to sync.db, keyed by its ETag, so
+a fetch is a conditional GET that usually comes back 304. Servers with
+SabreDAV's partial-update support (detected once per URL, recorded in
+sync.db) skip the fetch/merge entirely: new rows are PATCHed onto the end.
+
+Forms can instead use the per-device segment layout (sync.db
+"webdav_layout" = "segments"): each push is a small create-only PUT
+(If-None-Match: *) of a new `<stem>/<device-id>/<seq>.csv` next to the
+shared file, so devices never contend for one ETag. compact() folds every
+segment into the shared file and deletes them; it runs on demand, or
+periodically on the one device designated as compactor for that form. The
+segments being merged are recorded before the shared file is appended to,
+so a compaction interrupted in between can tell whether its rows already
+made it in instead of appending them twice.
 """
 
 import base64
 import csv
 import io
+import json
+import os
+import time
 import urllib.error
+import urllib.parse
 import urllib.request
+import xml.etree.ElementTree as ET
 
+from ..csv_lock import CsvLock
 from . import keyring
 from .backend import SyncBackend, SyncConfig, SyncError
 from .queue import (
+    advance_sync_cursor,
+    clear_config,
     get_config,
     get_last_synced_row,
+    iter_pending_batches,
     log_sync_ok,
-    read_csv_rows_from,
     rows_to_csv_text,
     set_config,
-    set_last_synced_row,
+    transaction,
 )
+from .settings import get_device_id, get_webdav_append
 
 # Keyring "form" attribute used for the app-wide (not per-form) credentials.
 _APP_SCOPE = "app"
@@ -53,6 +77,38 @@ _CRED_KEY = "webdav"
 # Fetch/merge/PUT rounds to try before giving up and letting the worker retry later.
 _MAX_CONFLICT_RETRIES = 5
 
+# Every batch is a full fetch/merge/PUT round, so batches are larger than
+# the default to keep a full resync from re-downloading the file too often.
+_PUSH_BATCH_ROWS = 5000
+
+# SabreDAV's PartialUpdate plugin: PATCH with this body type and an
+# X-Update-Range header writes the body into the file without replacing it.
+_PARTIAL_UPDATE_TYPE = "application/x-sabredav-partialupdate"
+
+
+# A designated compactor folds segments into the shared file at most this often.
+_COMPACT_INTERVAL = 3600
+
+_DAV_NS = "{DAV:}"
+_PROPFIND_BODY = (
+    b'<?xml version="1.0" encoding="utf-8"?>'
+    b'<d:propfind xmlns:d="DAV:"><d:prop><d:resourcetype/></d:prop></d:propfind>'
+)
+
+
+def _segments_url(url: str) -> str:
+    """Collection holding every device's segments: `.../responses.csv` -> `.../responses/`."""
+    parts = urllib.parse.urlsplit(url)
+    path = parts.path.rstrip("/")
+    stem = path[:-4] if path.lower().endswith(".csv") else path + ".d"
+    return urllib.parse.urlunsplit(parts._replace(path=stem + "/", query="", fragment=""))
+
+
+def _cache_path(db_path: str) -> str:
+    """`<form_name>.sync.db` -> `<form_name>.sync.remote.csv`."""
+    base, _ext = os.path.splitext(db_path)
+    return f"{base}.remote.csv"
+
 
 class WebDAVBackend(SyncBackend):
     """Appends this device's new rows to a shared remote CSV file over WebDAV."""
@@ -82,7 +138,11 @@ class WebDAVBackend(SyncBackend):
 
     def link(self, db_path: str, url: str) -> None:
         """Set this form's destination URL. Credentials are app-wide - see set_credentials()."""
-        set_config(db_path, "webdav_url", url)
+        with transaction(db_path):
+            if url != get_config(db_path, "webdav_url"):
+                clear_config(db_path, "webdav_append_support")
+                self._forget_remote(db_path)
+            set_config(db_path, "webdav_url", url)
 
     def _credentials(self) -> str:
         token = keyring.load_token(_APP_SCOPE, _CRED_KEY)
@@ -115,22 +175,88 @@ class WebDAVBackend(SyncBackend):
     def ensure_headers(self, db_path: str, headers: list[str]) -> None:
         pass  # header check happens inline in push_pending, which fetches remote content anyway
 
-    def _fetch_remote(self, url: str, creds: str) -> tuple[str | None, str | None]:
-        """(content, etag); content is None if the remote file doesn't exist yet."""
+    # -- Remote file cache ---------------------------------------------------
+
+    @staticmethod
+    def _cached_remote(db_path: str, url: str) -> tuple[str | None, str | None]:
+        """(content, etag) of the cached copy of `url`; etag is None if the
+        cache may be behind the server (e.g. after an append without one)."""
+        if get_config(db_path, "webdav_cache_url") != url:
+            return None, None
+        try:
+            with open(_cache_path(db_path), "rb") as f:
+                content = f.read().decode("utf-8")
+        except (OSError, UnicodeDecodeError):
+            return None, None
+        return content, get_config(db_path, "webdav_cache_etag")
+
+    @staticmethod
+    def _remember_remote(db_path: str, url: str, content: str, etag: str | None) -> None:
+        path = _cache_path(db_path)
+        tmp_path = path + ".tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(content.encode("utf-8"))
+            os.replace(tmp_path, path)
+        except OSError:
+            WebDAVBackend._forget_remote(db_path)
+            return
+        with transaction(db_path):
+            set_config(db_path, "webdav_cache_url", url)
+            if etag:
+                set_config(db_path, "webdav_cache_etag", etag)
+            else:
+                clear_config(db_path, "webdav_cache_etag")
+
+    @staticmethod
+    def _extend_cached_remote(db_path: str, text: str) -> None:
+        """Record rows appended with PATCH. Other devices may have appended in
+        between, so the cached ETag is dropped - the next merge re-downloads."""
+        clear_config(db_path, "webdav_cache_etag")
+        try:
+            with open(_cache_path(db_path), "ab") as f:
+                f.write(text.encode("utf-8"))
+        except OSError:
+            WebDAVBackend._forget_remote(db_path)
+
+    @staticmethod
+    def _forget_remote(db_path: str) -> None:
+        with transaction(db_path):
+            clear_config(db_path, "webdav_cache_url")
+            clear_config(db_path, "webdav_cache_etag")
+        try:
+            os.remove(_cache_path(db_path))
+        except OSError:
+            pass
+
+    def _fetch_remote(self, db_path: str, url: str, creds: str) -> tuple[str | None, str | None]:
+        """(content, etag); content is None if the remote file doesn't exist yet.
+        Revalidates the cached copy with If-None-Match instead of re-downloading it."""
+        cached, cached_etag = self._cached_remote(db_path, url)
         req = urllib.request.Request(url, method="GET")
         req.add_header("Authorization", f"Basic {creds}")
+        if cached is not None and cached_etag:
+            req.add_header("If-None-Match", cached_etag)
         try:
             with urllib.request.urlopen(req, timeout=30) as resp:
-                return resp.read().decode("utf-8"), resp.headers.get("ETag")
+                content, etag = resp.read().decode("utf-8"), resp.headers.get("ETag")
         except urllib.error.HTTPError as e:
+            if e.code == 304 and cached is not None:
+                return cached, cached_etag
             if e.code == 404:
+                self._forget_remote(db_path)
                 return None, None
             raise SyncError(f"Could not read remote CSV ({e.code}): {e.read().decode('utf-8', 'replace')}") from e
         except urllib.error.URLError as e:
             raise SyncError(f"WebDAV server unreachable: {e.reason}") from e
+        self._remember_remote(db_path, url, content, etag)
+        return content, etag
 
-    def _put(self, url: str, creds: str, content: str, *, if_match: str | None, if_none_match: str | None) -> bool:
-        """Conditional PUT. Returns False on a 412/409 so the caller can retry instead of raising."""
+    def _put(
+        self, url: str, creds: str, content: str, *, if_match: str | None, if_none_match: str | None
+    ) -> tuple[bool, str | None]:
+        """Conditional PUT -> (stored, new etag if the server sent one). Returns
+        (False, None) on a 412/409 so the caller can retry instead of raising."""
         req = urllib.request.Request(url, data=content.encode("utf-8"), method="PUT")
         req.add_header("Authorization", f"Basic {creds}")
         req.add_header("Content-Type", "text/csv; charset=utf-8")
@@ -138,39 +264,129 @@ class WebDAVBackend(SyncBackend):
             req.add_header("If-Match", if_match)
         if if_none_match:
             req.add_header("If-None-Match", if_none_match)
+        try:
+            with urllib.request.urlopen(req, timeout=30) as resp:
+                return True, resp.headers.get("ETag")
+        except urllib.error.HTTPError as e:
+            if e.code in (412, 409):
+                return False, None
+            raise SyncError(f"WebDAV upload failed ({e.code}): {e.read().decode('utf-8', 'replace')}") from e
+        except urllib.error.URLError as e:
+            raise SyncError(f"WebDAV server unreachable: {e.reason}") from e
+
+    # -- Append mode ---------------------------------------------------------
+
+    def _supports_append(self, db_path: str, url: str, creds: str) -> bool:
+        """Whether the server takes SabreDAV partial-update PATCHes. Probed with
+        OPTIONS the first time a URL is pushed to; the answer lives in sync.db."""
+        known = get_config(db_path, "webdav_append_support")
+        if known is not None:
+            return known == "1"
+
+        req = urllib.request.Request(url, method="OPTIONS")
+        req.add_header("Authorization", f"Basic {creds}")
+        try:
+            with urllib.request.urlopen(req, timeout=10) as resp:
+                accept_patch = resp.headers.get("Accept-Patch", "")
+                dav = resp.headers.get("DAV", "")
+        except urllib.error.HTTPError as e:
+            if e.code in (401, 403):
+                raise SyncError(f"WebDAV server rejected the credentials ({e.code})") from e
+            accept_patch = dav = ""  # no OPTIONS support - treat as no partial updates
+        except urllib.error.URLError as e:
+            raise SyncError(f"WebDAV server unreachable: {e.reason}") from e
+
+        supported = _PARTIAL_UPDATE_TYPE in accept_patch or "sabredav-partialupdate" in dav
+        set_config(db_path, "webdav_append_support", "1" if supported else "0")
+        return supported
+
+    def _patch_append(self, db_path: str, url: str, creds: str, text: str) -> bool:
+        """PATCH `text` onto the end of the remote file. Returns False if the
+        server turned out not to support partial updates after all - recorded
+        so later pushes don't try again."""
+        req = urllib.request.Request(url, data=text.encode("utf-8"), method="PATCH")
+        req.add_header("Authorization", f"Basic {creds}")
+        req.add_header("Content-Type", _PARTIAL_UPDATE_TYPE)
+        req.add_header("X-Update-Range", "append")
         try:
             urllib.request.urlopen(req, timeout=30)
             return True
         except urllib.error.HTTPError as e:
-            if e.code in (412, 409):
+            if e.code in (405, 415, 501):
+                set_config(db_path, "webdav_append_support", "0")
                 return False
             raise SyncError(f"WebDAV upload failed ({e.code}): {e.read().decode('utf-8', 'replace')}") from e
         except urllib.error.URLError as e:
             raise SyncError(f"WebDAV server unreachable: {e.reason}") from e
 
-    def push_pending(self, csv_path: str, db_path: str) -> int:
-        previous_last = get_last_synced_row(db_path)
-        header, new_rows = read_csv_rows_from(csv_path, previous_last + 1)
-        if not new_rows:
-            return 0  # nothing new since the last push
+    def _try_append(self, db_path: str, url: str, creds: str, header: list[str], new_text: str) -> bool:
+        """Append-mode push. Only used once a cached copy shows the remote file
+        exists with this form's header; returns False to fall back to merging."""
+        if not get_webdav_append() or not self._supports_append(db_path, url, creds):
+            return False
+        cached, _etag = self._cached_remote(db_path, url)
+        if not cached or not cached.strip():
+            return False
+        if next(csv.reader(io.StringIO(cached)), []) != header:
+            return False  # let the merge path re-check against the live file and report it
+
+        if not cached.endswith(("\r\n", "\n", "\r")):
+            new_text = "\r\n" + new_text
+        if not self._patch_append(db_path, url, creds, new_text):
+            return False
+        self._extend_cached_remote(db_path, new_text)
+        return True
 
+    def _destination(self, db_path: str) -> tuple[str, str]:
         url = get_config(db_path, "webdav_url")
         if not url:
             raise SyncError("No WebDAV URL configured. Open sync settings to set one.")
-        creds = self._credentials()
+        return url, self._credentials()
+
+    def push_pending(self, csv_path: str, db_path: str) -> int:
+        segmented = get_config(db_path, "webdav_layout") == "segments"
+        last_row = get_last_synced_row(db_path)
+        pushed = 0
+        url = creds = None
+        for header, rows, end_offset, source in iter_pending_batches(csv_path, db_path, _PUSH_BATCH_ROWS):
+            if url is None:
+                url, creds = self._destination(db_path)
+            assert creds is not None
+            if segmented:
+                seq = int(get_config(db_path, "webdav_segment_seq") or 0) + 1
+                seq = self._put_segment(url, creds, seq, header, rows)
+            else:
+                self._append_rows(db_path, url, creds, header, rows)
+
+            with transaction(db_path):
+                advance_sync_cursor(db_path, csv_path, last_row + len(rows), end_offset, source)
+                log_sync_ok(db_path, last_row + 1, last_row + len(rows))
+                if segmented:
+                    set_config(db_path, "webdav_segment_seq", str(seq))
+            last_row += len(rows)
+            pushed += len(rows)
+
+        if segmented and get_config(db_path, "webdav_compactor") == "1":
+            last = float(get_config(db_path, "webdav_compacted_at") or 0)
+            if time.time() - last >= _COMPACT_INTERVAL:
+                self.compact(db_path)
+        return pushed
+
+    def _append_rows(self, db_path: str, url: str, creds: str, header: list[str], new_rows: list[list[str]]) -> None:
         new_text = rows_to_csv_text(new_rows)
+        if self._try_append(db_path, url, creds, header, new_text):
+            return
 
-        succeeded = False
         for _attempt in range(_MAX_CONFLICT_RETRIES):
-            remote_content, etag = self._fetch_remote(url, creds)
+            remote_content, etag = self._fetch_remote(db_path, url, creds)
             exists = remote_content is not None and bool(remote_content.strip())
 
             if not exists:
-                merged = (rows_to_csv_text([header]) if header else "") + new_text
+                merged = rows_to_csv_text([header]) + new_text
             else:
                 assert remote_content is not None
                 remote_header = next(csv.reader(io.StringIO(remote_content)), [])
-                if remote_header and header is not None and remote_header != header:
+                if remote_header and remote_header != header:
                     raise SyncError(
                         "The shared WebDAV file's columns no longer match this form "
                         "(it may have been edited elsewhere). Point this form at a "
@@ -182,20 +398,202 @@ class WebDAVBackend(SyncBackend):
                 merged += new_text
 
             if remote_content is None:
-                ok = self._put(url, creds, merged, if_match=None, if_none_match="*")
+                ok, new_etag = self._put(url, creds, merged, if_match=None, if_none_match="*")
             else:
-                ok = self._put(url, creds, merged, if_match=etag, if_none_match=None)
+                ok, new_etag = self._put(url, creds, merged, if_match=etag, if_none_match=None)
             if ok:
-                succeeded = True
-                break
-
-        if not succeeded:
-            raise SyncError(
-                "Could not append to the shared WebDAV file after several attempts - "
-                "another device kept winning the race. Will retry on the next sync."
-            )
-
-        new_last = previous_last + len(new_rows)
-        set_last_synced_row(db_path, new_last)
-        log_sync_ok(db_path, previous_last + 1, new_last)
-        return len(new_rows)
+                # What we uploaded is the remote file now; with its ETag the
+                # next fetch is a 304 instead of a download.
+                self._remember_remote(db_path, url, merged, new_etag)
+                return
+
+        raise SyncError(
+            "Could not append to the shared WebDAV file after several attempts - "
+            "another device kept winning the race. Will retry on the next sync."
+        )
+
+    # -- Segment layout ------------------------------------------------------
+
+    def _put_segment(self, url: str, creds: str, seq: int, header: list[str], rows: list[list[str]]) -> int:
+        """Upload one batch as this device's segment number `seq` (or the
+        next free one); returns the number used. The PUT only creates: a
+        segment already there is either this very upload, retried after a
+        crash, or one not yet compacted that a reset sync.db or a new
+        device id would otherwise overwrite - then the batch moves past
+        this device's highest segment instead."""
+        device_url = urllib.parse.urljoin(_segments_url(url), get_device_id() + "/")
+        content = rows_to_csv_text([header, *rows])
+        made_folders = False
+        for _attempt in range(_MAX_CONFLICT_RETRIES):
+            segment_url = urllib.parse.urljoin(device_url, f"{seq:08d}.csv")
+            ok, _etag = self._put(segment_url, creds, content, if_match=None, if_none_match="*")
+            if ok:
+                return seq
+            existing = self._fetch_segment(segment_url, creds)
+            if existing is None:
+                # 409: the folders don't exist yet - create them once and retry.
+                if made_folders:
+                    raise SyncError(f"Could not create the segment folder {device_url} on the WebDAV server.")
+                self._mkcol(_segments_url(url), creds)
+                self._mkcol(device_url, creds)
+                made_folders = True
+            elif existing == content:
+                return seq  # our own earlier upload
+            else:
+                seq = max(seq, self._last_segment_seq(device_url, creds)) + 1
+        raise SyncError("Could not find a free segment name on the WebDAV server. Will retry on the next sync.")
+
+    def _last_segment_seq(self, device_url: str, creds: str) -> int:
+        """Highest segment number in a device's folder (0 if none)."""
+        last = 0
+        for child_url, is_collection in self._list_collection(device_url, creds):
+            name = urllib.parse.unquote(urllib.parse.urlsplit(child_url).path).rstrip("/").rsplit("/", 1)[-1]
+            if not is_collection and name.lower().endswith(".csv") and name[:-4].isdigit():
+                last = max(last, int(name[:-4]))
+        return last
+
+    def _mkcol(self, url: str, creds: str) -> None:
+        req = urllib.request.Request(url, method="MKCOL")
+        req.add_header("Authorization", f"Basic {creds}")
+        try:
+            urllib.request.urlopen(req, timeout=30)
+        except urllib.error.HTTPError as e:
+            if e.code != 405:  # 405: it already exists
+                raise SyncError(f"Could not create WebDAV folder ({e.code}): {e.read().decode('utf-8', 'replace')}") from e
+        except urllib.error.URLError as e:
+            raise SyncError(f"WebDAV server unreachable: {e.reason}") from e
+
+    def _list_collection(self, url: str, creds: str) -> list[tuple[str, bool]]:
+        """(absolute url, is_collection) for each direct child of collection `url`."""
+        req = urllib.request.Request(url, data=_PROPFIND_BODY, method="PROPFIND")
+        req.add_header("Authorization", f"Basic {creds}")
+        req.add_header("Content-Type", "application/xml; charset=utf-8")
+        req.add_header("Depth", "1")
+        try:
+            with urllib.request.urlopen(req, timeout=30) as resp:
+                tree = ET.fromstring(resp.read())
+        except urllib.error.HTTPError as e:
+            if e.code == 404:
+                return []
+            raise SyncError(f"Could not list WebDAV folder ({e.code}): {e.read().decode('utf-8', 'replace')}") from e
+        except urllib.error.URLError as e:
+            raise SyncError(f"WebDAV server unreachable: {e.reason}") from e
+        except ET.ParseError as e:
+            raise SyncError(f"Unexpected WebDAV folder listing: {e}") from e
+
+        own_path = urllib.parse.unquote(urllib.parse.urlsplit(url).path).rstrip("/")
+        children = []
+        for response in tree.iter(f"{_DAV_NS}response"):
+            href = response.findtext(f"{_DAV_NS}href")
+            if not href:
+                continue
+            child_url = urllib.parse.urljoin(url, href)
+            if urllib.parse.unquote(urllib.parse.urlsplit(child_url).path).rstrip("/") == own_path:
+                continue
+            is_collection = response.find(f".//{_DAV_NS}resourcetype/{_DAV_NS}collection") is not None
+            children.append((child_url, is_collection))
+        return children
+
+    def _delete(self, url: str, creds: str) -> None:
+        req = urllib.request.Request(url, method="DELETE")
+        req.add_header("Authorization", f"Basic {creds}")
+        try:
+            urllib.request.urlopen(req, timeout=30)
+        except urllib.error.HTTPError as e:
+            if e.code != 404:
+                raise SyncError(f"Could not delete WebDAV file ({e.code}): {e.read().decode('utf-8', 'replace')}") from e
+        except urllib.error.URLError as e:
+            raise SyncError(f"WebDAV server unreachable: {e.reason}") from e
+
+    def _delete_compacted(self, db_path: str, creds: str) -> None:
+        """Delete segments already merged into the shared file. The list is
+        saved before deleting, so an interrupted compaction finishes the job
+        next time instead of merging those segments twice."""
+        pending = json.loads(get_config(db_path, "webdav_compacted_segments") or "[]")
+        for segment_url in pending:
+            self._delete(segment_url, creds)
+        clear_config(db_path, "webdav_compacted_segments")
+
+    def compact(self, db_path: str) -> int | None:
+        """Merge every device's segments into the shared CSV, then delete them.
+        Returns the number of rows merged, or None if this form is already
+        being compacted (by the hourly run, the Merge button or another
+        window). Safe to run from any device, but only one at a time - two
+        compactors racing can merge a segment twice."""
+        lock = CsvLock(db_path, db_path + ".compact.lock")
+        if not lock.acquire(blocking=False):
+            return None
+        try:
+            return self._compact_locked(db_path)
+        finally:
+            lock.release()
+            lock.close()
+
+    def _compact_locked(self, db_path: str) -> int:
+        url, creds = self._destination(db_path)
+        self._delete_compacted(db_path, creds)
+
+        # Segments of a merge interrupted after it was recorded: finish that
+        # one first, exactly as listed then.
+        resumed = json.loads(get_config(db_path, "webdav_merging_segments") or "[]")
+        segment_urls = list(resumed)
+        if not segment_urls:
+            for device_url, is_collection in self._list_collection(_segments_url(url), creds):
+                if is_collection:
+                    segment_urls.extend(
+                        child for child, child_is_collection in self._list_collection(device_url, creds)
+                        if not child_is_collection and child.lower().endswith(".csv")
+                    )
+            segment_urls.sort()
+
+        header: list[str] | None = None
+        rows: list[list[str]] = []
+        merged_urls = []
+        for segment_url in segment_urls:
+            content = self._fetch_segment(segment_url, creds)
+            if content is None:
+                continue  # deleted by someone else since the listing
+            segment_rows = list(csv.reader(io.StringIO(content)))
+            if not segment_rows:
+                merged_urls.append(segment_url)
+                continue
+            if header is None:
+                header = segment_rows[0]
+            elif segment_rows[0] != header:
+                raise SyncError(
+                    "Devices are uploading segments with different columns - update the form "
+                    "on every device before compacting."
+                )
+            rows.extend(segment_rows[1:])
+            merged_urls.append(segment_url)
+
+        if header is not None and rows:
+            # Recorded before appending, so a crash or lost connection
+            # between the two is resumed above rather than merged anew.
+            set_config(db_path, "webdav_merging_segments", json.dumps(merged_urls))
+            if not (resumed and self._remote_contains(db_path, url, creds, rows_to_csv_text(rows))):
+                self._append_rows(db_path, url, creds, header, rows)
+        with transaction(db_path):
+            set_config(db_path, "webdav_compacted_segments", json.dumps(merged_urls))
+            clear_config(db_path, "webdav_merging_segments")
+            set_config(db_path, "webdav_compacted_at", str(time.time()))
+        self._delete_compacted(db_path, creds)
+        return len(rows)
+
+    def _remote_contains(self, db_path: str, url: str, creds: str, text: str) -> bool:
+        """Whether an interrupted merge's rows already reached the shared file."""
+        content, _etag = self._fetch_remote(db_path, url, creds)
+        return content is not None and text in content
+
+    def _fetch_segment(self, url: str, creds: str) -> str | None:
+        req = urllib.request.Request(url, method="GET")
+        req.add_header("Authorization", f"Basic {creds}")
+        try:
+            with urllib.request.urlopen(req, timeout=30) as resp:
+                return resp.read().decode("utf-8")
+        except urllib.error.HTTPError as e:
+            if e.code == 404:
+                return None
+            raise SyncError(f"Could not read segment ({e.code}): {e.read().decode('utf-8', 'replace')}") from e
+        except urllib.error.URLError as e:
+            raise SyncError(f"WebDAV server unreachable: {e.reason}") from e
@@ -17,20 +17,26 @@
 #
 # SPDX-License-Identifier: GPL-3.0-or-later
 
-import threading
+import time
 from datetime import datetime, timezone
 
+from ..csv_lock import push_locked
 from .backend import SyncBackend, SyncError
-from .queue import log_sync_error
+from .queue import close_connections, log_sync_error
+from .scheduler import get_scheduler
 
+# Longest back-off between retries after repeated failures.
+_MAX_BACKOFF = 600
 
-class SyncWorker(threading.Thread):
+
+class SyncWorker:
     """
-    Background thread (daemon, so it never blocks app exit) that periodically
-    pushes pending CSV rows to a SyncBackend.
+    One form's periodic push of pending CSV rows to a SyncBackend. It owns
+    no thread: start() registers it with the app-wide SyncScheduler (see
+    scheduler.py), whose pool threads call run_once() whenever it's due.
 
     This class never touches GTK. `on_status(status, message)` is invoked from
-    the worker thread itself — callers that update widgets must marshal it
+    a scheduler thread — callers that update widgets must marshal it
     through GLib.idle_add.
     """
 
@@ -41,49 +47,81 @@ class SyncWorker(threading.Thread):
         db_path: str,
         interval: int = 30,
         on_status=None,
+        debounce: float = 0,
+        max_latency: float = 0,
     ):
-        super().__init__(daemon=True)
         self.backend = backend
         self.csv_path = csv_path
         self.db_path = db_path
         self.interval = interval
         self.on_status = on_status
-        self._trigger = threading.Event()
-        self._stop = threading.Event()
+        self.debounce = debounce
+        self.max_latency = max_latency
+        self._backoff = interval
+        self._started = False
+        # Scheduler bookkeeping - only touched under the scheduler's lock.
+        self._due: float | None = None
+        self._running = False
+        self._rerun_at: float | None = None
+        self._removed = False
+        self._burst_start: float | None = None
+        self._settle_at: float | None = None
+
+    def start(self) -> None:
+        if not self._started:
+            self._started = True
+            get_scheduler().add(self, delay=self.interval)
+
+    def is_alive(self) -> bool:
+        return self._started and not self._removed
+
+    def trigger(self, coalesce: bool = False) -> None:
+        """Push as soon as possible (e.g. 'Sync Now').
 
-    def trigger(self) -> None:
-        """Wake the worker immediately (e.g. after a new row is appended, or 'Sync Now')."""
-        self._trigger.set()
+        With `coalesce` (used for each new submission), wait until no new
+        trigger has arrived for `debounce` seconds - but never longer than
+        `max_latency` after the first - so a burst of submissions goes out
+        as one push.
+        """
+        if not self.is_alive():
+            return
+        if coalesce and self.debounce > 0:
+            get_scheduler().coalesce(self, self.debounce, max(self.max_latency, self.debounce))
+        else:
+            get_scheduler().request(self, time.monotonic())
 
     def stop(self) -> None:
-        self._stop.set()
-        self._trigger.set()
+        if self._started:
+            get_scheduler().remove(self)
 
     def _report(self, status: str, message: str = "") -> None:
         if self.on_status:
             self.on_status(status, message)
 
-    def run(self) -> None:
-        backoff = self.interval
-        while not self._stop.is_set():
-            self._trigger.wait(timeout=backoff)
-            self._trigger.clear()
-            if self._stop.is_set():
-                break
-            try:
+    def run_once(self) -> float:
+        """One push attempt; returns the seconds until the next scheduled one."""
+        try:
+            # Held from reading the rows to saving the cursor, so compaction
+            # can't renumber them in between.
+            with push_locked(self.csv_path):
                 pushed = self.backend.push_pending(self.csv_path, self.db_path)
-                backoff = self.interval
-                now = datetime.now(timezone.utc).strftime("%H:%M:%S")
-                if pushed:
-                    self._report("ok", f"Synced {pushed} row(s) at {now}")
-                else:
-                    self._report("ok", f"Nothing new to sync (checked {now})")
-            except SyncError as e:
-                backoff = min(backoff * 2, 600)
-                log_sync_error(self.db_path, -1, str(e))
-                self._report("error", str(e))
-            except Exception as e:
-                # don't let an unhandled backend error kill the thread silently
-                backoff = min(backoff * 2, 600)
-                log_sync_error(self.db_path, -1, f"Unexpected error: {e}")
-                self._report("error", f"Unexpected error: {e}")
+            self._backoff = self.interval
+            now = datetime.now(timezone.utc).strftime("%H:%M:%S")
+            if pushed:
+                self._report("ok", f"Synced {pushed} row(s) at {now}")
+            else:
+                self._report("ok", f"Nothing new to sync (checked {now})")
+        except SyncError as e:
+            self._backoff = min(self._backoff * 2, _MAX_BACKOFF)
+            log_sync_error(self.db_path, -1, str(e))
+            self._report("error", str(e))
+        except Exception as e:
+            # don't let an unhandled backend error take down a pool thread
+            self._backoff = min(self._backoff * 2, _MAX_BACKOFF)
+            log_sync_error(self.db_path, -1, f"Unexpected error: {e}")
+            self._report("error", f"Unexpected error: {e}")
+        finally:
+            # Pool threads outlive the forms they push for - don't let each
+            # one keep a connection to every sync.db it has ever touched.
+            close_connections()
+        return self._backoff
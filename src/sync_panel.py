@@ -41,13 +41,16 @@ from .sync.queue import (
     reset_sync_progress,
     set_config,
 )
-from .sync.settings import get_interval
+from .sync.settings import get_debounce, get_interval, get_max_latency
 from .sync.worker import SyncWorker
 from .utils import root_as_widget
 
 _BACKEND_CHOICES = ["Disabled", BACKEND_LABELS["google_sheets"], BACKEND_LABELS["webdav"]]
 _BACKEND_IDS = [None, "google_sheets", "webdav"]
 
+_WEBDAV_LAYOUT_CHOICES = ["One shared file", "Per-device segments"]
+_WEBDAV_LAYOUT_IDS = ["shared", "segments"]
+
 
 class FormSyncPanel(Adw.Dialog):
     """
@@ -110,6 +113,27 @@ class FormSyncPanel(Adw.Dialog):
         self._webdav_url_row.connect("entry-activated", self._on_webdav_url_applied)
         dest_group.add(self._webdav_url_row)
 
+        self._webdav_layout_row = Adw.ComboRow(
+            title="Upload layout",
+            subtitle="Segments avoid conflicts when many devices share one file",
+            model=Gtk.StringList.new(_WEBDAV_LAYOUT_CHOICES),
+        )
+        self._webdav_layout_row.connect("notify::selected", self._on_webdav_layout_changed)
+        dest_group.add(self._webdav_layout_row)
+
+        self._webdav_compactor_row = Adw.SwitchRow(
+            title="Merge segments on this device",
+            subtitle="Periodically fold every device's segments into the shared file",
+        )
+        self._webdav_compactor_row.connect("notify::active", self._on_webdav_compactor_changed)
+        dest_group.add(self._webdav_compactor_row)
+
+        self._webdav_compact_row = Adw.ActionRow(title="Merge Segments Now")
+        self._webdav_compact_btn = Gtk.Button(label="Merge", valign=Gtk.Align.CENTER)
+        self._webdav_compact_btn.connect("clicked", self._on_webdav_compact_clicked)
+        self._webdav_compact_row.add_suffix(self._webdav_compact_btn)
+        dest_group.add(self._webdav_compact_row)
+
         status_group = Adw.PreferencesGroup(title="Status")
         page.add(status_group)
 
@@ -142,6 +166,9 @@ class FormSyncPanel(Adw.Dialog):
 
         self._sheet_id_row.set_text(get_config(self._db_path, "sheet_id") or "")
         self._webdav_url_row.set_text(get_config(self._db_path, "webdav_url") or "")
+        layout = get_config(self._db_path, "webdav_layout") or "shared"
+        self._webdav_layout_row.set_selected(_WEBDAV_LAYOUT_IDS.index(layout) if layout in _WEBDAV_LAYOUT_IDS else 0)
+        self._webdav_compactor_row.set_active(get_config(self._db_path, "webdav_compactor") == "1")
 
         self._update_visibility()
         self._refresh_status_row()
@@ -158,6 +185,10 @@ class FormSyncPanel(Adw.Dialog):
         backend_id = self._selected_backend_id()
         self._sheet_id_row.set_visible(backend_id == "google_sheets")
         self._webdav_url_row.set_visible(backend_id == "webdav")
+        self._webdav_layout_row.set_visible(backend_id == "webdav")
+        segmented = self._webdav_layout_row.get_selected() == _WEBDAV_LAYOUT_IDS.index("segments")
+        self._webdav_compactor_row.set_visible(backend_id == "webdav" and segmented)
+        self._webdav_compact_row.set_visible(backend_id == "webdav" and segmented)
 
         configured = bool(backend_id) and is_backend_configured(backend_id)
         self._hint_row.set_visible(bool(backend_id) and not configured)
@@ -279,6 +310,43 @@ class FormSyncPanel(Adw.Dialog):
             mark_all_synced(self._db_path, self._csv_path)
         self._ensure_worker()
 
+    def _on_webdav_layout_changed(self, *_):
+        layout = _WEBDAV_LAYOUT_IDS[self._webdav_layout_row.get_selected()]
+        if layout != (get_config(self._db_path, "webdav_layout") or "shared"):
+            set_config(self._db_path, "webdav_layout", layout)
+        self._update_visibility()
+
+    def _on_webdav_compactor_changed(self, *_):
+        set_config(self._db_path, "webdav_compactor", "1" if self._webdav_compactor_row.get_active() else "0")
+
+    def _on_webdav_compact_clicked(self, *_):
+        if not get_config(self._db_path, "webdav_url") or not is_backend_configured("webdav"):
+            self._status_row.set_subtitle("Set a WebDAV URL and credentials first")
+            return
+
+        backend = get_backend("webdav", self._form_name)
+        self._webdav_compact_btn.set_sensitive(False)
+        self._status_row.set_subtitle("Merging segments…")
+
+        def _compact():
+            try:
+                merged = backend.compact(self._db_path)
+                GLib.idle_add(self._on_webdav_compacted, merged, None)
+            except Exception as e:  # anything uncaught would leave the button disabled
+                GLib.idle_add(self._on_webdav_compacted, 0, e)
+
+        threading.Thread(target=_compact, daemon=True).start()
+
+    def _on_webdav_compacted(self, merged, error):
+        self._webdav_compact_btn.set_sensitive(True)
+        if error:
+            self._status_row.set_subtitle(f"Error: {error}")
+        elif merged is None:
+            self._status_row.set_subtitle("Segments are already being merged; try again in a moment")
+        else:
+            self._status_row.set_subtitle(f"Merged {merged} row(s) into the shared file")
+        return GLib.SOURCE_REMOVE
+
     # -- Worker lifecycle ---------------------------------------------------
 
     def _ensure_worker(self):
@@ -293,7 +361,13 @@ class FormSyncPanel(Adw.Dialog):
 
         backend = get_backend(backend_id, self._form_name)
         worker = SyncWorker(
-            backend, self._csv_path, self._db_path, interval=get_interval(), on_status=self._on_worker_status
+            backend,
+            self._csv_path,
+            self._db_path,
+            interval=get_interval(),
+            on_status=self._on_worker_status,
+            debounce=get_debounce(),
+            max_latency=get_max_latency(),
         )
         self._page.sync_worker = worker
         worker.start()
@@ -27,9 +27,25 @@ import threading
 
 from gi.repository import Adw, GLib, Gtk
 
+from .csv_writer import DURABILITY_POLICIES
 from .sync import keyring
 from .sync.google_sheets import GoogleSheetsBackend
-from .sync.settings import get_interval, set_interval
+from .sync.settings import (
+    get_debounce,
+    get_durability,
+    get_group_commit_ms,
+    get_header_ttl,
+    get_interval,
+    get_max_latency,
+    get_webdav_append,
+    set_debounce,
+    set_durability,
+    set_group_commit_ms,
+    set_header_ttl,
+    set_interval,
+    set_max_latency,
+    set_webdav_append,
+)
 from .sync.webdav import WebDAVBackend
 
 
@@ -100,6 +116,13 @@ class SyncSettingsDialog(Adw.Dialog):
         self._webdav_status_row.add_suffix(self._save_webdav_btn)
         webdav_group.add(self._webdav_status_row)
 
+        self._webdav_append_row = Adw.SwitchRow(
+            title="Upload only new rows",
+            subtitle="Append to the shared file instead of re-uploading it, on servers that support it",
+        )
+        self._webdav_append_row.connect("notify::active", self._on_webdav_append_changed)
+        webdav_group.add(self._webdav_append_row)
+
         behaviour_group = Adw.PreferencesGroup(title="Sync Behaviour")
         page.add(behaviour_group)
 
@@ -108,6 +131,43 @@ class SyncSettingsDialog(Adw.Dialog):
         self._interval_row.connect("notify::value", self._on_interval_changed)
         behaviour_group.add(self._interval_row)
 
+        self._debounce_row = Adw.SpinRow.new_with_range(0, 300, 1)
+        self._debounce_row.set_title("Batch new responses for (seconds)")
+        self._debounce_row.set_subtitle("Wait this long for more submissions before pushing; 0 = push each one")
+        self._debounce_row.connect("notify::value", self._on_debounce_changed)
+        behaviour_group.add(self._debounce_row)
+
+        self._max_latency_row = Adw.SpinRow.new_with_range(5, 3600, 5)
+        self._max_latency_row.set_title("Push new responses within (seconds)")
+        self._max_latency_row.set_subtitle("Upper bound on batching during a steady stream of submissions")
+        self._max_latency_row.connect("notify::value", self._on_max_latency_changed)
+        behaviour_group.add(self._max_latency_row)
+
+        self._header_ttl_row = Adw.SpinRow.new_with_range(60, 86400, 60)
+        self._header_ttl_row.set_title("Re-check sheet headers every (seconds)")
+        self._header_ttl_row.set_subtitle("Headers are also re-checked when the form's fields change")
+        self._header_ttl_row.connect("notify::value", self._on_header_ttl_changed)
+        behaviour_group.add(self._header_ttl_row)
+
+        saving_group = Adw.PreferencesGroup(
+            title="Saving Responses",
+            description="How soon each submission must be safely on disk. Applies to forms opened afterwards.",
+        )
+        page.add(saving_group)
+
+        self._durability_row = Adw.ComboRow(title="Write to disk")
+        self._durability_row.set_model(
+            Gtk.StringList.new(["After every response", "In groups", "When the system decides"])
+        )
+        self._durability_row.connect("notify::selected", self._on_durability_changed)
+        saving_group.add(self._durability_row)
+
+        self._group_commit_row = Adw.SpinRow.new_with_range(10, 5000, 10)
+        self._group_commit_row.set_title("Group responses for (ms)")
+        self._group_commit_row.set_subtitle("Submissions within this window share one write to disk")
+        self._group_commit_row.connect("notify::value", self._on_group_commit_changed)
+        saving_group.add(self._group_commit_row)
+
         toolbar_view.set_content(page)
         self.set_child(toolbar_view)
 
@@ -117,6 +177,16 @@ class SyncSettingsDialog(Adw.Dialog):
         self._client_secret_row.set_text("")
         self._webdav_pass_row.set_text("")
         self._interval_row.set_value(get_interval())
+        self._debounce_row.set_value(get_debounce())
+        self._max_latency_row.set_value(get_max_latency())
+        self._header_ttl_row.set_value(get_header_ttl())
+        self._webdav_append_row.set_active(get_webdav_append())
+        durability = get_durability()
+        self._durability_row.set_selected(
+            DURABILITY_POLICIES.index(durability) if durability in DURABILITY_POLICIES else 1
+        )
+        self._group_commit_row.set_value(get_group_commit_ms())
+        self._group_commit_row.set_sensitive(durability == "group")
         self._google_account_row.set_subtitle("Loading…")
         self._webdav_status_row.set_subtitle("Loading…")
 
@@ -262,3 +332,23 @@ class SyncSettingsDialog(Adw.Dialog):
 
     def _on_interval_changed(self, *_):
         set_interval(int(self._interval_row.get_value()))
+
+    def _on_debounce_changed(self, *_):
+        set_debounce(int(self._debounce_row.get_value()))
+
+    def _on_max_latency_changed(self, *_):
+        set_max_latency(int(self._max_latency_row.get_value()))
+
+    def _on_header_ttl_changed(self, *_):
+        set_header_ttl(int(self._header_ttl_row.get_value()))
+
+    def _on_webdav_append_changed(self, *_):
+        set_webdav_append(self._webdav_append_row.get_active())
+
+    def _on_durability_changed(self, *_):
+        policy = DURABILITY_POLICIES[self._durability_row.get_selected()]
+        set_durability(policy)
+        self._group_commit_row.set_sensitive(policy == "group")
+
+    def _on_group_commit_changed(self, *_):
+        set_group_commit_ms(int(self._group_commit_row.get_value()))
@@ -0,0 +1,187 @@
+# tombstones.py
+#
+# Copyright 2025 Aryan Kaushik
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+"""
+Deferred deletes for response CSVs. Deleting a response appends a tombstone
+- the row's byte offset plus a digest of its bytes - to `<form>.csv.deleted`
+instead of rewriting the file. Readers skip tombstoned rows, and compact()
+later drops all of them in a single rewrite, keeping sync.db's cursor on the
+same rows it pointed at before (and the summary cache on the same rows it
+had counted).
+
+The digest makes a tombstone match only the exact row it was written for,
+so a stale log (e.g. the CSV was replaced in between) never removes
+anything else. That only holds if it is the digest of the row the user
+picked, as it was read when shown - not of whatever sits at that offset
+by the time they delete it.
+"""
+
+import os
+import shutil
+import threading
+
+from .csv_index import digest, invalidate as invalidate_index, iter_records
+from .csv_lock import locked, push_locked
+from .response_stats import cached_end as cached_stats_end, rebase_after_compaction
+from .sync.queue import advance_sync_cursor, db_path_for_csv, get_last_synced_row, set_last_synced_row
+
+# One compaction at a time per process; the viewer can start one on close
+# while a reopened viewer starts another before loading.
+_compact_lock = threading.Lock()
+
+
+def tombstone_path(csv_path: str) -> str:
+    """`<form_name>.csv` -> `<form_name>.csv.deleted`."""
+    return csv_path + ".deleted"
+
+
+def add_tombstones(csv_path: str, entries: list[tuple[int, bytes]]) -> None:
+    """Record deletes, as (offset, digest of the row's raw record as read)."""
+    with open(tombstone_path(csv_path), "a", encoding="ascii") as f:
+        for offset, row_digest in entries:
+            f.write(f"{offset} {row_digest.hex()}\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def load_tombstones(csv_path: str) -> dict[int, bytes]:
+    """offset -> row digest for every recorded delete not yet compacted."""
+    tombstones = {}
+    try:
+        with open(tombstone_path(csv_path), encoding="ascii") as f:
+            for line in f:
+                offset, _sep, hex_digest = line.strip().partition(" ")
+                try:
+                    tombstones[int(offset)] = bytes.fromhex(hex_digest)
+                except ValueError:
+                    continue  # torn last line from a crash mid-append
+    except (OSError, UnicodeDecodeError):
+        pass
+    return tombstones
+
+
+def is_deleted(tombstones: dict[int, bytes], offset: int, raw: bytes) -> bool:
+    return offset in tombstones and tombstones[offset] == digest(raw)
+
+
+def _clear(csv_path: str) -> None:
+    try:
+        os.remove(tombstone_path(csv_path))
+    except OSError:
+        pass
+
+
+def _backup(csv_path: str) -> None:
+    """Keep the pre-compaction file as `.bak` - a hard link where the
+    filesystem has them, so the old contents aren't copied."""
+    backup = csv_path + ".bak"
+    try:
+        if os.path.lexists(backup):
+            os.remove(backup)
+        os.link(csv_path, backup)
+    except OSError:
+        try:
+            shutil.copy2(csv_path, backup)
+        except OSError:
+            pass
+
+
+def compact(csv_path: str) -> int:
+    """Rewrite the CSV once without its tombstoned rows; returns how many
+    were dropped. Holds the CSV lock throughout, so appends from any
+    process wait and then go to the new file.
+
+    Skipped (returning 0, tombstones kept) while a sync push is running:
+    the push is reading rows by their current numbering and will save its
+    cursor in it."""
+    with _compact_lock:
+        push_lock = push_locked(csv_path)
+        if not push_lock.acquire(blocking=False):
+            return 0
+        try:
+            with locked(csv_path):
+                return _compact_locked(csv_path)
+        finally:
+            push_lock.release()
+
+
+def _compact_locked(csv_path: str) -> int:
+    tombstones = load_tombstones(csv_path)
+    if not tombstones or not os.path.exists(csv_path):
+        _clear(csv_path)
+        return 0
+
+    db_path = db_path_for_csv(csv_path)
+    last_synced = get_last_synced_row(db_path) if os.path.exists(db_path) else None
+    new_synced_row, synced_end = -1, 0
+
+    tmp_path = csv_path + ".compact"
+    removed_offsets = set()
+    with open(csv_path, "rb") as src, open(tmp_path, "wb") as dst:
+        old_inode = os.fstat(src.fileno()).st_ino
+        stats_end = cached_stats_end(csv_path, old_inode)
+        new_stats_end = None
+        records = iter_records(src, 0)
+        header = next(records, None)
+        if header is None:
+            os.remove(tmp_path)
+            _clear(csv_path)
+            return 0
+        dst.write(header[1])
+        end = len(header[1])
+        row, kept = -1, -1
+        for start, raw in records:
+            row += 1
+            if start == stats_end:
+                new_stats_end = dst.tell()
+            end = start + len(raw)
+            if is_deleted(tombstones, start, raw):
+                removed_offsets.add(start)
+                continue
+            dst.write(raw)
+            kept += 1
+            if last_synced is not None and row <= last_synced:
+                new_synced_row, synced_end = kept, dst.tell()
+
+        if end == stats_end:
+            new_stats_end = dst.tell()
+        removed = len(removed_offsets)
+        if removed:
+            # Carry over anything appended since the scan above.
+            src.seek(end)
+            shutil.copyfileobj(src, dst)
+            dst.flush()
+            os.fsync(dst.fileno())
+
+    if not removed:
+        os.remove(tmp_path)
+        _clear(csv_path)
+        return 0
+
+    _backup(csv_path)
+    os.replace(tmp_path, csv_path)
+    invalidate_index(csv_path)
+    if new_stats_end is not None:
+        rebase_after_compaction(csv_path, old_inode, new_stats_end, removed_offsets)
+    if last_synced is not None:
+        if new_synced_row >= 0:
+            advance_sync_cursor(db_path, csv_path, new_synced_row, synced_end)
+        else:
+            set_last_synced_row(db_path, -1)
+    _clear(csv_path)
+    return removed
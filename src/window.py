@@ -21,6 +21,7 @@ import os
 
 from gi.repository import Adw, Gtk, Gio
 from .page import NewPage
+from .submission_queue import close_writer
 
 
 @Gtk.Template(resource_path="/in/aryank/openforms/window.ui")
@@ -46,12 +47,18 @@ class OpenFormsWindow(Adw.ApplicationWindow):
         self.add_page()
 
     def _on_page_detached(self, _tab_view, page, _position):
-        """Stop a form's SyncWorker when its tab closes so it doesn't keep running."""
+        """Stop a form's SyncWorker when its tab closes so it doesn't keep
+        running, and flush and close its CSV writer."""
         child = page.get_child()
         sync_worker = getattr(child, "sync_worker", None)
         if sync_worker is not None:
             sync_worker.stop()
             child.sync_worker = None
+        response_writer = getattr(child, "response_writer", None)
+        if response_writer is not None:
+            # After whatever is still queued for it has been written.
+            close_writer(response_writer)
+            child.response_writer = None
 
     def add_page(self):
         page_box = NewPage()
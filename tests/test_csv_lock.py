@@ -0,0 +1,124 @@
+# test_csv_lock.py
+#
+# Copyright 2025 Aryan Kaushik
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+"""
+Stress test for the CSV lock: several processes append to one CSV, with
+every durability policy, while another keeps deleting and compacting rows
+out from under them. Afterwards every row must be whole, and each must be
+there exactly once unless it was deleted.
+
+Run from the repository root: python -m unittest discover tests
+"""
+
+import csv
+import multiprocessing
+import os
+import random
+import shutil
+import tempfile
+import unittest
+
+from src.csv_index import digest, iter_records, parse_records
+from src.csv_writer import DURABILITY_POLICIES, ResponseWriter
+from src.tombstones import add_tombstones, compact
+
+WRITERS = 6
+ROWS_PER_WRITER = 150
+LABELS = ["Writer", "Seq", "Payload"]
+
+
+def _payload(writer: int, seq: int) -> str:
+    """Up to ~10 KB with quotes, commas and newlines, so a torn or
+    interleaved write can't parse back to the same value."""
+    return f'{writer}-{seq}\n"quoted", and\r\nmore\n' + "x" * ((writer * 7919 + seq * 104729) % 10000)
+
+
+def _append_rows(csv_path: str, writer: int) -> None:
+    policy = DURABILITY_POLICIES[writer % len(DURABILITY_POLICIES)]
+    out = ResponseWriter(csv_path, policy, group_commit_ms=5)
+    try:
+        for seq in range(ROWS_PER_WRITER):
+            out.append(f"2025-01-01T00:00:{seq:02d}", [str(writer), str(seq), _payload(writer, seq)], LABELS)
+    finally:
+        out.close()
+
+
+def _delete_rows(csv_path: str, stop, deleted) -> None:
+    """Tombstone one random row and compact, over and over."""
+    rng = random.Random(1)
+    while not stop.is_set():
+        try:
+            with open(csv_path, "rb") as f:
+                records = list(iter_records(f, 0))[1:]
+        except FileNotFoundError:
+            records = []
+        if records:
+            start, raw = rng.choice(records)
+            add_tombstones(csv_path, [(start, digest(raw))])
+            if compact(csv_path):
+                writer, seq = parse_records([raw])[0][1:3]
+                deleted.put((int(writer), int(seq)))
+        stop.wait(0.02)
+
+
+class ConcurrentAppendTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.csv_path = os.path.join(self.dir, "form.csv")
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_no_torn_or_lost_rows(self):
+        ctx = multiprocessing.get_context("fork")
+        stop, deleted = ctx.Event(), ctx.Queue()
+        deleter = ctx.Process(target=_delete_rows, args=(self.csv_path, stop, deleted))
+        deleter.start()
+        writers = [ctx.Process(target=_append_rows, args=(self.csv_path, i)) for i in range(WRITERS)]
+        for p in writers:
+            p.start()
+        for p in writers:
+            p.join()
+        stop.set()
+        deleter.join()
+        for p in writers + [deleter]:
+            self.assertEqual(p.exitcode, 0)
+
+        removed = set()
+        while not deleted.empty():
+            removed.add(deleted.get())
+        self.assertTrue(removed, "the deleter never compacted anything")
+
+        with open(self.csv_path, newline="", encoding="utf-8") as f:
+            rows = list(csv.reader(f))
+        self.assertEqual(rows[0][1:], LABELS)
+        seen = set()
+        for row in rows[1:]:
+            self.assertEqual(len(row), 4, "torn row")
+            key = (int(row[1]), int(row[2]))
+            self.assertEqual(row[3], _payload(*key), "torn row")
+            self.assertNotIn(key, seen, "duplicated row")
+            seen.add(key)
+
+        expected = {(w, s) for w in range(WRITERS) for s in range(ROWS_PER_WRITER)}
+        self.assertFalse(seen & removed, "deleted row came back")
+        self.assertEqual(seen | removed, expected, "lost row")
+
+
+if __name__ == "__main__":
+    unittest.main()
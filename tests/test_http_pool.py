@@ -0,0 +1,107 @@
+# test_http_pool.py
+#
+# Copyright 2025 Aryan Kaushik
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+"""
+Keep-alive pool against a local HTTP/1.1 server: requests share one
+connection, and one the server has since closed is replaced, not used.
+
+Run from the repository root: python -m unittest discover tests
+"""
+
+import threading
+import time
+import unittest
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from src.sync import http_pool
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def _reply(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+        with self.server.lock:
+            self.server.connections.add(self.client_address)
+            self.server.requests += 1
+        body = b"ok"
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        if self.path == "/close-after":
+            # Keep-alive as far as the client can tell, then hang up - as a
+            # server does when its idle timeout runs out.
+            self.close_connection = True
+
+    do_GET = do_POST = _reply
+
+    def log_message(self, *_args):
+        pass
+
+
+class ConnectionPoolTest(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self.server.daemon_threads = True
+        self.server.lock = threading.Lock()
+        self.server.connections = set()
+        self.server.requests = 0
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.pool = http_pool.ConnectionPool()
+        self.base = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def tearDown(self):
+        self.pool.close_all()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _open(self, path: str, data: bytes | None = None) -> bytes:
+        req = urllib.request.Request(self.base + path, data=data, method="POST" if data is not None else "GET")
+        with self.pool.urlopen(req, timeout=5) as resp:
+            return resp.read()
+
+    def test_requests_reuse_one_connection(self):
+        self._open("/token")
+        for _ in range(3):
+            self.assertEqual(self._open("/append", b'{"values": []}'), b"ok")
+        self.assertEqual(self.server.requests, 4)
+        self.assertEqual(len(self.server.connections), 1)
+
+    def test_post_reuses_a_connection_idle_between_pushes(self):
+        self._open("/append", b"1")
+        # Pushes run every 30 s: age the idle connection rather than wait.
+        for idle in self.pool._idle.values():
+            idle[:] = [(conn, last_used - 30) for conn, last_used in idle]
+        self._open("/append", b"2")
+        self.assertEqual(len(self.server.connections), 1)
+
+    def test_connection_closed_by_server_is_not_reused(self):
+        self._open("/close-after")
+        time.sleep(0.2)  # let the FIN arrive
+        # A POST isn't retried, so sending it on the dead connection would fail.
+        self.assertEqual(self._open("/append", b"1"), b"ok")
+        self.assertEqual(self.server.requests, 2)
+        self.assertEqual(len(self.server.connections), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()